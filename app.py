@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 from utils.data_loader import DataLoader
+from utils.dataset_cache import shared_dataset_cache
+from utils.firm_index import FirmIndex
 from utils.charts import ChartGenerator
 
 # Page imports
@@ -72,22 +74,24 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 def load_data():
-    """Load data and store in session state"""
-    if 'data_loaded' not in st.session_state:
-        with st.spinner("Loading data..."):
-            data_loader = DataLoader()
-            data = data_loader.load_data()
-
-            # Check if main data file exists
-            if data['credit_score'] is None:
-                st.error("❌ Dataset tidak ditemukan. Pastikan file berada di folder yang benar.")
-                st.stop()
-
-            # Store in session state
-            st.session_state.data_loader = data_loader
-            st.session_state.data = data
-            st.session_state.current_firm = data_loader.get_current_firm_id(data['credit_score'])
-            st.session_state.data_loaded = True
+    """Attach the process-wide shared dataset to this session"""
+    # One loader per data directory, reused across reruns and sessions with the stores it has opened
+    data_loader = shared_dataset_cache.get_loader("./data/", DataLoader)
+
+    # Every rerun re-checks file mtimes/sizes so edits under ./data/ are picked up
+    with st.spinner("Loading data..."):
+        data = shared_dataset_cache.get(data_loader)
+
+    # Check if main data file exists
+    if data['credit_score'] is None:
+        st.error("❌ Dataset tidak ditemukan. Pastikan file berada di folder yang benar.")
+        st.stop()
+
+    # Store references in session state (the DataFrames themselves are shared)
+    st.session_state.data_loader = data_loader
+    st.session_state.data = data
+    st.session_state.firm_index = shared_dataset_cache.get_derived(data_loader, 'firm_index', FirmIndex)
+    st.session_state.data_loaded = True
 
 def main():
     """Main application"""
@@ -96,16 +100,25 @@ def main():
 
     # Get data from session state
     data_loader = st.session_state.data_loader
-    data = st.session_state.data
-    current_firm = st.session_state.current_firm
+    firm_index = st.session_state.firm_index
 
     # Sidebar
     with st.sidebar:
         st.title("📊 Credit Analysis Dashboard")
 
-        # Firm selector (though we only have one)
-        if data['credit_score'] is not None:
-            st.info(f"📁 Current Firm: **{current_firm}**")
+        # Firm selector (type to search by id, sector, region or category)
+        if st.session_state.get('current_firm') not in firm_index:
+            st.session_state.current_firm = firm_index.default_firm
+        current_firm = st.selectbox(
+            "📁 Select Firm:",
+            firm_index.firm_ids,
+            format_func=firm_index.label,
+            key='current_firm'
+        )
+
+        meta = firm_index.metadata(current_firm)
+        if pd.notna(meta.get('final_score')):
+            st.caption(f"Score {meta['final_score']:.1f} · {meta['kategori']}")
 
         st.markdown("---")
 
@@ -120,6 +133,9 @@ def main():
             index=0
         )
 
+    # Every page sees only the selected firm's rows, sliced from the shared tables
+    data = firm_index.firm_data(current_firm)
+
     # Main content
     if page == "📈 Analysis Summary":
         show_analysis_summary(data_loader, data, current_firm)
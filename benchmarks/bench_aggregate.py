@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the per-firm steps of aggregate_multi_year.
+
+Compares, on synthetic df_ratios tables of growing firm counts:
+- the original per-ratio, per-firm before_last loop (legacy_before_last) with
+  the grouped cumcount pass used by the pipeline (before_last_values)
+- the original np.polyfit-per-group _trend (legacy_trends) with the batched
+  least-squares kernel (utils.trend.frame_slopes)
+The whole aggregate_multi_year step is timed as well for context.
+
+Usage:
+    python benchmarks/bench_aggregate.py --firms 100 200 400 800 --new-only-firms 20000 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.credit_analysis import aggregate_multi_year, before_last_values
+from utils.trend import frame_slopes
+
+RATIO_COLS = [
+    'current_ratio', 'quick_ratio', 'cash_ratio',
+    'debt_to_equity', 'debt_to_asset', 'long_term_debt_ratio',
+    'gross_profit_margin', 'net_profit_margin', 'roa', 'roe',
+    'days_inventory', 'days_receivable', 'days_payable',
+    'interest_coverage', 'dscr',
+    'ocf_ratio', 'free_cash_flow', 'cash_quality_ratio',
+    'fund_flow_balance',
+    'cash_to_assets', 'receivables_to_assets', 'inventory_to_assets',
+    'equity_to_assets', 'cogs_to_revenue', 'opex_to_revenue',
+    'net_margin_ratio'
+]
+
+
+def make_ratios(num_firms: int, seed: int = 0, nan_share: float = 0.05) -> pd.DataFrame:
+    """Synthetic df_ratios: 3-7 years per firm, some missing values"""
+    rng = np.random.default_rng(seed)
+    years_per_firm = rng.integers(3, 8, size=num_firms)
+    firm_ids = np.repeat([f'F{i:06d}' for i in range(num_firms)], years_per_firm)
+    years = np.concatenate([np.arange(2024 - n, 2024) for n in years_per_firm])
+
+    values = rng.normal(1.0, 0.5, size=(len(firm_ids), len(RATIO_COLS)))
+    values[rng.random(values.shape) < nan_share] = np.nan
+
+    df = pd.DataFrame(values, columns=RATIO_COLS)
+    df.insert(0, 'year', years)
+    df.insert(0, 'firm_id', firm_ids)
+    return df
+
+
+def filter_years(df_ratios: pd.DataFrame, min_years: int = 3, max_years: int = 5) -> pd.DataFrame:
+    """The year filtering aggregate_multi_year applies before the before_last step"""
+    df_ratios = df_ratios.sort_values(['firm_id', 'year'])
+    year_counts = df_ratios.groupby('firm_id')['year'].transform('count')
+    df_filtered = df_ratios[year_counts >= min_years].copy()
+    df_filtered['year_rank'] = df_filtered.groupby('firm_id')['year'].rank(method='first', ascending=False)
+    return df_filtered[df_filtered['year_rank'] <= max_years]
+
+
+def legacy_before_last(df_filtered: pd.DataFrame) -> pd.DataFrame:
+    """The original nested loop: one firm_id filter and sort per ratio per firm"""
+    firm_ids = df_filtered['firm_id'].drop_duplicates().tolist()
+    before_last_data = {'firm_id': firm_ids}
+    for col in RATIO_COLS:
+        before_last_values = []
+        for firm_id in firm_ids:
+            firm_data = df_filtered[df_filtered['firm_id'] == firm_id][['year', col]].sort_values('year')
+            if len(firm_data) >= 2 and col in firm_data.columns:
+                before_last_values.append(firm_data[col].iloc[-2])
+            else:
+                before_last_values.append(np.nan)
+        before_last_data[f'{col}_before_last'] = before_last_values
+
+    return pd.DataFrame(before_last_data)
+
+
+def _polyfit_trend(group):
+    """The original _trend aggregation: one np.polyfit call per firm per ratio"""
+    values = group.dropna()
+    if len(values) < 2:
+        return np.nan
+    x = np.arange(len(values))
+    try:
+        return np.polyfit(x, values.values, 1)[0]
+    except Exception:
+        return np.nan
+
+
+def legacy_trends(df_filtered: pd.DataFrame) -> pd.DataFrame:
+    """The original groupby().agg with a Python callable per ratio"""
+    return df_filtered.groupby('firm_id')[RATIO_COLS].agg(_polyfit_trend)
+
+
+def _time(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the per-firm steps of aggregate_multi_year")
+    parser.add_argument('--firms', type=int, nargs='+', default=[100, 200, 400, 800],
+                        help="Firm counts timed with the legacy and new implementations")
+    parser.add_argument('--new-only-firms', type=int, nargs='*', default=[20000, 200000],
+                        help="Larger firm counts timed with the new implementations only")
+    parser.add_argument('--full-step-max-firms', type=int, default=20000,
+                        help="Largest firm count for which the whole aggregate_multi_year step is also timed")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for num_firms in args.firms + args.new_only_firms:
+        df = make_ratios(num_firms)
+        df_filtered = filter_years(df)
+        legacy = num_firms in args.firms
+        rows.append({
+            'firms': num_firms,
+            'legacy_loop_s': _time(legacy_before_last, df_filtered) if legacy else np.nan,
+            'grouped_pass_s': _time(before_last_values, df_filtered, RATIO_COLS),
+            'polyfit_trend_s': _time(legacy_trends, df_filtered) if legacy else np.nan,
+            'slope_kernel_s': _time(frame_slopes, df_filtered, 'firm_id', RATIO_COLS),
+            'aggregate_multi_year_s': _time(aggregate_multi_year, df) if num_firms <= args.full_step_max_firms else np.nan
+        })
+
+    report = pd.DataFrame(rows)
+    print("legacy_loop_s / grouped_pass_s time the before_last step, polyfit_trend_s / slope_kernel_s the _trend step; "
+          "aggregate_multi_year_s is the whole step")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Sub-Ratio Explorer render modes.
+
+Builds the explorer's charts for one firm of the bundled data the way each
+mode does, and serialises them the way st.plotly_chart does (with Streamlit's
+default template installed, as in the app):
+- detailed: one create_trend_chart figure per ratio
+- compact: one create_ratio_small_multiples figure per category
+- page: one create_ratio_small_multiples figure for every categorised ratio
+
+Each Plotly chart is a separate component mount in the browser, so mounts and
+payload bytes are what the page ships; build_ms is server-side build plus
+serialisation without the figure cache.
+
+A second table compares per-row trend lines for every ratio: one
+create_sparkline figure per ratio against one create_svg_sparklines batch of
+inline SVG strings (rendered as markdown, no chart mount).
+
+Usage:
+    python benchmarks/bench_charts.py --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import plotly.tools
+from plotly.utils import PlotlyJSONEncoder
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit.elements.plotly_chart  # noqa: F401  (installs Streamlit's default Plotly template)
+
+from utils.charts import ChartGenerator
+from utils.data_loader import DataLoader
+from utils.ratio_categories import get_ratio_categories
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def serialized(fig) -> str:
+    """The JSON st.plotly_chart sends for a figure"""
+    figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    return json.dumps(figure, cls=PlotlyJSONEncoder)
+
+
+def mode_figures(mode: str, chart_gen: ChartGenerator, df_ratios: pd.DataFrame, categories: dict) -> list:
+    """The figures one render of the explorer builds in a mode"""
+    if mode == 'detailed':
+        return [chart_gen.create_trend_chart(df_ratios, ratio)
+                for ratios in categories.values() for ratio in ratios
+                if df_ratios[ratio].notna().sum() >= 2]
+    if mode == 'compact':
+        return [chart_gen.create_ratio_small_multiples(df_ratios, ratios) for ratios in categories.values() if ratios]
+    return [chart_gen.create_ratio_small_multiples(df_ratios, [r for ratios in categories.values() for r in ratios])]
+
+
+def sparkline_rows(chart_gen: ChartGenerator, df_ratios: pd.DataFrame, ratio_columns: list, repeat: int) -> list:
+    """Plotly sparkline figures vs one inline SVG batch for every ratio"""
+    rows = []
+    for renderer in ['plotly', 'svg']:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if renderer == 'plotly':
+                payloads = [serialized(chart_gen.create_sparkline(df_ratios, ratio)) for ratio in ratio_columns]
+            else:
+                payloads = list(chart_gen.create_svg_sparklines(df_ratios, ratio_columns).values())
+            timings.append(time.perf_counter() - start)
+        rows.append({
+            'renderer': renderer,
+            'sparklines': len(payloads),
+            'mounts': len(payloads) if renderer == 'plotly' else 0,
+            'payload_kb': sum(len(p) for p in payloads) / 1024,
+            'build_ms': min(timings) * 1000
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Sub-Ratio Explorer render modes")
+    parser.add_argument('--data-path', default=DATA_PATH)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df_ratios_all = DataLoader(args.data_path).load_data()['ratios']
+    firm_id = df_ratios_all['firm_id'].iloc[0]
+    df_ratios = df_ratios_all[df_ratios_all['firm_id'] == firm_id].sort_values('year').reset_index(drop=True)
+    ratio_columns = [col for col in df_ratios.columns if col not in ['firm_id', 'year']]
+    categories = get_ratio_categories(ratio_columns)
+
+    chart_gen = ChartGenerator()
+    rows = []
+    for mode in ['detailed', 'compact', 'page']:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            payloads = [serialized(fig) for fig in mode_figures(mode, chart_gen, df_ratios, categories)]
+            timings.append(time.perf_counter() - start)
+        rows.append({
+            'mode': mode,
+            'mounts': len(payloads),
+            'payload_kb': sum(len(p) for p in payloads) / 1024,
+            'build_ms': min(timings) * 1000
+        })
+
+    report = pd.DataFrame(rows)
+    report['payload_reduction'] = report['payload_kb'].iloc[0] / report['payload_kb']
+    report['time_reduction'] = report['build_ms'].iloc[0] / report['build_ms']
+    print(f"Firm {firm_id}: {sum(len(r) for r in categories.values())} categorised ratios, {len(df_ratios)} years")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+
+    sparklines = pd.DataFrame(sparkline_rows(chart_gen, df_ratios, ratio_columns, args.repeat))
+    print()
+    print(sparklines.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of ChartGenerator's validated and fast figure paths.
+
+For every chart type, builds the chart for one firm of the bundled data and
+serialises it the way st.plotly_chart does (with Streamlit's default template
+installed, as in the app), once through the validated go.Figure path and once
+through the fast path (ChartGenerator(fast=True)), without the figure cache.
+same_json checks that both paths send identical JSON.
+
+Usage:
+    python benchmarks/bench_figures.py --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import plotly.tools
+from plotly.utils import PlotlyJSONEncoder
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit.elements.plotly_chart  # noqa: F401  (installs Streamlit's default Plotly template)
+
+from utils.charts import ChartGenerator
+from utils.data_loader import DataLoader
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def serialized(fig) -> str:
+    """The JSON st.plotly_chart sends for a figure"""
+    figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    return json.dumps(figure, cls=PlotlyJSONEncoder, sort_keys=True)
+
+
+def chart_builders(data_loader: DataLoader, data: dict, firm_id: str) -> dict:
+    """Chart type -> function building that chart with a given ChartGenerator"""
+    df_credit = data['credit_score']
+    df_ratios = data['ratios'][data['ratios']['firm_id'] == firm_id].sort_values('year')
+    df_balance = data['balance_sheet'][data['balance_sheet']['firm_id'] == firm_id].sort_values('year')
+    contributions = data_loader.get_aspect_contributions(df_credit, firm_id)
+    ratios = ['current_ratio', 'quick_ratio', 'roa', 'roe', 'debt_to_equity', 'asset_turnover']
+
+    return {
+        'radar': lambda gen: gen.create_radar_chart(df_credit, firm_id),
+        'aspect_bar': lambda gen: gen.create_aspect_bar_chart(contributions),
+        'trend': lambda gen: gen.create_trend_chart(df_ratios, 'roa'),
+        'small_multiples': lambda gen: gen.create_ratio_small_multiples(df_ratios, ratios),
+        'sparkline': lambda gen: gen.create_sparkline(df_ratios, 'roa'),
+        'multi_line': lambda gen: gen.create_multi_line_chart(
+            df_balance, 'year', ['total_assets', 'total_liabilities', 'equity_end'], 'Balance Sheet'),
+        'clustered_bar': lambda gen: gen.create_clustered_bar_chart(
+            df_balance, 'year', ['cash', 'receivables', 'inventory'], 'Current Assets')
+    }
+
+
+def time_build(build, chart_gen: ChartGenerator, repeat: int) -> float:
+    """Best build + serialise time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialized(build(chart_gen))
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ChartGenerator's validated and fast figure paths")
+    parser.add_argument('--data-path', default=DATA_PATH)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    data_loader = DataLoader(args.data_path)
+    data = data_loader.load_data()
+    firm_id = data['credit_score']['firm_id'].iloc[0]
+
+    validated_gen, fast_gen = ChartGenerator(), ChartGenerator(fast=True)
+    rows = []
+    for chart, build in chart_builders(data_loader, data, firm_id).items():
+        # One untimed build each, so the fast path's once-per-process style validation is not counted
+        same_json = serialized(build(validated_gen)) == serialized(build(fast_gen))
+        validated_ms = time_build(build, validated_gen, args.repeat)
+        fast_ms = time_build(build, fast_gen, args.repeat)
+        rows.append({
+            'chart': chart,
+            'validated_ms': validated_ms,
+            'fast_ms': fast_ms,
+            'speedup': validated_ms / fast_ms,
+            'same_json': same_json
+        })
+
+    report = pd.DataFrame(rows)
+    print(f"Firm {firm_id}, best of {args.repeat}")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
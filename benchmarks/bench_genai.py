@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the GenAI enrichment stage against the local stub server.
+
+Enriches copies of the bundled firm through pipeline.genai.HttpClient with a
+fixed per-request latency, at several concurrency limits. Concurrency 1 is the
+notebook's one-request-at-a-time loop (without its 1s sleeps). Each mode is
+run at each concurrency: 'sections' sends eight prompts per firm, 'combined'
+one JSON prompt per firm; input_chars counts system prompt plus prompt text
+sent (roughly four characters per token).
+
+Usage:
+    python benchmarks/bench_genai.py --firms 50 --latency 0.1 --concurrency 1 8 32 64 --modes sections combined
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.genai import ANALYSIS_COLUMNS, MODES, HttpClient, enrich_credit_scores
+from pipeline.genai_stub import start_stub_server
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def make_scored_firms(num_firms: int):
+    """df_credit_score (without GenAI columns) and df_agg for num_firms copies of the bundled firm"""
+    df_credit = pd.read_csv(os.path.join(DATA_PATH, 'df_credit_score.csv')).drop(columns=ANALYSIS_COLUMNS)
+    df_agg = pd.read_csv(os.path.join(DATA_PATH, 'df_agg.csv'))
+    firm_ids = [f'F{i + 1:06d}' for i in range(num_firms)]
+    credit = pd.concat([df_credit.assign(firm_id=firm_id) for firm_id in firm_ids], ignore_index=True)
+    agg = pd.concat([df_agg.assign(firm_id=firm_id) for firm_id in firm_ids], ignore_index=True)
+    credit['final_score'] = credit['final_score'] + range(num_firms)
+    return credit, agg
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GenAI enrichment concurrency against the stub server")
+    parser.add_argument('--firms', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.1, help="Stub seconds per request")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args(argv)
+
+    credit, agg = make_scored_firms(args.firms)
+    server, _ = start_stub_server(latency=args.latency, failure_rate=args.failure_rate)
+
+    rows = []
+    try:
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                _, summary = enrich_credit_scores(credit, agg, HttpClient(server.url), concurrency=concurrency,
+                                                  backoff_base=0.05, mode=mode, verbose=False)
+                rows.append({
+                    'mode': mode,
+                    'concurrency': concurrency,
+                    'requests': summary['requests'],
+                    'retries': summary['retries'],
+                    'input_chars': summary['input_chars'],
+                    'seconds': summary['seconds'],
+                    'requests_per_s': summary['requests'] / summary['seconds']
+                })
+    finally:
+        server.shutdown()
+
+    report = pd.DataFrame(rows)
+    report['speedup'] = report['seconds'].iloc[0] / report['seconds']
+    print(f"{args.firms} firms, stub latency {args.latency}s")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the firm_id-sharded pipeline executor.
+
+Scores a synthetic universe (the bundled firm's statements tiled with per-firm
+noise) with pipeline.parallel.run_sharded at several worker counts and reports
+the speedup over one worker. Worker counts above the available cores are still
+run but cannot scale.
+
+Usage:
+    python benchmarks/bench_parallel.py --firms 4000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.parallel import default_workers, run_sharded
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+RAW_SOURCES = {
+    'company_info': 'company_info_sub.csv',
+    'income_info': 'income_info_sub.csv',
+    'balance_sheet': 'balance_sheet_sub.csv',
+    'cash_flow': 'cash_flow_sub.csv'
+}
+
+
+def make_raw_tables(num_firms: int, seed: int = 0) -> dict:
+    """Raw statements for num_firms firms: the bundled firm's rows with per-firm, per-cell noise"""
+    rng = np.random.default_rng(seed)
+    firm_ids = np.array([f'F{i + 1:06d}' for i in range(num_firms)], dtype=object)
+
+    tables = {}
+    for key, filename in RAW_SOURCES.items():
+        base = pd.read_csv(os.path.join(DATA_PATH, filename))
+        df = base.loc[base.index.repeat(num_firms)].reset_index(drop=True)
+        df['firm_id'] = np.tile(firm_ids, len(base))
+        amounts = [c for c in df.select_dtypes('number').columns if c not in ['year', 'start_year']]
+        df[amounts] = df[amounts] * rng.uniform(0.5, 1.5, size=(len(df), len(amounts)))
+        sort_cols = ['firm_id', 'year'] if 'year' in df.columns else ['firm_id']
+        tables[key] = df.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+    return tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sharded pipeline executor")
+    parser.add_argument('--firms', type=int, default=4000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    raw = make_raw_tables(args.firms)
+    tables = (raw['company_info'], raw['income_info'], raw['balance_sheet'], raw['cash_flow'])
+
+    rows = []
+    for workers in args.workers:
+        start = time.perf_counter()
+        run_sharded(*tables, workers=workers)
+        rows.append({'workers': workers, 'seconds': time.perf_counter() - start})
+
+    report = pd.DataFrame(rows)
+    report['firms_per_s'] = args.firms / report['seconds']
+    report['speedup'] = report['seconds'].iloc[0] / report['seconds']
+    print(f"{args.firms} firms, {default_workers()} cores available")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the reasoning text steps: add_aspect_reasoning and classify_credit.
+
+Times the original row-wise engines (df.apply over the explain_* functions and
+over generate_reasoning) against the vectorized engines on synthetic df_agg /
+df_scores tables, and reports firms per second.
+
+Usage:
+    python benchmarks/bench_reasoning.py --firms 1000 10000 --new-only-firms 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.credit_analysis import REASONING_METRICS, add_aspect_reasoning, classify_credit
+
+REASONING_COLS = [
+    'current_ratio_last', 'quick_ratio_last', 'current_ratio_trend', 'current_ratio_std',
+    'debt_to_equity_last', 'debt_to_asset_last', 'debt_to_equity_trend', 'debt_to_equity_std',
+    'roa_last', 'roe_last', 'net_profit_margin_last', 'roa_trend', 'roa_std',
+    'days_inventory_last', 'days_receivable_last', 'days_payable_last', 'days_inventory_trend', 'days_inventory_std',
+    'interest_coverage_last', 'dscr_last', 'interest_coverage_trend', 'dscr_std',
+    'ocf_ratio_last', 'free_cash_flow_last', 'cash_quality_ratio_last', 'free_cash_flow_trend', 'free_cash_flow_std',
+    'fund_flow_balance_last', 'equity_to_assets_last', 'net_margin_ratio_trend'
+]
+
+# Band thresholds, rounding edges, signed zero and missing / infinite values
+SPECIAL_VALUES = [0.0, -0.0, 0.05, -0.05, 0.1, 0.3, 0.5, 0.6, 1.0, 1.5, 2.0, 5.0, 50.0, -100.0,
+                  0.125, -0.0001, np.nan, np.inf]
+
+
+def make_agg(num_firms: int, seed: int = 0, special_share: float = 0.3) -> pd.DataFrame:
+    """Synthetic df_agg with the columns add_aspect_reasoning reads, across several magnitudes"""
+    rng = np.random.default_rng(seed)
+    shape = (num_firms, len(REASONING_COLS))
+    values = rng.normal(0, 1, size=shape) * rng.choice([0.01, 0.1, 1, 10, 100, 1000], size=shape)
+    mask = rng.random(shape) < special_share
+    values[mask] = rng.choice(SPECIAL_VALUES, size=mask.sum())
+
+    df = pd.DataFrame(values, columns=REASONING_COLS)
+    df.insert(0, 'firm_id', [f'F{i:07d}' for i in range(num_firms)])
+    # A string column makes each row an object Series, as in the real df_agg
+    df['current_ratio_direction'] = 'STABLE'
+    return df
+
+
+def make_scores(num_firms: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic df_scores: aspect scores on the 0-100 scale, half on 5-point steps so ties and 60/80 edges occur"""
+    rng = np.random.default_rng(seed)
+    shape = (num_firms, len(REASONING_METRICS))
+    scores = np.where(rng.random(shape) < 0.5,
+                      rng.integers(0, 21, size=shape) * 5.0,
+                      np.round(rng.uniform(0, 100, size=shape), 2))
+
+    df = pd.DataFrame({'firm_id': [f'F{i:07d}' for i in range(num_firms)]})
+    for j, (_, col) in enumerate(REASONING_METRICS):
+        aspect = col.replace('_score', '')
+        df[col] = scores[:, j]
+        df[f'{aspect}_reason'] = ''
+        df[f'{aspect}_status'] = 'Watch'
+    return df
+
+
+def _time(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the add_aspect_reasoning and classify_credit engines")
+    parser.add_argument('--firms', type=int, nargs='+', default=[1000, 10000],
+                        help="Firm counts timed with both engines")
+    parser.add_argument('--new-only-firms', type=int, nargs='*', default=[1000000],
+                        help="Larger firm counts timed with the vectorized engine only")
+    args = parser.parse_args(argv)
+
+    steps = [
+        ('add_aspect_reasoning', add_aspect_reasoning, make_agg),
+        ('classify_credit', classify_credit, make_scores)
+    ]
+
+    rows = []
+    for step, func, make_input in steps:
+        for num_firms in args.firms + args.new_only_firms:
+            df = make_input(num_firms)
+            rowwise_s = _time(func, df, engine='rowwise') if num_firms in args.firms else np.nan
+            vectorized_s = _time(func, df, engine='vectorized')
+            rows.append({
+                'step': step,
+                'firms': num_firms,
+                'rowwise_s': rowwise_s,
+                'vectorized_s': vectorized_s,
+                'rowwise_firms_per_s': num_firms / rowwise_s,
+                'vectorized_firms_per_s': num_firms / vectorized_s
+            })
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.3f}" if v < 1000 else f"{v:,.0f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 from utils.charts import ChartGenerator
+from utils.figure_cache import shared_figure_cache
+from utils.figure_store import load_figure
 
 def show_analysis_summary(data_loader, data, current_firm):
     """Display Analysis Summary page"""
@@ -12,7 +14,16 @@ def show_analysis_summary(data_loader, data, current_firm):
         return
 
     row = df_credit.iloc[0]
-    chart_gen = ChartGenerator()
+    firm_id = str(row['firm_id'])
+    chart_gen = ChartGenerator(figure_cache=shared_figure_cache, fast=True)
+    # Precomputed charts for this dataset, when the store has been built
+    figure_store = data_loader.figure_store()
+
+    # Narrative text may live in the separate text store; fetch what this view shows
+    narratives = data_loader.get_narratives(
+        firm_id, ['reasoning', 'genai_recommendation'] + data_loader.aspect_reasons, row
+    )
+    reasoning = narratives['reasoning'] or ""
 
     # Main layout: Top summary section
     col1, col2 = st.columns([1, 1])
@@ -38,25 +49,27 @@ def show_analysis_summary(data_loader, data, current_firm):
             st.session_state.show_reasoning = not st.session_state.get('show_reasoning', False)
 
         if st.session_state.get('show_reasoning', False):
-            st.markdown(f"**{row['reasoning']}**")
+            st.markdown(f"**{reasoning}**")
         else:
             # Show truncated version
-            reasoning_preview = row['reasoning'][:200] + "..." if len(row['reasoning']) > 200 else row['reasoning']
+            reasoning_preview = reasoning[:200] + "..." if len(reasoning) > 200 else reasoning
             st.markdown(f"*{reasoning_preview}*")
         st.markdown('</div>', unsafe_allow_html=True)
 
         # GenAI Recommendation (if exists)
-        if pd.notna(row.get('genai_recommendation')) and row['genai_recommendation'].strip():
+        genai_recommendation = narratives['genai_recommendation']
+        if pd.notna(genai_recommendation) and genai_recommendation.strip():
             st.markdown('<div class="genai-recommendation" style="margin-top: 1rem;">', unsafe_allow_html=True)
             st.markdown("### 🤖 AI Recommendation")
-            st.markdown(f"*{row['genai_recommendation']}*")
+            st.markdown(f"*{genai_recommendation}*")
             st.markdown('</div>', unsafe_allow_html=True)
 
     with col2:
         # Radar Chart
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.markdown("### Performance Radar")
-        radar_fig = chart_gen.create_radar_chart(df_credit)
+        radar_fig = load_figure(figure_store, firm_id, 'radar',
+                                lambda: chart_gen.create_radar_chart(df_credit, firm_id))
         st.plotly_chart(radar_fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -65,8 +78,8 @@ def show_analysis_summary(data_loader, data, current_firm):
     st.markdown('<div class="metric-card">', unsafe_allow_html=True)
     st.markdown("### Aspect Score Breakdown")
 
-    contributions_df = data_loader.get_aspect_contributions(df_credit)
-    bar_fig = chart_gen.create_aspect_bar_chart(contributions_df)
+    bar_fig = load_figure(figure_store, firm_id, 'aspect_bar', lambda: chart_gen.create_aspect_bar_chart(
+        data_loader.get_aspect_contributions(df_credit, firm_id)))
     st.plotly_chart(bar_fig, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -105,7 +118,7 @@ def show_analysis_summary(data_loader, data, current_firm):
 
             with col_header3:
                 st.markdown("### Key Reason")
-                st.markdown(f"*{row[reason_col]}*")
+                st.markdown(f"*{narratives[reason_col]}*")
 
             # Analysis section (collapsible)
             button_key = f"button_{aspect_name.lower()}"
@@ -117,7 +130,9 @@ def show_analysis_summary(data_loader, data, current_firm):
             if st.session_state.get(state_key, False):
                 st.markdown("---")
                 st.markdown("#### Detailed Analysis")
-                st.markdown(f"*{row[analysis_col]}*")
+                # Long GenAI text is only pulled when the analysis is expanded
+                analysis_text = data_loader.get_narratives(firm_id, [analysis_col], row)[analysis_col]
+                st.markdown(f"*{analysis_text}*")
 
                 # Add some relevant KPIs if we have ratio data
                 if data['ratios'] is not None and not data['ratios'].empty:
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.charts import ChartGenerator
+from utils.figure_cache import shared_figure_cache
 
 def show_financials_explorer(data_loader, data, current_firm):
     """Display Financial Statements Explorer page"""
@@ -17,7 +18,7 @@ def show_financials_explorer(data_loader, data, current_firm):
         st.warning("No financial data available")
         return
 
-    chart_gen = ChartGenerator()
+    chart_gen = ChartGenerator(figure_cache=shared_figure_cache, fast=True)
 
     # Key Financial Variables section
     st.markdown("## 📊 Key Financial Variables")
@@ -436,6 +437,10 @@ def _display_balance_sheet(df_balance: pd.DataFrame, chart_gen):
     num_years = len(observation_years)
     col_widths = [3] + [1.2] * num_years  # Item column + year columns
 
+    # Per-row trend lines, drawn for the whole statement in one pass
+    sparklines = {var_name.replace('_', ' ').title(): svg
+                  for var_name, svg in chart_gen.create_svg_sparklines(df_balance, balance_sheet_variables).items()}
+
     if balance_data:
         # Headers
         cols = st.columns(col_widths)
@@ -465,7 +470,7 @@ def _display_balance_sheet(df_balance: pd.DataFrame, chart_gen):
             # Second row: Empty for item name, delta indicators below values
             cols = st.columns(col_widths)
             with cols[0]:
-                st.markdown("&nbsp;")  # Placeholder under item name
+                st.markdown(sparklines.get(item_name, "&nbsp;"), unsafe_allow_html=True)  # Trend under item name
 
             for i, year in enumerate(observation_years):
                 with cols[i + 1]:
@@ -538,6 +543,10 @@ def _display_income_statement(df_income: pd.DataFrame, chart_gen):
     num_years = len(observation_years)
     col_widths = [3] + [1.2] * num_years  # Item column + year columns
 
+    # Per-row trend lines, drawn for the whole statement in one pass
+    sparklines = {var_name.replace('_', ' ').title(): svg
+                  for var_name, svg in chart_gen.create_svg_sparklines(df_income, income_statement_variables).items()}
+
     if income_data:
         # Headers
         cols = st.columns(col_widths)
@@ -567,7 +576,7 @@ def _display_income_statement(df_income: pd.DataFrame, chart_gen):
             # Second row: Empty for item name, delta indicators below values
             cols = st.columns(col_widths)
             with cols[0]:
-                st.markdown("&nbsp;")  # Placeholder under item name
+                st.markdown(sparklines.get(item_name, "&nbsp;"), unsafe_allow_html=True)  # Trend under item name
 
             for i, year in enumerate(observation_years):
                 with cols[i + 1]:
@@ -642,6 +651,10 @@ def _display_cash_flow_statement(df_cash_flow: pd.DataFrame, chart_gen):
                 else:
                     cash_flow_data[display_name][str(year)] = None
 
+    # Per-row trend lines, drawn for the whole statement in one pass
+    sparklines = {var_name.replace('_', ' ').title(): svg
+                  for var_name, svg in chart_gen.create_svg_sparklines(df_cash_flow, cash_flow_variables).items()}
+
     if cash_flow_data:
         # Headers
         cols = st.columns(col_widths)
@@ -671,7 +684,7 @@ def _display_cash_flow_statement(df_cash_flow: pd.DataFrame, chart_gen):
             # Second row: Empty for item name, delta indicators below values
             cols = st.columns(col_widths)
             with cols[0]:
-                st.markdown("&nbsp;")  # Placeholder under item name
+                st.markdown(sparklines.get(item_name, "&nbsp;"), unsafe_allow_html=True)  # Trend under item name
 
             for i, year in enumerate(observation_years):
                 with cols[i + 1]:
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from utils.charts import ChartGenerator
+from utils.figure_cache import shared_figure_cache
+from utils.figure_store import load_figure
 
 def show_performance_insight(data_loader, data, current_firm):
     """Display Performance Insight Deck page"""
@@ -15,7 +17,8 @@ def show_performance_insight(data_loader, data, current_firm):
         st.warning("No aggregated data available")
         return
 
-    chart_gen = ChartGenerator()
+    chart_gen = ChartGenerator(figure_cache=shared_figure_cache, fast=True)
+    figure_store = data_loader.figure_store()
 
     # Layout: Company info, metrics table, and detail panel
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -137,7 +140,8 @@ def show_performance_insight(data_loader, data, current_firm):
             if metric in df_ratios.columns:
                 st.markdown("---")
                 st.markdown("**Historical Trend:**")
-                trend_fig = chart_gen.create_trend_chart(df_ratios, metric)
+                trend_fig = load_figure(figure_store, current_firm, 'trend',
+                                        lambda: chart_gen.create_trend_chart(df_ratios, metric), param=metric)
                 st.plotly_chart(trend_fig, use_container_width=True)
         else:
             st.info("Select a metric from the table to view details")
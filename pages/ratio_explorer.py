@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
+from urllib.parse import quote
 from utils.charts import ChartGenerator
+from utils.figure_cache import shared_figure_cache
+from utils.figure_store import load_figure
+from utils.ratio_categories import get_ratio_categories
+from utils.trend import series_slope
 
 def show_ratio_explorer(data_loader, data, current_firm):
     """Display Sub-Ratio Explorer page"""
@@ -14,26 +18,26 @@ def show_ratio_explorer(data_loader, data, current_firm):
         st.warning("No ratio data available")
         return
 
-    chart_gen = ChartGenerator()
+    chart_gen = ChartGenerator(figure_cache=shared_figure_cache, fast=True)
+    figure_store = data_loader.figure_store()
 
     # Get all ratio columns (excluding firm_id and year)
     ratio_columns = [col for col in df_ratios.columns if col not in ['firm_id', 'year']]
 
     # Group ratios by category for better organization
-    ratio_categories = {
-        'Liquidity Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['current_ratio', 'quick_ratio', 'cash_ratio', 'working_capital'])],
-        'Solvency Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['debt_to_equity', 'debt_to_assets', 'equity_to_assets', 'leverage', 'long_term_debt_ratio'])],
-        'Profitability Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['roa', 'roe', 'gross_margin', 'gross_profit_margin', 'net_profit_margin', 'ebitda_margin'])],
-        'Activity/Efficiency Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['turnover', 'days_', 'asset_turnover', 'inventory_turnover'])],
-        'Cash Flow Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['ocf_ratio', 'free_cash_flow', 'cash_quality_ratio'])],
-        'Structure Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['fund_flow', 'equity_to_asset', 'net_margin_ratio'])]
-    }
+    ratio_categories = get_ratio_categories(ratio_columns)
+
+    # KPI trend lines as inline SVG, drawn for every ratio in one pass
+    sparklines = chart_gen.create_svg_sparklines(df_ratios, ratio_columns)
 
     # Remove uncategorized ratios (don't show 'Other Ratios' category)
     categorized_ratios = set()
     for category_ratios in ratio_categories.values():
         categorized_ratios.update(category_ratios)
 
+    # Compact draws each category as one subplot grid instead of one chart per ratio
+    render_mode = st.radio("Render mode", ["Detailed", "Compact"], horizontal=True, key='ratio_render_mode')
+
     st.markdown("---")
 
     # Display all ratio categories (no selectbox)
@@ -43,14 +47,42 @@ def show_ratio_explorer(data_loader, data, current_firm):
 
         st.markdown(f"## {category_name}")
 
+        if render_mode == "Compact":
+            _display_compact_category(category_ratios, df_ratios, chart_gen, sparklines)
+            continue
+
         # Display ratios in 3-column layout
         for i in range(0, len(category_ratios), 3):
             cols = st.columns(3)
             for j, ratio in enumerate(category_ratios[i:i+3]):
                 with cols[j]:
-                    _display_ratio_panel(ratio, df_ratios, df_agg, chart_gen)
-
-def _display_ratio_panel(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.DataFrame, chart_gen):
+                    _display_ratio_panel(ratio, df_ratios, df_agg, chart_gen, figure_store, current_firm,
+                                         sparklines.get(ratio))
+
+def _display_compact_category(category_ratios: list, df_ratios: pd.DataFrame, chart_gen, sparklines: dict = None):
+    """Display a category as one KPI table and one small-multiples chart"""
+    df_sorted = df_ratios.sort_values('year')
+    latest = df_sorted.iloc[-1]
+    previous = df_sorted.iloc[-2] if len(df_sorted) > 1 else None
+
+    kpis = pd.DataFrame({
+        'Ratio': [ratio.replace('_', ' ').title() for ratio in category_ratios],
+        f"Latest ({latest['year']})": [latest[ratio] for ratio in category_ratios],
+        'Change': [latest[ratio] - previous[ratio] if previous is not None else None for ratio in category_ratios]
+    })
+    column_config = None
+    if sparklines:
+        # Image cells take the SVG as a data URL
+        kpis['Trend'] = [f"data:image/svg+xml;utf8,{quote(sparklines[ratio])}" if ratio in sparklines else None
+                         for ratio in category_ratios]
+        column_config = {'Trend': st.column_config.ImageColumn('Trend')}
+    st.dataframe(kpis, hide_index=True, use_container_width=True, column_config=column_config)
+
+    grid_fig = chart_gen.create_ratio_small_multiples(df_sorted, category_ratios)
+    st.plotly_chart(grid_fig, use_container_width=True)
+
+def _display_ratio_panel(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.DataFrame, chart_gen,
+                         figure_store=None, firm_id=None, sparkline=None):
     """Display a single ratio panel with all details"""
     with st.container():
         st.markdown('<div class="aspect-card" style="padding: 1rem;">', unsafe_allow_html=True)
@@ -61,18 +93,18 @@ def _display_ratio_panel(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.Da
 
   
         # Top KPIs section (1 column with st.metric)
-        _display_kpi_section(ratio_name, df_ratios, df_agg)
+        _display_kpi_section(ratio_name, df_ratios, df_agg, sparkline)
 
         # Yearly trend chart
-        _display_trend_section(ratio_name, df_ratios, chart_gen)
+        _display_trend_section(ratio_name, df_ratios, chart_gen, figure_store, firm_id)
 
         # Statistics and interpretation
         _display_stats_section(ratio_name, df_ratios, df_agg)
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-def _display_kpi_section(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.DataFrame):
-    """Display top KPIs with trend indicators - single column layout"""
+def _display_kpi_section(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.DataFrame, sparkline: str = None):
+    """Display top KPIs with trend indicators (and an inline SVG sparkline if given) - single column layout"""
     if df_ratios.empty:
         return
 
@@ -131,8 +163,10 @@ def _display_kpi_section(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.Da
         delta=delta_text,
         delta_color=delta_color
     )
+    if sparkline:
+        st.markdown(sparkline, unsafe_allow_html=True)
 
-def _display_trend_section(ratio_name: str, df_ratios: pd.DataFrame, chart_gen):
+def _display_trend_section(ratio_name: str, df_ratios: pd.DataFrame, chart_gen, figure_store=None, firm_id=None):
     """Display yearly trend chart"""
     if df_ratios.empty:
         return
@@ -143,7 +177,8 @@ def _display_trend_section(ratio_name: str, df_ratios: pd.DataFrame, chart_gen):
         st.info("Insufficient data for trend chart")
         return
 
-    trend_fig = chart_gen.create_trend_chart(df_ratios, ratio_name)
+    trend_fig = load_figure(figure_store, firm_id, 'trend', lambda: chart_gen.create_trend_chart(df_ratios, ratio_name),
+                            param=ratio_name)
     st.plotly_chart(trend_fig, use_container_width=True)
 
 def _display_stats_section(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.DataFrame):
@@ -165,7 +200,7 @@ def _display_stats_section(ratio_name: str, df_ratios: pd.DataFrame, df_agg: pd.
                 # Simple trend calculation (linear regression slope)
                 if len(values) > 1:
                     years = df_ratios.loc[values.index, 'year']
-                    trend_val = np.polyfit(years, values, 1)[0]
+                    trend_val = series_slope(years, values)
                 else:
                     trend_val = None
             else:
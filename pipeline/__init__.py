@@ -0,0 +1 @@
+# Pipeline module for Credit Analysis Dashboard
\ No newline at end of file
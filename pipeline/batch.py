@@ -0,0 +1,222 @@
+"""
+Chunked batch engine for the credit scoring pipeline.
+
+The raw company_info / income_statement / balance_sheet / cash_flow_statement
+files are streamed in firm-aligned chunks: every chunk holds all rows of a
+contiguous range of firms from each file, so the per-firm pipeline steps give
+the same result as a whole-universe run. df_ratios, df_agg and df_credit_score
+are appended chunk by chunk, keeping peak memory at roughly one chunk (plus the
+largest single firm) whatever the universe size.
+
+The raw files must be sorted by firm_id (as exported from the source system).
+With --workers N each chunk is split into firm_id shards scored on N processes
+(see pipeline.parallel); the output is the same as a single-process run.
+
+Usage:
+    python -m pipeline.batch --raw-path ./raw/ --output-path ./data/ --chunk-rows 200000 --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pipeline.credit_analysis import compute_credit_tables
+from pipeline.parallel import run_sharded
+
+RAW_FILES = {
+    'company_info': 'company_info.csv',
+    'income_info': 'income_statement.csv',
+    'balance_sheet': 'balance_sheet.csv',
+    'cash_flow': 'cash_flow_statement.csv'
+}
+
+OUTPUT_FILES = {
+    'ratios': 'df_ratios.csv',
+    'agg': 'df_agg.csv',
+    'credit_score': 'df_credit_score.csv'
+}
+
+# Chunk boundaries are taken from this file; firms without a balance sheet drop out of the inner merge anyway
+DRIVER_TABLE = 'balance_sheet'
+
+
+class FirmChunkReader:
+    """Streams a CSV sorted by firm_id and hands out all rows of whole firms"""
+
+    def __init__(self, path: str, chunk_rows: int):
+        self.path = path
+        self._chunks = pd.read_csv(path, chunksize=chunk_rows, dtype={'firm_id': str})
+        self._buffer = None
+        self._last_firm = None
+        self.exhausted = False
+
+    def _read_chunk(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.exhausted = True
+            return
+
+        ids = chunk['firm_id'].to_numpy()
+        if len(ids) == 0:
+            return
+        if (self._last_firm is not None and ids[0] < self._last_firm) or (ids[1:] < ids[:-1]).any():
+            raise ValueError(f"{self.path} is not sorted by firm_id; sort it by firm_id before running the batch engine")
+        self._last_firm = ids[-1]
+
+        self._buffer = chunk if self._buffer is None else pd.concat([self._buffer, chunk], ignore_index=True)
+
+    def _buffered_ids(self) -> np.ndarray:
+        return self._buffer['firm_id'].to_numpy() if self._buffer is not None else np.array([], dtype=object)
+
+    def complete_through(self) -> Optional[str]:
+        """Largest firm_id whose rows are all buffered, or None once the file is consumed"""
+        # Read until the buffer spans a firm boundary or the file ends
+        while not self.exhausted and (len(self._buffered_ids()) == 0 or
+                                      self._buffered_ids()[0] == self._buffered_ids()[-1]):
+            self._read_chunk()
+
+        ids = self._buffered_ids()
+        if len(ids) == 0:
+            return None
+        if self.exhausted:
+            return ids[-1]
+        # The last buffered firm may continue in the next chunk
+        return ids[np.searchsorted(ids, ids[-1]) - 1]
+
+    def take_through(self, firm_id: str) -> pd.DataFrame:
+        """Remove and return every row with firm_id <= the given firm"""
+        while not self.exhausted and (len(self._buffered_ids()) == 0 or self._buffered_ids()[-1] <= firm_id):
+            self._read_chunk()
+
+        if self._buffer is None:
+            return pd.read_csv(self.path, nrows=0, dtype={'firm_id': str})
+
+        split = np.searchsorted(self._buffered_ids(), firm_id, side='right')
+        taken = self._buffer.iloc[:split].reset_index(drop=True)
+        self._buffer = self._buffer.iloc[split:].reset_index(drop=True)
+        return taken
+
+
+class _CsvAppender:
+    """Appends frames to a temporary CSV with a fixed header, moved into place on close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.columns = None
+        self.rows = 0
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.columns is None:
+            self.columns = list(df.columns)
+            df.to_csv(self.tmp_path, index=False)
+        else:
+            df.reindex(columns=self.columns).to_csv(self.tmp_path, mode='a', header=False, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.columns is not None:
+            os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def run_batch(raw_path: str, output_path: str, chunk_rows: int = 200000,
+              raw_files: Optional[Dict[str, str]] = None, verbose: bool = True, workers: int = 1) -> Dict:
+    """Run the scoring pipeline over the raw files chunk by chunk and write the output tables"""
+    raw_files = raw_files or RAW_FILES
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    os.makedirs(output_path, exist_ok=True)
+    start = time.perf_counter()
+
+    readers = {key: FirmChunkReader(os.path.join(raw_path, filename), chunk_rows)
+               for key, filename in raw_files.items()}
+    writers = {key: _CsvAppender(os.path.join(output_path, filename)) for key, filename in OUTPUT_FILES.items()}
+
+    chunks = 0
+    try:
+        while True:
+            bound = readers[DRIVER_TABLE].complete_through()
+            if bound is None:
+                break
+
+            tables = {key: reader.take_through(bound) for key, reader in readers.items()}
+            chunk = (tables['company_info'], tables['income_info'], tables['balance_sheet'], tables['cash_flow'])
+            if pool is None:
+                df_ratios, df_agg, df_credit_score = compute_credit_tables(*chunk)
+            else:
+                df_ratios, df_agg, df_credit_score = run_sharded(*chunk, workers=workers, executor=pool)
+
+            writers['ratios'].append(df_ratios)
+            writers['agg'].append(df_agg)
+            writers['credit_score'].append(df_credit_score)
+            chunks += 1
+
+            if verbose:
+                print(f"  ✓ Chunk {chunks}: firms up to {bound}, {len(df_credit_score)} scored "
+                      f"({writers['credit_score'].rows} total)")
+    except Exception:
+        # Leave any previous outputs untouched
+        for writer in writers.values():
+            writer.discard()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for writer in writers.values():
+        writer.close()
+
+    return {
+        'chunks': chunks,
+        'ratios_rows': writers['ratios'].rows,
+        'agg_rows': writers['agg'].rows,
+        'credit_rows': writers['credit_score'].rows,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Chunked batch run of the credit scoring pipeline")
+    parser.add_argument('--raw-path', default='./raw/', help="Directory with the raw firm_id-sorted CSV files")
+    parser.add_argument('--output-path', default='./data/')
+    parser.add_argument('--chunk-rows', type=int, default=200000, help="Rows read per file per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Processes scoring each chunk's firm_id shards")
+    parser.add_argument('--company-info', default=RAW_FILES['company_info'])
+    parser.add_argument('--income-statement', default=RAW_FILES['income_info'])
+    parser.add_argument('--balance-sheet', default=RAW_FILES['balance_sheet'])
+    parser.add_argument('--cash-flow', default=RAW_FILES['cash_flow'])
+
+    args = parser.parse_args(argv)
+    raw_files = {
+        'company_info': args.company_info,
+        'income_info': args.income_statement,
+        'balance_sheet': args.balance_sheet,
+        'cash_flow': args.cash_flow
+    }
+
+    print("=" * 70)
+    print("CREDIT SCORING BATCH RUN")
+    print("=" * 70)
+    summary = run_batch(args.raw_path, args.output_path, args.chunk_rows, raw_files, workers=args.workers)
+    print("=" * 70)
+    print(f"✅ {summary['credit_rows']} firms scored in {summary['chunks']} chunks ({summary['seconds']:.1f}s)")
+    print(f"   - df_ratios: {summary['ratios_rows']} rows")
+    print(f"   - df_agg: {summary['agg_rows']} rows")
+    print(f"   - df_credit_score: {summary['credit_rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
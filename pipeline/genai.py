@@ -0,0 +1,603 @@
+"""
+Concurrent GenAI enrichment of df_credit_score.
+
+Each scored firm gets eight analyst texts (seven aspect analyses plus the
+overall recommendation), built from the notebook's prompts. Requests run on an
+asyncio event loop with:
+- a concurrency limit on in-flight requests
+- a token-bucket rate limiter (requests per second, with a burst allowance)
+- exponential-backoff retries with jitter for transient failures
+- a JSONL checkpoint of finished firms, so an interrupted run resumes where it stopped
+
+In 'combined' mode each firm sends one prompt asking for all eight texts as a
+JSON object instead of eight prompts that each repeat the system prompt;
+sections missing from an invalid reply are requested separately.
+
+The model backend is pluggable (GenAIClient): GeminiClient wraps
+google-generativeai, HttpClient talks to any JSON endpoint such as the local
+stub server in pipeline.genai_stub for offline tests and benchmarks.
+
+Usage:
+    from pipeline.genai import GeminiClient, enrich_credit_scores
+    df_enriched, summary = enrich_credit_scores(df_credit_score, df_agg, GeminiClient(api_key),
+                                                concurrency=16, requests_per_second=10,
+                                                checkpoint_path='genai_checkpoint.jsonl')
+
+    # or, from code already running an event loop (Jupyter, Colab)
+    df_enriched, summary = await aenrich_credit_scores(df_credit_score, df_agg, GeminiClient(api_key))
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+DEFAULT_MODEL = 'gemini-2.0-flash'
+
+# Output columns in the order the notebook adds them
+ANALYSIS_COLUMNS = [
+    'liquidity_analysis', 'solvency_analysis', 'profitability_analysis', 'activity_analysis',
+    'coverage_analysis', 'cashflow_analysis', 'structure_analysis', 'genai_recommendation'
+]
+
+# Request modes: eight prompts per firm, or one JSON prompt per firm
+MODES = ['sections', 'combined']
+# Line of the combined prompt listing the expected JSON keys
+COMBINED_KEYS_PREFIX = 'Keys: '
+
+# Text stored when the model returns an empty response
+EMPTY_TEXT = {col: "Analysis unavailable" for col in ANALYSIS_COLUMNS}
+EMPTY_TEXT['genai_recommendation'] = "Recommendation unavailable"
+
+# System prompt for credit analyst persona
+SYSTEM_PROMPT = """You are a senior credit analyst with 15+ years of experience in corporate lending,
+financial statement analysis, and credit risk assessment. Your expertise spans multiple industries and
+geographic markets. You provide clear, actionable, and professional credit analysis grounded in financial
+metrics and industry standards.
+
+IMPORTANT GUIDELINES:
+- Use data-driven language backed by the quantitative metrics provided
+- Provide concise but comprehensive analysis (2-3 sentences per aspect)
+- Highlight key drivers of credit strength or weakness
+- Identify specific risks and mitigation opportunities
+- Use professional terminology appropriate for board-level reporting
+- Ground all statements in the actual financial ratios and trends provided
+- Be objective and balanced in assessment
+- When metrics are weak, suggest specific areas needing improvement
+- When metrics are strong, explain the competitive advantage
+"""
+
+
+class GenAIError(Exception):
+    """A request the backend rejected for good (not retried)"""
+
+
+class GenAIClient:
+    """Backend interface: one prompt in, one text out"""
+
+    model_name = ''
+
+    async def generate(self, system_prompt: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class GeminiClient(GenAIClient):
+    """Google Gemini through google-generativeai (optional dependency)"""
+
+    def __init__(self, api_key: str, model_name: str = DEFAULT_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    async def generate(self, system_prompt: str, prompt: str) -> str:
+        # The notebook sends the persona and the aspect prompt as one text
+        response = await self._model.generate_content_async(system_prompt + "\n\n" + prompt)
+        return response.text
+
+
+class HttpClient(GenAIClient):
+    """
+    Minimal asyncio HTTP client for a JSON completion endpoint.
+
+    POSTs {"model", "system_prompt", "prompt"} and reads {"text"} from the reply, whose body may be sized by
+    Content-Length, sent with Transfer-Encoding: chunked, or delimited by the server closing the connection.
+    429 and 5xx replies are raised as retryable errors, other 4xx as GenAIError.
+    """
+
+    def __init__(self, url: str, model_name: str = 'stub', timeout: float = 60.0):
+        self.url = url
+        self.model_name = model_name
+        self.timeout = timeout
+        parts = urlsplit(url)
+        self._host = parts.hostname
+        self._port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self._ssl = parts.scheme == 'https'
+        self._path = parts.path or '/'
+
+    async def generate(self, system_prompt: str, prompt: str) -> str:
+        payload = json.dumps({'model': self.model_name, 'system_prompt': system_prompt, 'prompt': prompt}).encode()
+        status, body = await asyncio.wait_for(self._post(payload), self.timeout)
+        if status == 429 or status >= 500:
+            raise ConnectionError(f"HTTP {status} from {self.url}")
+        if status >= 400:
+            raise GenAIError(f"HTTP {status} from {self.url}: {body[:200]!r}")
+        return json.loads(body)['text']
+
+    async def _post(self, payload: bytes) -> Tuple[int, bytes]:
+        reader, writer = await asyncio.open_connection(self._host, self._port, ssl=self._ssl or None)
+        try:
+            writer.write((f"POST {self._path} HTTP/1.1\r\nHost: {self._host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n").encode() + payload)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length, chunked = None, False
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                if name == 'content-length':
+                    length = int(value.strip())
+                elif name == 'transfer-encoding':
+                    chunked = 'chunked' in value.lower()
+            if chunked:
+                body = await self._read_chunked(reader)
+            else:
+                body = await (reader.readexactly(length) if length is not None else reader.read())
+            return status, body
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        """Body of a Transfer-Encoding: chunked reply (trailers are skipped)"""
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()  # CRLF closing the chunk
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        return b''.join(chunks)
+
+
+class _NoLimit:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NO_LIMIT = _NoLimit()
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Aspect prompts of the notebook: (output column, reason/score prefix, what is assessed, points to cover)
+ASPECT_PROMPTS = [
+    ('liquidity_analysis', 'liquidity', "liquidity position", [
+        "The company's ability to meet short-term obligations",
+        "Trend direction (improving/stable/deteriorating)",
+        "Any liquidity concerns or strengths relative to industry norms",
+        "Recommended monitoring points if applicable"]),
+    ('solvency_analysis', 'solvency', "solvency and capital structure", [
+        "The company's long-term financial stability and leverage position",
+        "Debt sustainability relative to asset base and earnings",
+        "Capital structure trends and refinancing risk",
+        "Covenant headroom or distress signals if applicable"]),
+    ('profitability_analysis', 'profitability', "profitability and operational efficiency", [
+        "The company's earnings power and margin sustainability",
+        "Return on assets and equity relative to cost of capital",
+        "Trend in profitability (improving/stable/deteriorating)",
+        "Impact on debt service capacity and reinvestment capability"]),
+    ('activity_analysis', 'activity', "working capital management and asset efficiency", [
+        "Efficiency of inventory management and receivables collection",
+        "Operating cycle length and working capital demands",
+        "Cash conversion cycle effectiveness",
+        "Any seasonal or cyclical patterns affecting cash flow"]),
+    ('coverage_analysis', 'coverage', "debt service capacity and interest coverage", [
+        "Adequacy of EBIT and cash flow to service debt obligations",
+        "Buffer between debt service requirements and operational capacity",
+        "Trend in coverage ratios and deterioration/improvement signals",
+        "Default risk assessment based on these metrics"]),
+    ('cashflow_analysis', 'cashflow', "cash flow generation and quality", [
+        "Quality and sustainability of cash flow from operations",
+        "Reinvestment capacity relative to capex requirements",
+        "Free cash flow adequacy for debt reduction and shareholder returns",
+        "Cash flow trends and funding flexibility"]),
+    ('structure_analysis', 'structure', "financial structure and sources/uses of funds", [
+        "Balance of internally generated versus externally financed funding",
+        "Equity cushion and balance sheet resilience",
+        "Sustainability of capital structure given earnings retention",
+        "Vulnerability to market shocks or covenant violations"]),
+]
+
+RECOMMENDATION_POINTS = [
+    "Concisely summarizes the credit quality (strong/acceptable/concerning)",
+    "Identifies the 1-2 primary credit strengths supporting approval",
+    "Highlights the 1-2 key risks requiring monitoring or mitigation",
+    "Suggests specific covenants, collateral requirements, or monitoring metrics if applicable"
+]
+
+
+def _metric(row, col):
+    """Metric value from a merged firm row, 0 when missing (as in the notebook)"""
+    return row[col] if col in row and pd.notna(row[col]) else 0
+
+
+def _financial_ratios(row) -> Dict[str, str]:
+    """The 'Financial Ratios' line of each aspect prompt, keyed by output column"""
+    def m(col):
+        return _metric(row, col)
+
+    return {
+        'liquidity_analysis': f"Current Ratio = {m('current_ratio_last'):.2f}, Quick Ratio = {m('quick_ratio_last'):.2f}",
+        'solvency_analysis': (f"Debt-to-Equity = {m('debt_to_equity_last'):.2f}, "
+                              f"Debt-to-Assets = {m('debt_to_asset_last'):.2f}"),
+        'profitability_analysis': (f"ROA = {m('roa_last')*100:.1f}%, ROE = {m('roe_last')*100:.1f}%, "
+                                   f"Net Profit Margin = {m('net_profit_margin_last')*100:.1f}%"),
+        'activity_analysis': (f"Days Inventory = {m('days_inventory_last'):.0f}d, "
+                              f"Days Receivable = {m('days_receivable_last'):.0f}d, "
+                              f"Days Payable = {m('days_payable_last'):.0f}d"),
+        'coverage_analysis': (f"Interest Coverage Ratio = {m('interest_coverage_last'):.2f}x, "
+                              f"DSCR = {m('dscr_last'):.2f}x"),
+        'cashflow_analysis': (f"Operating CF Ratio = {m('ocf_ratio_last'):.2f}x, "
+                              f"Free Cash Flow = {m('free_cash_flow_last'):.0f}, "
+                              f"Cash Quality Ratio = {m('cash_quality_ratio_last'):.2f}"),
+        'structure_analysis': (f"Fund Flow Balance = {m('fund_flow_balance_last'):.0f}, "
+                               f"Equity-to-Assets = {m('equity_to_assets_last')*100:.1f}%"),
+    }
+
+
+def _aspect_data(row) -> Dict[str, str]:
+    """Metric data, score and ratios block of each aspect, keyed by output column"""
+    ratios = _financial_ratios(row)
+    return {
+        col: (f"Metric Data: {row[f'{aspect}_reason']}\n"
+              f"Score: {row[f'{aspect}_score']:.1f}/100\n"
+              f"Financial Ratios: {ratios[col]}")
+        for col, aspect, _, _ in ASPECT_PROMPTS
+    }
+
+
+def _recommendation_data(row) -> str:
+    """Overall score, aspect scores and reasoning block of the recommendation prompt"""
+    aspect_scores = "\n".join(
+        f"- {aspect.capitalize()}: {row[f'{aspect}_score']:.1f} ({row[f'{aspect}_status']})"
+        for _, aspect, _, _ in ASPECT_PROMPTS
+    )
+    return f"""OVERALL ASSESSMENT:
+- Final Score: {row['final_score']:.1f}/100
+- Category: {row['kategori']}
+- Initial Recommendation: {row['rekomendasi']}
+
+ASPECT SCORES:
+{aspect_scores}
+
+OVERALL REASONING: {row['reasoning']}"""
+
+
+def _numbered(points: List[str]) -> str:
+    return "\n".join(f"{i}. {point}" for i, point in enumerate(points, 1))
+
+
+def build_firm_prompts(row) -> Dict[str, str]:
+    """The eight prompts for one firm row (df_credit_score merged with df_agg), keyed by output column"""
+    data = _aspect_data(row)
+    prompts = {
+        col: f"""As a senior credit analyst, provide a professional assessment of this company's {focus}:
+
+{data[col]}
+
+Provide 2-3 sentences analyzing:
+{_numbered(points)}
+
+Keep analysis professional, data-driven, and suitable for credit committee review."""
+        for col, _, focus, points in ASPECT_PROMPTS
+    }
+
+    prompts['genai_recommendation'] = f"""As a senior credit analyst preparing a credit committee recommendation:
+
+{_recommendation_data(row)}
+
+Based on this comprehensive credit analysis, provide a 3-4 sentence professional credit recommendation that:
+{_numbered(RECOMMENDATION_POINTS)}
+
+Format as actionable guidance suitable for immediate credit committee decision-making."""
+    return prompts
+
+
+def build_combined_prompt(row) -> str:
+    """One prompt asking for all eight texts of a firm as a JSON object keyed by output column"""
+    data = _aspect_data(row)
+    sections = "\n\n".join(
+        f"[{col}] {focus.upper()}\n{data[col]}\nCover: {'; '.join(points)}"
+        for col, _, focus, points in ASPECT_PROMPTS
+    )
+    return f"""As a senior credit analyst, prepare the full credit committee assessment of this company.
+
+{sections}
+
+[genai_recommendation] CREDIT RECOMMENDATION
+{_recommendation_data(row)}
+Cover: {'; '.join(RECOMMENDATION_POINTS)}
+
+Write 2-3 professional, data-driven sentences for each aspect section and a 3-4 sentence actionable credit
+recommendation suitable for immediate credit committee decision-making.
+Respond with only a JSON object (no markdown) mapping each of these keys to its text:
+{COMBINED_KEYS_PREFIX}{json.dumps(ANALYSIS_COLUMNS)}"""
+
+
+def parse_combined_response(text: str) -> Dict[str, str]:
+    """The valid sections of a combined JSON reply (non-empty strings under known keys); {} if unparseable"""
+    if not text:
+        return {}
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        return {}
+    try:
+        payload = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    return {
+        col: payload[col].strip() for col in ANALYSIS_COLUMNS
+        if isinstance(payload.get(col), str) and payload[col].strip()
+    }
+
+
+def merge_genai_inputs(df_credit: pd.DataFrame, df_agg: pd.DataFrame) -> pd.DataFrame:
+    """df_credit with the df_agg _last / _trend / _std columns the prompts read"""
+    agg_cols = [c for c in df_agg.columns if '_last' in c or '_trend' in c or '_std' in c]
+    agg_cols = [c for c in agg_cols if c not in df_credit.columns]
+    return df_credit.merge(df_agg[['firm_id'] + agg_cols], on='firm_id', how='left')
+
+
+def load_checkpoint(path: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Finished firms from a JSONL checkpoint (a torn last line from a crash is ignored)"""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[record['firm_id']] = {col: record.get(col, '') for col in ANALYSIS_COLUMNS}
+    return done
+
+
+class GenAIEnricher:
+    """Runs the per-firm prompts through a client with concurrency, rate limiting and retries"""
+
+    def __init__(self, client: GenAIClient, concurrency: int = 8, requests_per_second: Optional[float] = None,
+                 burst: Optional[float] = None, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, system_prompt: str = SYSTEM_PROMPT, cache=None,
+                 mode: str = 'sections'):
+        self.client = client
+        self.mode = mode
+        self.cache = cache
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.system_prompt = system_prompt
+        self.stats = {'requests': 0, 'retries': 0, 'failed_requests': 0, 'firms_resumed': 0,
+                      'cache_hits': 0, 'cache_misses': 0, 'input_chars': 0, 'section_fallbacks': 0}
+        self._semaphore = None
+        self._bucket = None
+
+    async def complete(self, prompt: str) -> str:
+        """Cached response, or one model call retried with exponential backoff on transient errors"""
+        if self.cache is None:
+            return await self._request(prompt)
+
+        model_name = getattr(self.client, 'model_name', '')
+        cached = self.cache.get(model_name, self.system_prompt, prompt)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        self.stats['cache_misses'] += 1
+        text = await self._request(prompt)
+        self.cache.put(model_name, self.system_prompt, prompt, text)
+        return text
+
+    async def _request(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            async with self._semaphore or _NO_LIMIT:
+                self.stats['requests'] += 1
+                self.stats['input_chars'] += len(self.system_prompt) + len(prompt)
+                try:
+                    return await self.client.generate(self.system_prompt, prompt)
+                except GenAIError:
+                    raise
+                except Exception:
+                    if attempt >= self.max_retries:
+                        raise
+            # Back off outside the semaphore so other requests keep flowing
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, self.backoff_base))
+            attempt += 1
+            self.stats['retries'] += 1
+
+    async def enrich_firm(self, row) -> Tuple[Dict[str, str], bool]:
+        """The eight texts for one firm and whether all of them succeeded"""
+        prompts = build_firm_prompts(row)
+        texts = {}
+        if self.mode == 'combined':
+            try:
+                texts = parse_combined_response(await self.complete(build_combined_prompt(row)))
+            except Exception:
+                texts = {}
+            # Sections missing from the JSON reply fall back to their own prompt
+            self.stats['section_fallbacks'] += len(prompts) - len(texts)
+
+        pending = [col for col in prompts if col not in texts]
+        results = await asyncio.gather(*[self.complete(prompts[col]) for col in pending], return_exceptions=True)
+
+        ok = True
+        for col, result in zip(pending, results):
+            if isinstance(result, Exception):
+                texts[col] = f"Error: {str(result)}"
+                self.stats['failed_requests'] += 1
+                ok = False
+            else:
+                texts[col] = result if result else EMPTY_TEXT[col]
+        return {col: texts[col] for col in prompts}, ok
+
+    async def enrich(self, df_merged: pd.DataFrame, checkpoint_path: Optional[str] = None,
+                     verbose: bool = True) -> Dict[str, Dict[str, str]]:
+        """Texts for every firm of df_merged, reusing and extending the checkpoint"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(self.requests_per_second, self.burst) if self.requests_per_second else None
+
+        results = load_checkpoint(checkpoint_path)
+        pending = [row for _, row in df_merged.iterrows() if row['firm_id'] not in results]
+        self.stats['firms_resumed'] = len(df_merged) - len(pending)
+        total = len(pending)
+
+        queue = asyncio.Queue()
+        for row in pending:
+            queue.put_nowait(row)
+
+        checkpoint = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+        finished = 0
+
+        async def worker():
+            nonlocal finished
+            while not queue.empty():
+                row = queue.get_nowait()
+                texts, ok = await self.enrich_firm(row)
+                results[row['firm_id']] = texts
+                finished += 1
+                # Failed firms stay out of the checkpoint so a rerun retries them
+                if checkpoint is not None and ok:
+                    checkpoint.write(json.dumps({'firm_id': row['firm_id'], **texts}) + '\n')
+                    checkpoint.flush()
+                if verbose and (finished % 100 == 0 or finished == total):
+                    print(f"  [{finished}/{total}] firms enriched ({self.stats['requests']} requests, "
+                          f"{self.stats['retries']} retries)")
+
+        try:
+            # Each worker keeps one firm's eight prompts in flight; the semaphore bounds total requests
+            await asyncio.gather(*[worker() for _ in range(max(1, self.concurrency))])
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        return results
+
+
+async def aenrich_credit_scores(df_credit: pd.DataFrame, df_agg: pd.DataFrame, client: GenAIClient,
+                                concurrency: int = 8, requests_per_second: Optional[float] = None,
+                                max_retries: int = 5, backoff_base: float = 0.5, checkpoint_path: Optional[str] = None,
+                                cache=None, mode: str = 'sections', verbose: bool = True) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Add the GenAI analysis columns to df_credit (await this from code already running an event loop,
+    e.g. a Jupyter or Colab cell; enrich_credit_scores is the blocking form).
+    cache: optional pipeline.genai_cache.ResponseCache; prompts found there are not sent
+    mode: 'sections' (eight prompts per firm) or 'combined' (one JSON prompt per firm, sections missing
+          from the reply are requested separately)
+    Returns: (df_credit with ANALYSIS_COLUMNS, run summary)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+
+    start = time.perf_counter()
+    enricher = GenAIEnricher(client, concurrency=concurrency, requests_per_second=requests_per_second,
+                             max_retries=max_retries, backoff_base=backoff_base, cache=cache, mode=mode)
+    df_merged = merge_genai_inputs(df_credit, df_agg)
+
+    try:
+        results = await enricher.enrich(df_merged, checkpoint_path, verbose)
+    finally:
+        await client.close()
+
+    df = df_credit.copy()
+    for col in ANALYSIS_COLUMNS:
+        df[col] = [results.get(firm_id, {}).get(col, '') for firm_id in df['firm_id']]
+
+    lookups = enricher.stats['cache_hits'] + enricher.stats['cache_misses']
+    summary = dict(enricher.stats, firms=len(df), seconds=time.perf_counter() - start,
+                   cache_hit_rate=enricher.stats['cache_hits'] / lookups if lookups else 0.0)
+    return df, summary
+
+
+def enrich_credit_scores(df_credit: pd.DataFrame, df_agg: pd.DataFrame, client: GenAIClient,
+                         concurrency: int = 8, requests_per_second: Optional[float] = None,
+                         max_retries: int = 5, backoff_base: float = 0.5, checkpoint_path: Optional[str] = None,
+                         cache=None, mode: str = 'sections', verbose: bool = True) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Blocking form of aenrich_credit_scores (same arguments and result).
+    Inside a running event loop (Jupyter, Colab) the enrichment runs on its own loop in a worker thread.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+
+    enrichment = aenrich_credit_scores(df_credit, df_agg, client, concurrency=concurrency,
+                                       requests_per_second=requests_per_second, max_retries=max_retries,
+                                       backoff_base=backoff_base, checkpoint_path=checkpoint_path, cache=cache,
+                                       mode=mode, verbose=verbose)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(enrichment)
+
+    # asyncio.run() cannot be nested in a running loop; this thread blocks until the worker's loop finishes
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='genai-enrichment') as executor:
+        return executor.submit(asyncio.run, enrichment).result()
+
+
+def summary_lines(summary: Dict) -> List[str]:
+    """Human-readable run summary"""
+    lines = [
+        f"   - Firms: {summary['firms']} ({summary['firms_resumed']} from checkpoint)",
+        f"   - Requests: {summary['requests']} ({summary['retries']} retries, {summary['failed_requests']} failed, "
+        f"{summary['input_chars']:,} input characters)"
+    ]
+    if summary.get('section_fallbacks'):
+        lines.append(f"   - Sections re-requested after an invalid combined reply: {summary['section_fallbacks']}")
+    if summary.get('cache_hits') or summary.get('cache_misses'):
+        lines.append(f"   - Cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses "
+                     f"({summary['cache_hit_rate']:.0%} hit rate)")
+    lines.append(f"   - Time: {summary['seconds']:.1f}s")
+    return lines
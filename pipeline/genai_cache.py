@@ -0,0 +1,132 @@
+"""
+Persistent response cache for the GenAI enrichment stage.
+
+Responses are stored in a SQLite file keyed by the sha256 of (model name,
+system prompt, rendered prompt), so a rerun over firms whose reasons and scores
+did not change sends no requests. Entries can be evicted by age and by total
+size (least recently used first). Hit and miss counts feed the run summary.
+Hits only touch memory: their last-used times are written in one transaction
+by evict() / close(), so a fully cached rerun does not commit per lookup.
+
+Usage:
+    from pipeline.genai_cache import ResponseCache
+    cache = ResponseCache('data/genai_cache.sqlite', max_age_days=90, max_bytes=500_000_000)
+    df_enriched, summary = enrich_credit_scores(df_credit_score, df_agg, client, cache=cache)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+CACHE_FILE = 'genai_cache.sqlite'
+
+
+def cache_key(model_name: str, system_prompt: str, prompt: str) -> str:
+    """Content address of one request"""
+    return hashlib.sha256(json.dumps([model_name, system_prompt, prompt]).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with age / size eviction and hit counters"""
+
+    def __init__(self, path: str, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # key -> last hit time, not yet written to the responses table
+        self._used = {}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # enrich_credit_scores may use the cache from its worker thread (never from two threads at once)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                created REAL,
+                last_used REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, model_name: str, system_prompt: str, prompt: str) -> Optional[str]:
+        """Cached response, or None (expired entries count as misses)"""
+        key = cache_key(model_name, system_prompt, prompt)
+        row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.max_age_days is not None and now - row[1] > self.max_age_days * 86400):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._used[key] = now
+        return row[0]
+
+    def put(self, model_name: str, system_prompt: str, prompt: str, response: str):
+        """Store a response (empty responses are not cached)"""
+        if not response:
+            return
+        now = time.time()
+        key = cache_key(model_name, system_prompt, prompt)
+        self._used.pop(key, None)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model_name, response, len(response.encode('utf-8')), now, now)
+        )
+        self._conn.commit()
+
+    def evict(self) -> int:
+        """Write pending hit times, then drop expired entries and least recently used ones over the limits"""
+        if self._used:
+            self._conn.executemany("UPDATE responses SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._used.items()])
+            self._used = {}
+        before = self._conn.total_changes
+        if self.max_age_days is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age_days * 86400,))
+        if self.max_entries is not None:
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+        if self.max_bytes is not None:
+            # Keep the most recently used entries whose running size fits the budget
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running
+                        FROM responses
+                    ) WHERE running > ?
+                )
+            """, (self.max_bytes,))
+        self._conn.commit()
+        return self._conn.total_changes - before
+
+    def stats(self) -> Dict:
+        """Hit / miss counts of this session and the stored entry count and size"""
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def close(self):
+        self.evict()
+        self._conn.close()
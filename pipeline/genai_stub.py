@@ -0,0 +1,144 @@
+"""
+Local HTTP stand-in for the GenAI backend.
+
+Answers the JSON requests of pipeline.genai.HttpClient with a deterministic
+text derived from the prompt, after a configurable latency (a JSON object of
+such texts when the prompt is a combined-mode prompt asking for JSON keys). A share of
+requests can be failed with 429 / 503 to exercise the retry path. Used by the
+GenAI tests and benchmarks so they run offline.
+
+Usage:
+    python -m pipeline.genai_stub --port 8765 --latency 0.2 --failure-rate 0.05
+    # then HttpClient('http://127.0.0.1:8765/generate')
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from pipeline.genai import COMBINED_KEYS_PREFIX
+
+
+def stub_text(prompt: str) -> str:
+    """Deterministic reply for a prompt"""
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+    first_line = prompt.strip().splitlines()[0] if prompt.strip() else ''
+    return f"[stub {digest}] Analysis for: {first_line[:80]}"
+
+
+def stub_reply(prompt: str) -> str:
+    """stub_text, or a JSON object of per-key stub texts when the prompt lists the keys it expects"""
+    for line in reversed(prompt.strip().splitlines()):
+        if line.startswith(COMBINED_KEYS_PREFIX):
+            try:
+                keys = json.loads(line[len(COMBINED_KEYS_PREFIX):])
+            except ValueError:
+                break
+            return json.dumps({key: stub_text(f"[{key}] {prompt}") for key in keys})
+    return stub_text(prompt)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server with latency / failure settings and request counters"""
+
+    daemon_threads = True
+    # Room for many concurrent clients (socketserver's default backlog is 5)
+    request_queue_size = 256
+
+    def __init__(self, address, latency: float = 0.05, failure_rate: float = 0.0, seed: int = 0,
+                 chunked: bool = False):
+        super().__init__(address, _StubHandler)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        # Send bodies with Transfer-Encoding: chunked instead of Content-Length
+        self.chunked = chunked
+        self.request_count = 0
+        self.failure_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/generate"
+
+    def next_outcome(self) -> bool:
+        """Count a request and decide whether it fails"""
+        with self._lock:
+            self.request_count += 1
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failure_count += 1
+            return failed
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            prompt = request['prompt']
+        except (ValueError, KeyError):
+            self._reply(400, {'error': 'expected a JSON body with a prompt'})
+            return
+
+        time.sleep(self.server.latency)
+        if self.server.next_outcome():
+            self._reply(self.server._random.choice([429, 503]), {'error': 'simulated failure'})
+            return
+        self._reply(200, {'text': stub_reply(prompt)})
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            half = len(data) // 2
+            for chunk in (data[:half], data[half:], b''):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            return
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, latency: float = 0.05, failure_rate: float = 0.0, seed: int = 0,
+                      chunked: bool = False) -> Tuple[StubServer, threading.Thread]:
+    """Serve in a background thread; port 0 picks a free port (see server.url). Stop with server.shutdown()"""
+    server = StubServer(('127.0.0.1', port), latency=latency, failure_rate=failure_rate, seed=seed,
+                        chunked=chunked)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def main(argv: Optional[list] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Local stub server for the GenAI enrichment stage")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds per request")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of requests answered with 429/503")
+    args = parser.parse_args(argv)
+
+    server = StubServer(('127.0.0.1', args.port), latency=args.latency, failure_rate=args.failure_rate)
+    print(f"GenAI stub listening on {server.url} (latency {args.latency}s, failure rate {args.failure_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Incremental refresh of the credit scoring outputs.
+
+A manifest keeps one hash per firm for each statement file (income statement,
+balance sheet, cash flow). On a refresh the raw files are streamed in
+firm-aligned chunks (as in pipeline.batch, so they must be sorted by firm_id)
+and hashed chunk by chunk; only firms whose rows changed, were added or were
+removed go through the calculate_ratios -> aggregate_multi_year ->
+score_aspects -> classify_credit steps.
+
+The refresh keeps its copy of df_ratios / df_agg / df_credit_score in firm
+shards (crc32 of firm_id, see pipeline.parallel.shard_of) under
+<output-path>/shards/, and only the shards holding changed or removed firms are
+read, patched and rewritten. The dashboard tables are then re-exported by
+concatenating the shard files byte for byte, without parsing them. When the
+exported tables are rewritten outside the refresh (a pipeline.batch or notebook
+run), they are split into shards again on the next run.
+
+Every pipeline step works per firm, so a patched table holds the rows a full
+run over the new raw files would give (grouped by shard, ordered by firm_id
+within each shard). Columns that only the full notebook run adds to
+df_credit_score (the GenAI analysis text) are kept for unchanged firms and
+cleared for recomputed ones.
+
+Usage:
+    python -m pipeline.incremental --raw-path ./raw/ --output-path ./data/
+    python -m pipeline.incremental --raw-path ./raw/ --output-path ./data/ --manifest-only
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pipeline.batch import DRIVER_TABLE, OUTPUT_FILES, RAW_FILES, FirmChunkReader, _CsvAppender
+from pipeline.credit_analysis import compute_credit_tables
+from pipeline.parallel import shard_of
+
+MANIFEST_FILE = 'pipeline_manifest.csv'
+SHARD_DIR = 'shards'
+SHARD_LAYOUT_FILE = 'layout.json'
+SHARD_LAYOUT_VERSION = 1
+DEFAULT_SHARDS = 64
+
+# Raw tables whose rows feed the scores (company_info is prefixed but not used by the ratio steps)
+HASHED_TABLES = ['income_info', 'balance_sheet', 'cash_flow']
+
+
+def firm_hashes(df: pd.DataFrame) -> pd.Series:
+    """One uint64 hash per firm over all of its rows (independent of row and column order)"""
+    if df.empty:
+        return pd.Series(dtype=np.uint64)
+
+    # Numeric columns as float so an int column gaining a NaN elsewhere does not flag every firm
+    normalized = df[sorted(df.columns)].copy()
+    numeric = normalized.select_dtypes('number').columns
+    normalized[numeric] = normalized[numeric].astype(float)
+    row_hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+    codes, firm_ids = pd.factorize(df['firm_id'], sort=True)
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(firm_ids)))
+    # uint64 addition wraps, giving an order-independent combination of the row hashes
+    combined = np.add.reduceat(row_hashes[order], starts)
+    return pd.Series(combined, index=pd.Index(firm_ids, name='firm_id'))
+
+
+def _manifest_from_hashes(hashes: Dict[str, pd.Series]) -> pd.DataFrame:
+    firm_ids = pd.Index(sorted(set().union(*(h.index for h in hashes.values()))), name='firm_id')
+    # Reindex with an integer fill: filling NaN would pass the hashes through float64 and lose bits
+    return pd.DataFrame({key: h.reindex(firm_ids, fill_value=0).astype(np.uint64) for key, h in hashes.items()},
+                        index=firm_ids)
+
+
+def build_manifest(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Per-firm hashes of the statement tables (0 where a firm has no rows in a table)"""
+    return _manifest_from_hashes({key: firm_hashes(tables[key]) for key in HASHED_TABLES})
+
+
+def load_manifest(path: str) -> Optional[pd.DataFrame]:
+    """Manifest written by save_manifest, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    manifest = pd.read_csv(path, dtype=str).set_index('firm_id')
+    return manifest.apply(lambda col: col.map(lambda h: int(h, 16))).astype(np.uint64)
+
+
+def save_manifest(manifest: pd.DataFrame, path: str):
+    """Write the manifest as hex strings (CSV has no uint64 type)"""
+    out = manifest.apply(lambda col: col.map(lambda h: f'{h:016x}'))
+    _replace_csv(out.reset_index(), path)
+
+
+def changed_firms(old: Optional[pd.DataFrame], new: pd.DataFrame):
+    """(firms to recompute, firms to drop) between two manifests"""
+    if old is None:
+        return new.index, pd.Index([], name='firm_id')
+
+    common = new.index.intersection(old.index)
+    differs = (new.loc[common] != old.loc[common, HASHED_TABLES]).any(axis=1)
+    changed = common[differs.to_numpy()].union(new.index.difference(old.index))
+    removed = old.index.difference(new.index)
+    return changed, removed
+
+
+def patch_table(stored: pd.DataFrame, fresh: pd.DataFrame, replaced: pd.Index) -> pd.DataFrame:
+    """Stored rows minus the replaced firms, plus the fresh rows, ordered by firm_id"""
+    kept = stored[~stored['firm_id'].isin(replaced)]
+    columns = list(stored.columns) + [c for c in fresh.columns if c not in stored.columns]
+    patched = pd.concat([kept, fresh], ignore_index=True).reindex(columns=columns)
+    return patched.sort_values('firm_id', kind='stable').reset_index(drop=True)
+
+
+def _replace_csv(df: pd.DataFrame, path: str):
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _read_output(path: str) -> pd.DataFrame:
+    # round_trip parsing so rows that are not touched are written back unchanged
+    return pd.read_csv(path, dtype={'firm_id': str}, float_precision='round_trip')
+
+
+def _file_fingerprint(path: str) -> Optional[list]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _shard_file(shard_path: str, key: str, shard: int) -> str:
+    """Path of one output table shard"""
+    return os.path.join(shard_path, key, f'shard-{shard:05d}.csv')
+
+
+def _load_layout(shard_path: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(shard_path, SHARD_LAYOUT_FILE)) as f:
+            layout = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return layout if layout.get('version') == SHARD_LAYOUT_VERSION else None
+
+
+def _save_layout(shard_path: str, shards: int, output_path: str):
+    """Record the shard count and the exported tables as they are now"""
+    layout = {
+        'version': SHARD_LAYOUT_VERSION,
+        'shards': shards,
+        'exported': {key: _file_fingerprint(os.path.join(output_path, filename))
+                     for key, filename in OUTPUT_FILES.items()}
+    }
+    tmp_path = os.path.join(shard_path, SHARD_LAYOUT_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(layout, f, indent=2)
+    os.replace(tmp_path, os.path.join(shard_path, SHARD_LAYOUT_FILE))
+
+
+def split_outputs(output_path: str, shards: int = DEFAULT_SHARDS, chunk_rows: int = 200000) -> bool:
+    """Split the exported output tables into firm shards (False if any of them is missing)"""
+    paths = {key: os.path.join(output_path, filename) for key, filename in OUTPUT_FILES.items()}
+    if not all(os.path.exists(path) for path in paths.values()):
+        return False
+
+    shard_path = os.path.join(output_path, SHARD_DIR)
+    tmp_path = shard_path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    for key, path in paths.items():
+        os.makedirs(os.path.join(tmp_path, key))
+        writers = {}
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={'firm_id': str}, float_precision='round_trip'):
+            chunk_shards = shard_of(chunk['firm_id'], shards)
+            for shard in np.unique(chunk_shards):
+                if shard not in writers:
+                    writers[shard] = _CsvAppender(_shard_file(tmp_path, key, int(shard)))
+                writers[shard].append(chunk[chunk_shards == shard])
+        for writer in writers.values():
+            writer.close()
+
+    _save_layout(tmp_path, shards, output_path)
+    shutil.rmtree(shard_path, ignore_errors=True)
+    os.replace(tmp_path, shard_path)
+    return True
+
+
+def _csv_header(path: str) -> List[str]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def export_outputs(output_path: str):
+    """Write the dashboard tables by concatenating the shard files (copied as text where the headers agree)"""
+    shard_path = os.path.join(output_path, SHARD_DIR)
+    for key, filename in OUTPUT_FILES.items():
+        key_path = os.path.join(shard_path, key)
+        files = sorted(os.path.join(key_path, name) for name in os.listdir(key_path) if name.endswith('.csv'))
+        if not files:
+            continue
+
+        # Column union in first-seen order, so a shard written before a column appeared still lines up
+        shard_columns = [_csv_header(path) for path in files]
+        columns = []
+        for names in shard_columns:
+            columns += [c for c in names if c not in columns]
+
+        target = os.path.join(output_path, filename)
+        with open(target + '.tmp', 'w', newline='', encoding='utf-8') as out:
+            pd.DataFrame(columns=columns).to_csv(out, index=False)
+            for path, names in zip(files, shard_columns):
+                if names == columns:
+                    with open(path, newline='', encoding='utf-8') as f:
+                        f.readline()
+                        shutil.copyfileobj(f, out)
+                else:
+                    _read_output(path).reindex(columns=columns).to_csv(out, header=False, index=False)
+        os.replace(target + '.tmp', target)
+
+
+def _firm_chunks(raw_path: str, raw_files: Dict[str, str], chunk_rows: int) -> Iterator[Dict[str, pd.DataFrame]]:
+    """Firm-aligned chunks of the raw tables, as pipeline.batch reads them
+
+    Chunks end at balance sheet firm boundaries and hold every row of their firms; rows of firms after the last
+    balance sheet firm come afterwards, one table per chunk (they are hashed but never scored).
+    """
+    readers = {key: FirmChunkReader(os.path.join(raw_path, filename), chunk_rows)
+               for key, filename in raw_files.items()}
+    while True:
+        bound = readers[DRIVER_TABLE].complete_through()
+        if bound is None:
+            break
+        yield {key: reader.take_through(bound) for key, reader in readers.items()}
+
+    for key, reader in readers.items():
+        bound = reader.complete_through()
+        while bound is not None:
+            yield {key: reader.take_through(bound)}
+            bound = reader.complete_through()
+
+
+def scan_raw(raw_path: str, raw_files: Dict[str, str], old_manifest: Optional[pd.DataFrame] = None,
+             score: bool = True, chunk_rows: int = 200000):
+    """
+    Hash the raw files chunk by chunk and score the firms that differ from old_manifest (all firms without one).
+    Returns: (manifest, fresh output tables by key, or None when score is False)
+    """
+    hashes = {key: [] for key in HASHED_TABLES}
+    fresh = {key: [] for key in OUTPUT_FILES}
+
+    for chunk in _firm_chunks(raw_path, raw_files, chunk_rows):
+        for key in HASHED_TABLES:
+            if key in chunk:
+                hashes[key].append(firm_hashes(chunk[key]))
+        # Firms without balance sheet rows drop out of the scoring steps
+        if not score or DRIVER_TABLE not in chunk:
+            continue
+
+        # A chunk holds all rows of its firms, so its manifest rows are final
+        changed, _ = changed_firms(old_manifest, build_manifest(chunk))
+        if len(changed):
+            subset = {key: df[df['firm_id'].isin(changed)] for key, df in chunk.items()}
+            outputs = compute_credit_tables(subset['company_info'], subset['income_info'],
+                                            subset['balance_sheet'], subset['cash_flow'])
+            for key, df in zip(OUTPUT_FILES, outputs):
+                fresh[key].append(df)
+
+    manifest = _manifest_from_hashes({key: pd.concat(parts) if parts else pd.Series(dtype=np.uint64)
+                                      for key, parts in hashes.items()})
+    if not score:
+        return manifest, None
+    return manifest, {key: pd.concat(parts, ignore_index=True) for key, parts in fresh.items() if parts}
+
+
+def write_manifest(raw_path: str, output_path: str, raw_files: Optional[Dict[str, str]] = None,
+                   manifest_path: Optional[str] = None, shards: Optional[int] = None,
+                   chunk_rows: int = 200000) -> int:
+    """Record the current raw files and output tables as scored (e.g. after a full pipeline.batch run)"""
+    raw_files = raw_files or RAW_FILES
+    manifest, _ = scan_raw(raw_path, raw_files, score=False, chunk_rows=chunk_rows)
+    layout = _load_layout(os.path.join(output_path, SHARD_DIR))
+    split_outputs(output_path, shards or (layout['shards'] if layout else DEFAULT_SHARDS), chunk_rows)
+    save_manifest(manifest, manifest_path or os.path.join(output_path, MANIFEST_FILE))
+    return len(manifest)
+
+
+def run_incremental(raw_path: str, output_path: str, raw_files: Optional[Dict[str, str]] = None,
+                    manifest_path: Optional[str] = None, shards: Optional[int] = None,
+                    chunk_rows: int = 200000, verbose: bool = True) -> Dict:
+    """Recompute only the firms whose statements changed and rewrite the output shards holding them"""
+    raw_files = raw_files or RAW_FILES
+    manifest_path = manifest_path or os.path.join(output_path, MANIFEST_FILE)
+    shard_path = os.path.join(output_path, SHARD_DIR)
+    os.makedirs(output_path, exist_ok=True)
+    start = time.perf_counter()
+
+    # Shards are (re)built from the exported tables when there are none or the tables were rewritten elsewhere
+    layout = _load_layout(shard_path)
+    shards = layout['shards'] if layout else (shards or DEFAULT_SHARDS)
+    exported = {key: _file_fingerprint(os.path.join(output_path, filename)) for key, filename in OUTPUT_FILES.items()}
+    if layout is None or layout['exported'] != exported:
+        if split_outputs(output_path, shards, chunk_rows):
+            layout = _load_layout(shard_path)
+            if verbose:
+                print(f"  ✓ Output tables split into {shards} shards")
+
+    # Without stored outputs every firm is recomputed
+    full_run = layout is None
+    old_manifest = None if full_run else load_manifest(manifest_path)
+    manifest, fresh = scan_raw(raw_path, raw_files, old_manifest, chunk_rows=chunk_rows)
+    changed, removed = changed_firms(old_manifest, manifest)
+    if verbose:
+        print(f"  ✓ {len(manifest)} firms hashed: {len(changed)} changed, {len(removed)} removed")
+
+    summary = {'firms': len(manifest), 'changed': len(changed), 'removed': len(removed), 'full_run': full_run}
+
+    if len(changed) or len(removed):
+        if full_run:
+            shutil.rmtree(shard_path, ignore_errors=True)
+
+        replaced = changed.union(removed)
+        affected = np.unique(shard_of(pd.Series(replaced, dtype=object), shards))
+        for key in OUTPUT_FILES:
+            os.makedirs(os.path.join(shard_path, key), exist_ok=True)
+            fresh_rows = fresh.get(key, pd.DataFrame(columns=['firm_id']))
+            # One stable reorder by (shard, firm_id): each shard's fresh rows are then a sorted contiguous slice
+            fresh_shards = shard_of(fresh_rows['firm_id'], shards)
+            order = np.lexsort((pd.factorize(fresh_rows['firm_id'], sort=True)[0], fresh_shards))
+            fresh_rows = fresh_rows.take(order).reset_index(drop=True)
+            bounds = np.searchsorted(fresh_shards[order], np.concatenate([affected, affected + 1]))
+            rows = 0
+            for i, shard in enumerate(affected):
+                path = _shard_file(shard_path, key, int(shard))
+                shard_fresh = fresh_rows.iloc[bounds[i]:bounds[len(affected) + i]]
+                if os.path.exists(path):
+                    patched = patch_table(_read_output(path), shard_fresh, replaced)
+                else:
+                    patched = shard_fresh
+
+                if patched.empty:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    _replace_csv(patched, path)
+                rows += len(patched)
+            summary[f'{key}_rows'] = rows
+
+        export_outputs(output_path)
+        _save_layout(shard_path, shards, output_path)
+        summary['shards_rewritten'] = len(affected)
+        summary['scored'] = len(fresh['credit_score']) if 'credit_score' in fresh else 0
+
+    # Written last: an interrupted refresh recomputes the same firms next time
+    save_manifest(manifest, manifest_path)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Incremental refresh of the credit scoring outputs")
+    parser.add_argument('--raw-path', default='./raw/', help="Directory with the raw firm_id-sorted CSV files")
+    parser.add_argument('--output-path', default='./data/')
+    parser.add_argument('--manifest-path', default=None,
+                        help=f"Per-firm hash manifest (default: <output-path>/{MANIFEST_FILE})")
+    parser.add_argument('--manifest-only', action='store_true',
+                        help="Only record the current raw files as scored, e.g. after a full batch run")
+    parser.add_argument('--chunk-rows', type=int, default=200000, help="Rows read per file per chunk")
+    parser.add_argument('--shards', type=int, default=None,
+                        help=f"Output shards when they are first created (default: {DEFAULT_SHARDS})")
+    parser.add_argument('--company-info', default=RAW_FILES['company_info'])
+    parser.add_argument('--income-statement', default=RAW_FILES['income_info'])
+    parser.add_argument('--balance-sheet', default=RAW_FILES['balance_sheet'])
+    parser.add_argument('--cash-flow', default=RAW_FILES['cash_flow'])
+
+    args = parser.parse_args(argv)
+    raw_files = {
+        'company_info': args.company_info,
+        'income_info': args.income_statement,
+        'balance_sheet': args.balance_sheet,
+        'cash_flow': args.cash_flow
+    }
+
+    if args.manifest_only:
+        firms = write_manifest(args.raw_path, args.output_path, raw_files, args.manifest_path,
+                               args.shards, args.chunk_rows)
+        print(f"✅ Manifest written for {firms} firms")
+        return
+
+    print("=" * 70)
+    print("CREDIT SCORING INCREMENTAL REFRESH")
+    print("=" * 70)
+    summary = run_incremental(args.raw_path, args.output_path, raw_files, args.manifest_path,
+                              args.shards, args.chunk_rows)
+    print("=" * 70)
+    if summary['changed'] or summary['removed']:
+        print(f"✅ {summary['changed']} firms recomputed, {summary['removed']} removed ({summary['seconds']:.1f}s)")
+        print(f"   - {summary['shards_rewritten']} shards rewritten")
+        print(f"   - df_ratios: {summary['ratios_rows']} rows in those shards")
+        print(f"   - df_agg: {summary['agg_rows']} rows in those shards")
+        print(f"   - df_credit_score: {summary['credit_score_rows']} rows in those shards")
+    else:
+        print(f"✅ No changes since the last run ({summary['seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
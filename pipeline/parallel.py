@@ -0,0 +1,74 @@
+"""
+Multi-core execution of the credit scoring pipeline, sharded by firm_id.
+
+Every step from calculate_ratios to classify_credit works per firm, so firms
+are split into shards by a stable hash of firm_id (crc32, the same on every
+machine and Python run), each shard runs the whole compute_credit_tables
+chain in a worker process, and the shard outputs are merged in firm_id order.
+The merged tables are the same whatever the worker or shard count.
+
+Usage (see also pipeline.batch --workers):
+    from pipeline.parallel import run_sharded
+    df_ratios, df_agg, df_credit_score = run_sharded(company_info, income_info, balance_sheet, cash_flow, workers=8)
+"""
+import os
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline.credit_analysis import compute_credit_tables
+
+# Shards per worker: small shards even out firms with many rows
+SHARDS_PER_WORKER = 4
+
+
+def default_workers() -> int:
+    """All available cores"""
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+
+
+def shard_of(firm_ids: pd.Series, shards: int) -> np.ndarray:
+    """Shard number of each firm_id (crc32 of the id, so stable across runs and machines)"""
+    codes, uniques = pd.factorize(firm_ids.astype(str))
+    firm_shards = np.array([zlib.crc32(firm_id.encode()) % shards for firm_id in uniques], dtype=np.int64)
+    return firm_shards[codes] if len(codes) else np.zeros(0, dtype=np.int64)
+
+
+def merge_shards(frames) -> pd.DataFrame:
+    """Concatenate shard outputs in firm_id order (each firm's own rows keep their order)"""
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.sort_values('firm_id', kind='stable').reset_index(drop=True)
+
+
+def run_sharded(company_info: pd.DataFrame, income_info: pd.DataFrame, balance_sheet: pd.DataFrame,
+                cash_flow: pd.DataFrame, workers: Optional[int] = None, shards: Optional[int] = None,
+                executor: Optional[Executor] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    compute_credit_tables over firm_id shards in a process pool.
+    Returns: (df_ratios, df_agg, df_credit_score), ordered by firm_id
+    """
+    workers = workers or default_workers()
+    shards = shards or workers * SHARDS_PER_WORKER
+    tables = [company_info, income_info, balance_sheet, cash_flow]
+
+    if workers == 1 and executor is None:
+        results = [compute_credit_tables(*tables)]
+    else:
+        shard_ids = [shard_of(df['firm_id'], shards) for df in tables]
+        pieces = [[df[ids == shard] for df, ids in zip(tables, shard_ids)] for shard in range(shards)]
+        # Skip shards without statements (e.g. more shards than firms)
+        pieces = [piece for piece in pieces if len(piece[2])]
+
+        if executor is not None:
+            results = list(executor.map(compute_credit_tables, *zip(*pieces))) if pieces else []
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(compute_credit_tables, *zip(*pieces))) if pieces else []
+
+        if not results:
+            results = [compute_credit_tables(*[df.iloc[:0] for df in tables])]
+
+    return tuple(merge_shards([result[i] for result in results]) for i in range(3))
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Tests for DataLoader and the shared dataset and figure caches
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def _copy_data_dir(tmp_dir: str) -> str:
+    """Copy the bundled data files into a scratch directory"""
+    target = os.path.join(tmp_dir, 'data')
+    shutil.copytree(DATA_PATH, target)
+    return target
+
+
+def test_dataset_cache_shares_and_invalidates():
+    """Sessions share one dataset until a data file changes"""
+    from utils.data_loader import DataLoader
+    from utils.dataset_cache import DatasetCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        cache = DatasetCache()
+
+        first = cache.get(DataLoader(data_path))
+        second = cache.get(DataLoader(data_path))
+        assert first is second
+        assert first['credit_score'] is second['credit_score']
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+        # Touching a file (new mtime and size) must trigger a reload
+        with open(os.path.join(data_path, 'company_info_sub.csv'), 'a') as f:
+            f.write("F000003,Jasa,Papua_Maluku,2010\n")
+
+        third = cache.get(DataLoader(data_path))
+        assert third is not first
+        assert len(third['company_info']) == 2
+        assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1}
+
+        # The app reuses one loader (and the store handles it opened) until a file changes
+        loader = cache.get_loader(data_path, DataLoader)
+        assert cache.get_loader(data_path, DataLoader) is loader
+        assert cache.get(loader) is third
+        with open(os.path.join(data_path, 'company_info_sub.csv'), 'a') as f:
+            f.write("F000004,Jasa,Papua_Maluku,2011\n")
+        assert cache.get_loader(data_path, DataLoader) is not loader
+
+
+def test_columnar_copies_round_trip_and_fall_back():
+    """Converted copies load like the CSVs and are skipped once a CSV is newer"""
+    import pandas as pd
+    from utils.data_loader import DataLoader
+    from utils.storage import convert_data_dir, iter_table_chunks, read_table, resolve_source
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        loader = DataLoader(data_path)
+        from_csv = loader.load_data()
+
+        convert_data_dir(data_path, loader.data_files, 'parquet')
+        from_parquet = loader.load_data()
+        for key, df in from_csv.items():
+            assert from_parquet[key].shape == df.shape
+            assert list(from_parquet[key].columns) == list(df.columns)
+        assert from_parquet['agg']['current_ratio_last'].iloc[0] == from_csv['agg']['current_ratio_last'].iloc[0]
+
+        csv_path = os.path.join(data_path, 'df_ratios.csv')
+        assert resolve_source(csv_path).endswith('.parquet')
+        # Chunked reads cover the same rows, from whichever file read_table uses
+        chunks = list(iter_table_chunks(csv_path, 2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert pd.concat(chunks, ignore_index=True).equals(read_table(csv_path))
+        parquet_mtime = os.path.getmtime(resolve_source(csv_path))
+        os.utime(csv_path, (parquet_mtime + 10, parquet_mtime + 10))
+        assert resolve_source(csv_path) == csv_path
+        assert [len(chunk) for chunk in iter_table_chunks(csv_path, 2)] == [2, 2, 1]
+
+
+def test_load_firm_reads_only_that_firm():
+    """Per-firm loads from the partitioned layout match filtering the full tables"""
+    import pandas as pd
+    from utils.data_loader import DataLoader
+    from utils.partitions import build_partitions
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+
+        # Add a second firm so the layout spans several partitions
+        ratios = pd.read_csv(os.path.join(data_path, 'df_ratios.csv'))
+        other = ratios.copy()
+        other['firm_id'] = 'F000001'
+        pd.concat([ratios, other]).to_csv(os.path.join(data_path, 'df_ratios.csv'), index=False)
+
+        loader = DataLoader(data_path)
+        build_partitions(data_path, loader.data_files, firms_per_partition=1)
+
+        firm = loader.load_firm('F000002')
+        assert len(firm['ratios']) == 5
+        assert set(firm['ratios']['firm_id']) == {'F000002'}
+        assert firm['ratios']['year'].tolist() == sorted(ratios['year'].tolist())
+        assert len(firm['credit_score']) == 1
+
+        # F000001 only exists in df_ratios
+        other_firm = loader.load_firm('F000001')
+        assert len(other_firm['ratios']) == 5
+        assert other_firm['credit_score'].empty
+
+        assert loader.load_firm('F999999')['ratios'] is None
+
+        # Partition slices carry the declared schema dtypes, like the full tables
+        full = {key: df[df['firm_id'].astype(str) == 'F000002'] for key, df in loader.load_data().items()}
+        for key, df in firm.items():
+            assert df.dtypes.astype(str).to_dict() == full[key].dtypes.astype(str).to_dict(), key
+
+        # Editing a source file makes the layout stale: loads fall back to the full tables
+        ratios_path = os.path.join(data_path, 'df_ratios.csv')
+        edited = pd.read_csv(ratios_path)
+        edited.loc[edited['firm_id'] == 'F000002', 'roa'] = 999.0
+        edited.to_csv(ratios_path, index=False)
+        stat = os.stat(ratios_path)
+        os.utime(ratios_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert (loader.load_firm('F000002')['ratios']['roa'] == 999.0).all()
+        assert (DataLoader(data_path).load_firm('F000002')['ratios']['roa'] == 999.0).all()
+
+        # Rebuilding makes it current again
+        build_partitions(data_path, loader.data_files, firms_per_partition=1)
+        assert loader._partition_store is None
+        assert (loader.load_firm('F000002')['ratios']['roa'] == 999.0).all()
+        assert loader._partition_store is not None
+
+
+def test_concurrent_load_matches_sequential_and_reports_files():
+    """Threaded loading returns the same tables plus one report row per file"""
+    from utils.data_loader import DataLoader
+
+    sequential = DataLoader(DATA_PATH, max_workers=1).load_data()
+    data, report = DataLoader(DATA_PATH, max_workers=4).load_data_with_report()
+
+    assert set(data) == set(sequential)
+    for key, df in sequential.items():
+        assert data[key].equals(df)
+
+    assert sorted(report['table']) == sorted(sequential)
+    assert (report['bytes'] > 0).all()
+    assert report['error'].isna().all()
+    ratios_row = report[report['table'] == 'ratios'].iloc[0]
+    assert ratios_row['rows'] == len(sequential['ratios'])
+
+
+def test_declared_schema_and_memory_report():
+    """Tables load with compact dtypes and the report covers every table"""
+    from utils.data_loader import DataLoader
+
+    loader = DataLoader(DATA_PATH)
+    data = loader.load_data()
+
+    assert str(data['ratios']['year'].dtype) == 'int16'
+    assert str(data['ratios']['current_ratio'].dtype) == 'float32'
+    assert str(data['ratios']['bs_total_assets'].dtype) == 'float64'
+    assert str(data['agg']['current_ratio_before_last'].dtype) == 'float32'
+    assert str(data['agg']['free_cash_flow_last'].dtype) == 'float64'
+    assert str(data['agg']['current_ratio_direction'].dtype) == 'category'
+    assert str(data['credit_score']['kategori'].dtype) == 'category'
+    assert data['credit_score']['liquidity_reason'].dtype == object
+    assert str(data['company_info']['sector'].dtype) == 'category'
+
+    # Only tables that were actually read are reported
+    report = loader.memory_report()
+    assert sorted(report['table']) == sorted(data.materialized())
+    assert 'balance_sheet' not in set(report['table'])
+    assert (report['bytes_saved'] == report['bytes_inferred'] - report['bytes_compact']).all()
+
+    # firm_id is the join key: one dtype in every table
+    for key in data:
+        if data[key] is not None and 'firm_id' in data[key].columns:
+            assert data[key]['firm_id'].dtype == object, key
+
+def test_lazy_mapping_reads_tables_on_first_access():
+    """load_data only reads a table when a page asks for it, then reuses it"""
+    from utils.data_loader import DataLoader
+
+    data = DataLoader(DATA_PATH).load_data()
+    assert not any(data.is_loaded(key) for key in data)
+
+    ratios = data['ratios']
+    assert data.is_loaded('ratios')
+    assert not data.is_loaded('agg')
+    assert data['ratios'] is ratios
+    assert list(data.load_report()['table']) == ['ratios']
+    assert len(data) == 7
+
+
+def test_text_store_serves_narratives_for_slim_scores():
+    """After the split the score table has no text and narratives come from the store"""
+    import pandas as pd
+    from utils.data_loader import DataLoader
+    from utils.text_store import NARRATIVE_COLUMNS, build_text_store
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        full = pd.read_csv(os.path.join(data_path, 'df_credit_score.csv'))
+        assert DataLoader(data_path).validate_credit_data(full)
+        build_text_store(data_path)
+
+        loader = DataLoader(data_path)
+        df_credit = loader.load_data()['credit_score']
+        assert not set(NARRATIVE_COLUMNS) & set(df_credit.columns)
+        # Narrative fields are checked in the store, not as score table columns
+        assert loader.validate_credit_data(df_credit)
+        assert not loader.validate_credit_data(df_credit.drop(columns=['kategori']))
+        assert abs(df_credit['final_score'].iloc[0] - full['final_score'].iloc[0]) < 1e-4
+
+        texts = loader.get_narratives('F000002', ['liquidity_reason', 'structure_analysis'], df_credit.iloc[0])
+        assert texts['liquidity_reason'] == full['liquidity_reason'].iloc[0]
+        assert texts['structure_analysis'] == full['structure_analysis'].iloc[0]
+
+        contributions = loader.get_aspect_contributions(df_credit)
+        assert set(contributions['reason']) == set(full[loader.aspect_reasons].iloc[0])
+
+
+def test_ratio_cube_views_match_ratios_table():
+    """Cube slices are memory-mapped views holding the df_ratios values"""
+    import numpy as np
+    import pandas as pd
+    from utils.data_loader import DataLoader
+    from utils.ratio_cube import build_ratio_cube
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        ratios = pd.read_csv(os.path.join(data_path, 'df_ratios.csv'))
+        other = ratios.iloc[:3].copy()
+        other['firm_id'] = 'F000001'
+        pd.concat([ratios, other]).to_csv(os.path.join(data_path, 'df_ratios.csv'), index=False)
+
+        loader = DataLoader(data_path)
+        assert loader.ratio_cube() is None
+
+        build_ratio_cube(data_path)
+        cube = DataLoader(data_path).ratio_cube()
+        assert cube.summary() == {'firms': 2, 'years': 5, 'ratios': len(cube.ratios)}
+
+        history = cube.firm_history('F000002')
+        assert isinstance(history.base, np.memmap) or isinstance(history, np.memmap)
+        expected = ratios.sort_values('year')['current_ratio'].to_numpy()
+        assert np.allclose(history[:, cube.ratio_index['current_ratio']], expected, equal_nan=True)
+
+        across = cube.ratio_across_firms('roa')
+        assert across.shape == (2, 5)
+        assert np.isnan(across[cube.firm_index['F000001'], 3:]).all()
+        assert np.shares_memory(across, cube.values)
+        assert cube.year_cross_section(cube.years[-1]).shape == (2, len(cube.ratios))
+
+        frame = cube.firm_frame('F000001')
+        assert len(frame) == 3
+
+
+def test_sql_backend_queries_match_frame_lookups():
+    """Indexed SQLite lookups return the same rows as filtering the loaded tables"""
+    import pandas as pd
+    from utils.data_loader import DataLoader
+    from utils.sql_backend import build_sql_backend
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        loader = DataLoader(data_path)
+        assert loader.sql_backend() is None
+
+        # Small chunks so every table is ingested in several appends
+        build_sql_backend(data_path, loader.data_files, chunksize=2)
+        backend = DataLoader(data_path).sql_backend()
+        ratios = pd.read_csv(os.path.join(data_path, 'df_ratios.csv')).sort_values('year')
+
+        latest = backend.latest_year_row('ratios', 'F000002')
+        assert latest['year'].iloc[0] == ratios['year'].iloc[-1]
+        assert abs(latest['current_ratio'].iloc[0] - ratios['current_ratio'].iloc[-1]) < 1e-4
+
+        previous = backend.previous_year_row('ratios', 'F000002', ['year', 'roa'])
+        assert list(previous.columns) == ['year', 'roa']
+        assert previous['year'].iloc[0] == ratios['year'].iloc[-2]
+
+        history = backend.ratio_history('F000002', 'roe')
+        assert history['year'].tolist() == ratios['year'].tolist()
+
+        statements = backend.firm_statements('F000002')
+        assert set(statements) == {'balance_sheet', 'income_info', 'cash_flow'}
+        assert len(statements['income_info']) == len(pd.read_csv(os.path.join(data_path, 'income_info_sub.csv')))
+        assert backend.firm_rows('ratios', 'F999999').empty
+
+        try:
+            backend.ratio_history('F000002', 'roe; DROP TABLE ratios')
+            assert False, "unknown column should be rejected"
+        except ValueError:
+            pass
+
+
+def test_firm_index_slices_selected_firm():
+    """Firm views hold only the selected firm's rows and share one cached index"""
+    import pandas as pd
+    from utils.charts import ChartGenerator
+    from utils.data_loader import DataLoader
+    from utils.dataset_cache import DatasetCache
+    from utils.firm_index import FirmIndex
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        for filename in ['df_credit_score.csv', 'df_ratios.csv', 'company_info_sub.csv']:
+            df = pd.read_csv(os.path.join(data_path, filename))
+            other = df.copy()
+            other['firm_id'] = 'F000001'
+            if 'final_score' in other.columns:
+                other['final_score'] = 12.5
+                other['kategori'] = 'Tidak Layak'
+            pd.concat([df, other]).to_csv(os.path.join(data_path, filename), index=False)
+
+        cache = DatasetCache()
+        loader = DataLoader(data_path)
+        index = cache.get_derived(loader, 'firm_index', FirmIndex)
+        assert cache.get_derived(DataLoader(data_path), 'firm_index', FirmIndex) is index
+        # Derived lookups do not count as dataset hits or misses
+        cache.get(loader)
+        assert cache.stats() == {'hits': 1, 'misses': 0, 'entries': 1}
+
+        assert index.firm_ids == ['F000001', 'F000002']
+        assert index.default_firm == 'F000002'
+        assert index.metadata('F000001')['kategori'] == 'Tidak Layak'
+        meta = index.metadata('F000001')
+        assert index.label('F000001') == f"F000001 · {meta['sector']} · {meta['region']} · Tidak Layak"
+        assert index.label('F999999') == 'F999999'
+
+        view = index.firm_data('F000001')
+        assert set(view['ratios']['firm_id'].astype(str)) == {'F000001'}
+        assert len(view['ratios']) == 5
+        assert abs(view['credit_score']['final_score'].iloc[0] - 12.5) < 1e-4
+        # F000001 has no statements in this extract
+        assert view['balance_sheet'].empty
+
+        data = cache.get(loader)
+        contributions = loader.get_aspect_contributions(data['credit_score'], 'F000001')
+        assert len(contributions) == 7
+        assert loader.get_aspect_contributions(data['credit_score'], 'F999999').empty
+        radar = ChartGenerator().create_radar_chart(data['credit_score'], 'F000001')
+        assert len(radar.data) == 1
+
+
+def test_figure_cache_reuses_and_evicts():
+    """Identical chart inputs return the cached figure; changed data or params build a new one"""
+    import pandas as pd
+    from utils.charts import ChartGenerator
+    from utils.figure_cache import FigureCache
+
+    df_ratios = pd.read_csv(os.path.join(DATA_PATH, 'df_ratios.csv'))
+    df_credit = pd.read_csv(os.path.join(DATA_PATH, 'df_credit_score.csv'))
+    cache = FigureCache(max_entries=3)
+    chart_gen = ChartGenerator(figure_cache=cache)
+
+    trend = chart_gen.create_trend_chart(df_ratios, 'current_ratio')
+    # A new generator (as on a Streamlit rerun) and a copied frame still hit
+    assert ChartGenerator(figure_cache=cache).create_trend_chart(df_ratios.copy(), 'current_ratio') is trend
+    assert chart_gen.create_trend_chart(df_ratios, 'quick_ratio') is not trend
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 0, 'entries': 2}
+
+    changed = df_ratios.copy()
+    changed.loc[0, 'current_ratio'] += 1
+    assert chart_gen.create_trend_chart(changed, 'current_ratio') is not trend
+    # Other columns of the frame do not take part in the key
+    assert chart_gen.create_trend_chart(df_ratios.assign(roa=0.0), 'current_ratio') is trend
+
+    radar = chart_gen.create_radar_chart(df_credit)
+    assert chart_gen.create_radar_chart(df_credit) is radar
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 3
+    assert len(radar.data) == 1 and list(radar.data[0].r[:7]) == list(df_credit.iloc[0][[
+        'liquidity_score', 'solvency_score', 'profitability_score', 'activity_score',
+        'coverage_score', 'cashflow_score', 'structure_score']])
+
+
+def test_figure_store_serves_prebuilt_figures():
+    """Stored figures serialise like the live ChartGenerator ones and go stale with the data files"""
+    import json
+    import plotly.tools
+    from plotly.utils import PlotlyJSONEncoder
+    from utils.charts import ChartGenerator
+    from utils.data_loader import DataLoader
+    from utils.figure_store import FIGURE_STORE_FILE, build_figure_store, load_figure
+    from utils.ratio_categories import categorized_ratios
+
+    def as_json(fig):
+        # What st.plotly_chart sends to the browser
+        figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+        return json.loads(json.dumps(figure, cls=PlotlyJSONEncoder))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = _copy_data_dir(tmp_dir)
+        if os.path.exists(os.path.join(data_path, FIGURE_STORE_FILE)):
+            os.remove(os.path.join(data_path, FIGURE_STORE_FILE))
+        assert DataLoader(data_path).figure_store() is None
+
+        _, count = build_figure_store(data_path)
+        loader = DataLoader(data_path)
+        store = loader.figure_store()
+        data = loader.load_data()
+        firm_id = str(data['credit_score']['firm_id'].iloc[0])
+        ratio_columns = categorized_ratios([c for c in data['ratios'].columns if c not in ['firm_id', 'year']])
+        assert count == 2 + len(ratio_columns)
+
+        chart_gen = ChartGenerator()
+        df_ratios = data['ratios'][data['ratios']['firm_id'].astype(str) == firm_id].reset_index(drop=True)
+        assert as_json(store.get(firm_id, 'radar')) == as_json(chart_gen.create_radar_chart(data['credit_score'],
+                                                                                            firm_id))
+        contributions = loader.get_aspect_contributions(data['credit_score'], firm_id)
+        assert as_json(store.get(firm_id, 'aspect_bar')) == as_json(chart_gen.create_aspect_bar_chart(contributions))
+        for ratio in ['current_ratio', 'roa', ratio_columns[-1]]:
+            assert as_json(store.get(firm_id, 'trend', ratio)) == as_json(chart_gen.create_trend_chart(df_ratios, ratio))
+
+        # Raw statement amounts are not prerendered
+        assert store.get(firm_id, 'trend', 'bs_total_assets') is None
+        assert store.get('F999999', 'radar') is None
+        assert load_figure(store, 'F999999', 'radar', lambda: 'built') == 'built'
+        assert load_figure(None, firm_id, 'radar', lambda: 'built') == 'built'
+
+        # A changed ratios file makes the store stale
+        with open(os.path.join(data_path, 'df_ratios.csv'), 'a') as f:
+            f.write('\n')
+        assert DataLoader(data_path).figure_store() is None
+
+
+def test_ratio_small_multiples_grid():
+    """One trace per ratio on its own axes; each column shares the x axis of its lowest cell"""
+    import pandas as pd
+    from utils.charts import ChartGenerator
+
+    df_ratios = pd.read_csv(os.path.join(DATA_PATH, 'df_ratios.csv'))
+    ratios = ['current_ratio', 'quick_ratio', 'roa', 'roe', 'not_a_ratio']
+    fig = ChartGenerator().create_ratio_small_multiples(df_ratios, ratios, columns=3)
+
+    assert [trace.name for trace in fig.data] == ratios[:4]
+    assert [trace.xaxis for trace in fig.data] == ['x', 'x2', 'x3', 'x4']
+    assert list(fig.data[2].y) == list(df_ratios['roa'])
+    assert [a.text for a in fig.layout.annotations] == ['Current Ratio', 'Quick Ratio', 'Roa', 'Roe']
+    assert fig.layout.xaxis.matches == 'x4' and fig.layout.xaxis.showticklabels is False
+    # The third column has no second-row cell, so its only cell keeps the year labels
+    assert fig.layout.xaxis3.matches is None and fig.layout.xaxis4.matches is None
+    assert fig.layout.height == 2 * 180 + 40
+    assert len(ChartGenerator().create_ratio_small_multiples(df_ratios, ['not_a_ratio']).data) == 0
+
+
+def test_svg_sparklines_batch():
+    """One polyline per column with two or more values, in year order, skipping missing values"""
+    import numpy as np
+    import pandas as pd
+    from utils.charts import ChartGenerator
+
+    df = pd.DataFrame({
+        'year': [2022, 2020, 2021],
+        'rising': [3.0, 1.0, 2.0],
+        'flat': [5.0, 5.0, 5.0],
+        'gappy': [3.0, 1.0, np.nan],
+        'single': [np.nan, 1.0, np.nan]
+    })
+    sparklines = ChartGenerator().create_svg_sparklines(df, ['rising', 'flat', 'gappy', 'single', 'missing'],
+                                                        width=80, height=20)
+
+    assert sorted(sparklines) == ['flat', 'gappy', 'rising']
+    assert 'points="2.0,18.0 40.0,10.0 78.0,2.0"' in sparklines['rising']
+    assert 'points="2.0,10.0 40.0,10.0 78.0,10.0"' in sparklines['flat']
+    assert 'points="2.0,18.0 78.0,2.0"' in sparklines['gappy']
+    # The latest value is marked
+    assert '<circle cx="78.0" cy="2.0"' in sparklines['rising']
+    assert ChartGenerator().create_svg_sparklines(df.iloc[:0], ['rising']) == {}
+
+
+def test_fast_figures_match_validated():
+    """The fast path sends the same JSON as go.Figure for every chart type, without building a figure"""
+    import json
+    import pandas as pd
+    import plotly.tools
+    from plotly.utils import PlotlyJSONEncoder
+    from utils.charts import ChartGenerator
+    from utils.data_loader import DataLoader
+    from utils.figure_cache import FigureCache
+    from utils.figure_spec import SpecFigure
+
+    data_loader = DataLoader(DATA_PATH)
+    df_credit = pd.read_csv(os.path.join(DATA_PATH, 'df_credit_score.csv'))
+    firm_id = df_credit['firm_id'].iloc[0]
+    df_ratios = pd.read_csv(os.path.join(DATA_PATH, 'df_ratios.csv'))
+    df_ratios = df_ratios[df_ratios['firm_id'] == firm_id]
+    contributions = data_loader.get_aspect_contributions(df_credit, firm_id)
+    charts = [
+        lambda gen: gen.create_radar_chart(df_credit, firm_id),
+        lambda gen: gen.create_aspect_bar_chart(contributions),
+        lambda gen: gen.create_trend_chart(df_ratios, 'roa'),
+        lambda gen: gen.create_ratio_small_multiples(df_ratios, ['current_ratio', 'quick_ratio', 'roa', 'roe']),
+        lambda gen: gen.create_sparkline(df_ratios, 'roa'),
+        lambda gen: gen.create_multi_line_chart(df_ratios, 'year', ['roa', 'roe'], 'Returns'),
+        lambda gen: gen.create_clustered_bar_chart(df_ratios, 'year', ['roa', 'roe'], 'Returns')
+    ]
+
+    def sent(fig):
+        figure = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+        return json.dumps(figure, cls=PlotlyJSONEncoder, sort_keys=True)
+
+    for build in charts:
+        fast = build(ChartGenerator(fast=True))
+        assert isinstance(fast, SpecFigure)
+        assert sent(fast) == sent(build(ChartGenerator()))
+
+    # Fast and validated figures are cached apart
+    cache = FigureCache()
+    validated_fig = ChartGenerator(figure_cache=cache).create_trend_chart(df_ratios, 'roa')
+    fast_fig = ChartGenerator(figure_cache=cache, fast=True).create_trend_chart(df_ratios, 'roa')
+    assert not isinstance(validated_fig, SpecFigure) and isinstance(fast_fig, SpecFigure)
+    assert cache.stats()['entries'] == 2
+
+
+if __name__ == "__main__":
+    test_dataset_cache_shares_and_invalidates()
+    test_columnar_copies_round_trip_and_fall_back()
+    test_load_firm_reads_only_that_firm()
+    test_concurrent_load_matches_sequential_and_reports_files()
+    test_declared_schema_and_memory_report()
+    test_lazy_mapping_reads_tables_on_first_access()
+    test_text_store_serves_narratives_for_slim_scores()
+    test_ratio_cube_views_match_ratios_table()
+    test_sql_backend_queries_match_frame_lookups()
+    test_firm_index_slices_selected_firm()
+    test_figure_cache_reuses_and_evicts()
+    test_figure_store_serves_prebuilt_figures()
+    test_ratio_small_multiples_grid()
+    test_svg_sparklines_batch()
+    test_fast_figures_match_validated()
+    print("✅ All data loader tests passed!")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Tests for the GenAI enrichment stage (run offline against the local stub server)
+"""
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def _scored_firms(num_firms: int = 6):
+    """df_credit_score (without GenAI columns) and df_agg for several copies of the bundled firm"""
+    from pipeline.genai import ANALYSIS_COLUMNS
+
+    df_credit = pd.read_csv(os.path.join(DATA_PATH, 'df_credit_score.csv')).drop(columns=ANALYSIS_COLUMNS)
+    df_agg = pd.read_csv(os.path.join(DATA_PATH, 'df_agg.csv'))
+    firm_ids = [f'F{i + 1:06d}' for i in range(num_firms)]
+    credit = pd.concat([df_credit.assign(firm_id=firm_id) for firm_id in firm_ids], ignore_index=True)
+    agg = pd.concat([df_agg.assign(firm_id=firm_id) for firm_id in firm_ids], ignore_index=True)
+    # Distinct scores so every firm has its own prompts
+    credit['final_score'] = credit['final_score'] + range(num_firms)
+    return credit, agg
+
+
+class _CountingClient:
+    """In-process backend that records prompts and can reject some for good"""
+
+    model_name = 'counting'
+
+    def __init__(self, reject_containing=None):
+        self.prompts = []
+        self.reject_containing = reject_containing
+
+    async def generate(self, system_prompt, prompt):
+        from pipeline.genai import GenAIError
+        from pipeline.genai_stub import stub_text
+
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        if self.reject_containing and self.reject_containing in prompt:
+            raise GenAIError("rejected")
+        return stub_text(prompt)
+
+    async def close(self):
+        pass
+
+
+def test_prompts_match_notebook_layout():
+    """Eight prompts per firm, filled from the firm's reasons, scores and _last metrics"""
+    from pipeline.genai import ANALYSIS_COLUMNS, build_firm_prompts, merge_genai_inputs
+
+    credit, agg = _scored_firms(1)
+    row = merge_genai_inputs(credit, agg).iloc[0]
+    prompts = build_firm_prompts(row)
+
+    assert list(prompts) == ANALYSIS_COLUMNS
+    assert f"Metric Data: {row['liquidity_reason']}" in prompts['liquidity_analysis']
+    assert f"Current Ratio = {row['current_ratio_last']:.2f}" in prompts['liquidity_analysis']
+    assert f"- Final Score: {row['final_score']:.1f}/100" in prompts['genai_recommendation']
+
+
+def test_enrichment_retries_transient_failures_against_stub():
+    """Every firm gets eight texts even when the backend answers some requests with 429/503"""
+    from pipeline.genai import (ANALYSIS_COLUMNS, HttpClient, build_firm_prompts, enrich_credit_scores,
+                                merge_genai_inputs)
+    from pipeline.genai_stub import start_stub_server, stub_text
+
+    credit, agg = _scored_firms(4)
+    server, _ = start_stub_server(latency=0.01, failure_rate=0.2, seed=1)
+    try:
+        df, summary = enrich_credit_scores(credit, agg, HttpClient(server.url), concurrency=8,
+                                           max_retries=8, verbose=False)
+    finally:
+        server.shutdown()
+
+    assert summary['retries'] > 0 and summary['failed_requests'] == 0
+    assert summary['requests'] == server.request_count == 4 * 8 + summary['retries']
+    prompts = build_firm_prompts(merge_genai_inputs(credit, agg).iloc[3])
+    for col in ANALYSIS_COLUMNS:
+        assert df.at[3, col] == stub_text(prompts[col]), col
+
+
+def test_http_client_reads_chunked_replies():
+    """Replies sent with Transfer-Encoding: chunked decode like Content-Length ones"""
+    import asyncio
+    from pipeline.genai import HttpClient
+    from pipeline.genai_stub import start_stub_server, stub_reply
+
+    server, _ = start_stub_server(latency=0, chunked=True)
+    try:
+        text = asyncio.run(HttpClient(server.url).generate("system", "hello chunks"))
+    finally:
+        server.shutdown()
+    assert text == stub_reply("hello chunks")
+
+
+def test_checkpoint_resumes_and_skips_failed_firms():
+    """Finished firms are read back from the checkpoint; firms with a rejected prompt are retried next run"""
+    from pipeline.genai import enrich_credit_scores, load_checkpoint
+
+    credit, agg = _scored_firms(6)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint = os.path.join(tmp_dir, 'genai_checkpoint.jsonl')
+
+        first_client = _CountingClient(reject_containing=f"Final Score: {credit.at[2, 'final_score']:.1f}")
+        first, summary = enrich_credit_scores(credit.iloc[:3], agg, first_client, checkpoint_path=checkpoint,
+                                              verbose=False)
+        assert summary['failed_requests'] == 1
+        assert first.at[2, 'genai_recommendation'] == "Error: rejected"
+        assert sorted(load_checkpoint(checkpoint)) == ['F000001', 'F000002']
+
+        second_client = _CountingClient()
+        second, summary = enrich_credit_scores(credit, agg, second_client, checkpoint_path=checkpoint, verbose=False)
+        assert summary['firms_resumed'] == 2
+        assert len(second_client.prompts) == 4 * 8
+        assert second.at[0, 'liquidity_analysis'] == first.at[0, 'liquidity_analysis']
+        assert len(load_checkpoint(checkpoint)) == 6
+
+
+def test_response_cache_rerun_makes_no_requests():
+    """A rerun over unchanged firms is served from the cache; a changed firm only re-sends its own prompts"""
+    from pipeline.genai import enrich_credit_scores
+    from pipeline.genai_cache import ResponseCache
+
+    credit, agg = _scored_firms(3)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'genai_cache.sqlite')
+
+        cache = ResponseCache(path)
+        first, summary = enrich_credit_scores(credit, agg, _CountingClient(), cache=cache, verbose=False)
+        cache.close()
+        assert summary['cache_misses'] == 3 * 8 and summary['cache_hits'] == 0
+
+        cache = ResponseCache(path)
+        client = _CountingClient()
+        second, summary = enrich_credit_scores(credit, agg, client, cache=cache, verbose=False)
+        assert client.prompts == [] and summary['requests'] == 0
+        assert summary['cache_hit_rate'] == 1.0
+        pd.testing.assert_frame_equal(first, second)
+
+        changed = credit.copy()
+        changed.at[1, 'final_score'] += 0.5
+        client = _CountingClient()
+        _, summary = enrich_credit_scores(changed, agg, client, cache=cache, verbose=False)
+        cache.close()
+        # Only the recommendation prompt includes final_score
+        assert len(client.prompts) == 1 and summary['cache_hits'] == 3 * 8 - 1
+
+
+def test_cached_rerun_does_not_commit_per_lookup():
+    """Cache hits are recorded in memory and written in one transaction when the cache is closed"""
+    import sqlite3
+    from pipeline.genai import enrich_credit_scores
+    from pipeline.genai_cache import ResponseCache
+
+    credit, agg = _scored_firms(3)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'genai_cache.sqlite')
+        cache = ResponseCache(path)
+        enrich_credit_scores(credit, agg, _CountingClient(), cache=cache, verbose=False)
+        cache.close()
+        stored = time.time()
+
+        cache = ResponseCache(path)
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        _, summary = enrich_credit_scores(credit, agg, _CountingClient(), cache=cache, verbose=False)
+        assert summary['cache_hits'] == 3 * 8
+        assert not [sql for sql in statements if not sql.startswith('SELECT')]
+
+        cache.close()
+        assert statements.count('COMMIT') == 1
+
+        # Every hit's last-used time reached the file
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT MIN(last_used) FROM responses").fetchone()[0] >= stored
+
+
+def test_response_cache_key_and_eviction():
+    """Entries are keyed by model and system prompt too, and evicted by size (LRU) and age"""
+    from pipeline.genai_cache import ResponseCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(os.path.join(tmp_dir, 'cache.sqlite'), max_bytes=250)
+        cache.put('model-a', 'system', 'prompt', 'answer')
+        assert cache.get('model-a', 'system', 'prompt') == 'answer'
+        assert cache.get('model-b', 'system', 'prompt') is None
+        assert cache.get('model-a', 'other system', 'prompt') is None
+
+        for i in range(5):
+            cache.put('model-a', 'system', f'prompt {i}', 'x' * 100)
+        cache.get('model-a', 'system', 'prompt 0')
+        cache.evict()
+        assert cache.stats()['bytes'] <= 250
+        assert cache.get('model-a', 'system', 'prompt 0') == 'x' * 100
+        assert cache.get('model-a', 'system', 'prompt 1') is None
+
+        cache.max_age_days = 0
+        time.sleep(0.01)
+        cache.evict()
+        assert cache.stats()['entries'] == 0
+        cache.close()
+
+
+def test_combined_mode_sends_one_request_per_firm():
+    """Combined mode fills all eight columns from one JSON reply per firm"""
+    from pipeline.genai import (ANALYSIS_COLUMNS, HttpClient, build_combined_prompt, enrich_credit_scores,
+                                merge_genai_inputs)
+    from pipeline.genai_stub import start_stub_server, stub_text
+
+    credit, agg = _scored_firms(4)
+    server, _ = start_stub_server(latency=0.01)
+    try:
+        df, summary = enrich_credit_scores(credit, agg, HttpClient(server.url), mode='combined', verbose=False)
+        _, sections = enrich_credit_scores(credit, agg, HttpClient(server.url), verbose=False)
+    finally:
+        server.shutdown()
+
+    assert summary['requests'] == 4 and summary['section_fallbacks'] == 0
+    assert sections['input_chars'] > 2 * summary['input_chars']
+    prompt = build_combined_prompt(merge_genai_inputs(credit, agg).iloc[2])
+    for col in ANALYSIS_COLUMNS:
+        assert df.at[2, col] == stub_text(f"[{col}] {prompt}"), col
+
+
+def test_combined_mode_falls_back_per_section():
+    """Sections missing or invalid in the JSON reply, or an unparseable reply, are requested one by one"""
+    from pipeline.genai import build_firm_prompts, enrich_credit_scores, merge_genai_inputs, parse_combined_response
+    from pipeline.genai_stub import stub_text
+
+    class PartialClient(_CountingClient):
+        async def generate(self, system_prompt, prompt):
+            if 'Keys: ' not in prompt:
+                return await super().generate(system_prompt, prompt)
+            self.prompts.append(prompt)
+            if self.reject_containing and self.reject_containing in prompt:
+                return 'Sorry, here is the analysis: {"liquidity_analysis": "cut off'
+            return '```json\n{"liquidity_analysis": "Liquid.", "solvency_analysis": 3, "activity_analysis": " "}\n```'
+
+    assert parse_combined_response('{"liquidity_analysis": " Liquid. ", "extra": "x"}') == {
+        'liquidity_analysis': 'Liquid.'}
+    assert parse_combined_response('no json here') == {}
+
+    credit, agg = _scored_firms(2)
+    client = PartialClient(reject_containing=f"Final Score: {credit.at[1, 'final_score']:.1f}")
+    df, summary = enrich_credit_scores(credit, agg, client, mode='combined', verbose=False)
+
+    assert summary['section_fallbacks'] == 7 + 8
+    assert summary['requests'] == 2 + 7 + 8
+    assert df.at[0, 'liquidity_analysis'] == 'Liquid.'
+    prompts = build_firm_prompts(merge_genai_inputs(credit, agg).iloc[0])
+    assert df.at[0, 'solvency_analysis'] == stub_text(prompts['solvency_analysis'])
+    assert df.at[1, 'liquidity_analysis'].startswith('[stub ')
+
+
+def test_enrichment_runs_inside_a_running_event_loop():
+    """enrich_credit_scores works from a running loop (as in Jupyter), and aenrich_credit_scores can be awaited"""
+    from pipeline.genai import aenrich_credit_scores, enrich_credit_scores
+    from pipeline.genai_cache import ResponseCache
+
+    credit, agg = _scored_firms(2)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(os.path.join(tmp_dir, 'genai_cache.sqlite'))
+
+        async def notebook_cell():
+            blocking = enrich_credit_scores(credit, agg, _CountingClient(), cache=cache, verbose=False)
+            awaited = await aenrich_credit_scores(credit, agg, _CountingClient(), cache=cache, verbose=False)
+            return blocking, awaited
+
+        (first, summary), (second, cached) = asyncio.run(notebook_cell())
+        cache.close()
+    assert summary['cache_misses'] == 2 * 8 and cached['cache_hits'] == 2 * 8
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_token_bucket_limits_request_rate():
+    """A 40 requests/s bucket with no burst spaces 11 requests over about a quarter second"""
+    from pipeline.genai import TokenBucket
+
+    async def run():
+        bucket = TokenBucket(rate=40, capacity=1)
+        start = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(11)])
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.24
+
+
+if __name__ == "__main__":
+    test_prompts_match_notebook_layout()
+    test_enrichment_retries_transient_failures_against_stub()
+    test_http_client_reads_chunked_replies()
+    test_checkpoint_resumes_and_skips_failed_firms()
+    test_response_cache_rerun_makes_no_requests()
+    test_cached_rerun_does_not_commit_per_lookup()
+    test_response_cache_key_and_eviction()
+    test_combined_mode_sends_one_request_per_firm()
+    test_combined_mode_falls_back_per_section()
+    test_enrichment_runs_inside_a_running_event_loop()
+    test_token_bucket_limits_request_rate()
+    print("✅ All GenAI tests passed!")
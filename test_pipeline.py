@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Tests for the credit scoring pipeline package
+"""
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+RAW_SOURCES = {
+    'company_info': 'company_info_sub.csv',
+    'income_info': 'income_info_sub.csv',
+    'balance_sheet': 'balance_sheet_sub.csv',
+    'cash_flow': 'cash_flow_sub.csv'
+}
+
+
+def _make_raw_tables(num_firms: int = 6, seed: int = 7) -> dict:
+    """Raw statements for several firms, derived from the bundled firm with per-firm noise"""
+    rng = np.random.default_rng(seed)
+    base = {key: pd.read_csv(os.path.join(DATA_PATH, filename)) for key, filename in RAW_SOURCES.items()}
+
+    tables = {key: [] for key in base}
+    for i in range(num_firms):
+        firm_id = f'F{i + 1:06d}'
+        for key, df in base.items():
+            firm = df.copy()
+            firm['firm_id'] = firm_id
+            amounts = [c for c in firm.select_dtypes('number').columns if c not in ['year', 'start_year']]
+            firm[amounts] = firm[amounts] * rng.uniform(0.5, 1.5, size=(len(firm), len(amounts)))
+            # Last firm has only two years and is not scored
+            if i == num_firms - 1 and 'year' in firm.columns:
+                firm = firm.sort_values('year').tail(2)
+            tables[key].append(firm)
+
+    return {key: pd.concat(frames, ignore_index=True) for key, frames in tables.items()}
+
+
+def _assert_frames_match(left: pd.DataFrame, right: pd.DataFrame):
+    """Same columns and values (floats compared after a CSV round trip)"""
+    assert list(left.columns) == list(right.columns)
+    assert len(left) == len(right)
+    for col in left.columns:
+        a = left[col].reset_index(drop=True)
+        b = right[col].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            assert np.allclose(a.astype(float), b.astype(float), equal_nan=True, rtol=1e-9), col
+        else:
+            assert (a.astype(str) == b.astype(str)).all(), col
+
+
+def test_compute_credit_tables_reproduces_bundled_outputs():
+    """The packaged pipeline gives the published df_ratios, df_agg and df_credit_score"""
+    from pipeline.credit_analysis import compute_credit_tables
+
+    raw = {key: pd.read_csv(os.path.join(DATA_PATH, filename)) for key, filename in RAW_SOURCES.items()}
+    df_ratios, df_agg, df_credit_score = compute_credit_tables(
+        raw['company_info'], raw['income_info'], raw['balance_sheet'], raw['cash_flow']
+    )
+
+    _assert_frames_match(df_ratios, pd.read_csv(os.path.join(DATA_PATH, 'df_ratios.csv')))
+    _assert_frames_match(df_agg, pd.read_csv(os.path.join(DATA_PATH, 'df_agg.csv')))
+    published = pd.read_csv(os.path.join(DATA_PATH, 'df_credit_score.csv'))
+    _assert_frames_match(df_credit_score, published[list(df_credit_score.columns)])
+
+
+def test_batch_engine_matches_single_pass():
+    """Streaming in small firm-aligned chunks gives the same tables as one in-memory run"""
+    from pipeline.batch import RAW_FILES, run_batch
+    from pipeline.credit_analysis import compute_credit_tables
+
+    raw = _make_raw_tables()
+    expected = compute_credit_tables(raw['company_info'], raw['income_info'], raw['balance_sheet'], raw['cash_flow'])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_path = os.path.join(tmp_dir, 'raw')
+        output_path = os.path.join(tmp_dir, 'out')
+        os.makedirs(raw_path)
+        for key, df in raw.items():
+            df.to_csv(os.path.join(raw_path, RAW_FILES[key]), index=False)
+
+        # 7 rows per read splits firms across chunk boundaries
+        summary = run_batch(raw_path, output_path, chunk_rows=7, verbose=False)
+        assert summary['chunks'] > 1
+        assert summary['credit_rows'] == 5
+
+        for name, df in zip(['df_ratios.csv', 'df_agg.csv', 'df_credit_score.csv'], expected):
+            _assert_frames_match(pd.read_csv(os.path.join(output_path, name)), df.reset_index(drop=True))
+
+
+def test_batch_engine_rejects_unsorted_input():
+    """Firm-aligned chunking needs firm_id-sorted files"""
+    from pipeline.batch import RAW_FILES, run_batch
+
+    raw = _make_raw_tables()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for key, df in raw.items():
+            if key == 'income_info':
+                df = df.iloc[::-1]
+            df.to_csv(os.path.join(tmp_dir, RAW_FILES[key]), index=False)
+
+        try:
+            run_batch(tmp_dir, os.path.join(tmp_dir, 'out'), chunk_rows=7, verbose=False)
+            assert False, "unsorted input should be rejected"
+        except ValueError as e:
+            assert 'income_statement.csv' in str(e)
+        assert not os.path.exists(os.path.join(tmp_dir, 'out', 'df_ratios.csv'))
+
+
+def test_before_last_grouped_pass_matches_legacy_loop():
+    """The grouped before_last / YoY pass gives the values of the original per-firm loop"""
+    from benchmarks.bench_aggregate import RATIO_COLS, filter_years, legacy_before_last, make_ratios
+    from pipeline.credit_analysis import aggregate_multi_year
+
+    df_ratios = make_ratios(60, seed=3, nan_share=0.2)
+    df_agg = aggregate_multi_year(df_ratios)
+    legacy = legacy_before_last(filter_years(df_ratios)).set_index('firm_id').reindex(df_agg['firm_id'])
+
+    for col in RATIO_COLS:
+        before = df_agg[f'{col}_before_last'].to_numpy()
+        assert np.array_equal(before, legacy[f'{col}_before_last'].to_numpy(), equal_nan=True), col
+
+        # _last stays the last non-null value, so YoY is computed against it
+        diff = df_agg[f'{col}_last'] - df_agg[f'{col}_before_last']
+        assert np.allclose(df_agg[f'{col}_diff_last_before'], diff, equal_nan=True), col
+
+    pct = df_agg['roa_pct_change']
+    expected_direction = np.select([pct > 2, pct < -2], ['UP', 'DOWN'], default='STABLE')
+    assert (df_agg['roa_direction'] == expected_direction).all()
+
+
+def test_trend_kernel_matches_polyfit():
+    """Batched slopes equal np.polyfit per firm and ratio, with NaN gaps, short firms and year x"""
+    from benchmarks.bench_aggregate import RATIO_COLS, filter_years, make_ratios
+    from pipeline.credit_analysis import aggregate_multi_year
+    from utils.trend import frame_slopes, series_slope
+
+    df_ratios = make_ratios(40, seed=5, nan_share=0.3)
+    df_ratios.loc[df_ratios['firm_id'] == 'F000001', 'roa'] = np.nan
+    df_ratios.loc[df_ratios.index[:3], 'free_cash_flow'] = np.inf
+    df_filtered = filter_years(df_ratios)
+
+    def polyfit_slope(x, y):
+        mask = ~np.isnan(y)
+        if mask.sum() < 2:
+            return np.nan
+        try:
+            return np.polyfit(x[mask], y[mask], 1)[0]
+        except Exception:
+            return np.nan
+
+    by_rank = frame_slopes(df_filtered, 'firm_id', RATIO_COLS)
+    by_year = frame_slopes(df_filtered, 'firm_id', RATIO_COLS, x_col='year')
+    for firm_id, firm in df_filtered.groupby('firm_id'):
+        for col in RATIO_COLS:
+            y = firm[col].to_numpy(dtype=float)
+            rank_expected = polyfit_slope(np.arange((~np.isnan(y)).sum()), y[~np.isnan(y)])
+            year_expected = polyfit_slope(firm['year'].to_numpy(dtype=float), y)
+            assert np.allclose(by_rank.at[firm_id, col], rank_expected, equal_nan=True, rtol=1e-9), (firm_id, col)
+            assert np.allclose(by_year.at[firm_id, col], year_expected, equal_nan=True, rtol=1e-9), (firm_id, col)
+            assert np.allclose(series_slope(firm['year'], firm[col]), year_expected, equal_nan=True, rtol=1e-9)
+
+    # The pipeline's _trend is the rank slope, with missing trends filled with 0
+    df_agg = aggregate_multi_year(df_ratios).set_index('firm_id')
+    assert np.allclose(df_agg['roa_trend'], by_rank['roa'].reindex(df_agg.index).fillna(0), rtol=1e-9)
+    assert df_agg.at['F000001', 'roa_trend'] == 0
+
+
+def test_vectorized_reasoning_matches_rowwise():
+    """Both reasoning engines give byte-identical reasons and statuses, including band edges, NaN and -0.0"""
+    from benchmarks.bench_reasoning import make_agg
+    from pipeline.credit_analysis import add_aspect_reasoning
+
+    df_agg = make_agg(3000, seed=11)
+    rowwise = add_aspect_reasoning(df_agg, engine='rowwise')
+    vectorized = add_aspect_reasoning(df_agg)
+
+    assert list(vectorized.columns) == list(rowwise.columns)
+    for col in [c for c in rowwise.columns if c.endswith('_reason') or c.endswith('_status')]:
+        assert vectorized[col].tolist() == rowwise[col].tolist(), col
+
+    # Empty chunks keep the reasoning columns
+    empty = add_aspect_reasoning(df_agg.iloc[:0])
+    assert 'structure_reason' in empty.columns and empty.empty
+
+
+def test_vectorized_classification_matches_rowwise():
+    """Both classify_credit engines give the same categories and byte-identical reasoning"""
+    from benchmarks.bench_reasoning import make_scores
+    from pipeline.credit_analysis import classify_credit
+
+    df_scores = make_scores(3000, seed=13)
+    # All-strong, all-watch and all-weak firms, exact 60/80 edges and tied scores
+    df_scores.iloc[0, 1::3] = 95.0
+    df_scores.iloc[1, 1::3] = 60.0
+    df_scores.iloc[2, 1::3] = 59.99
+    df_scores.iloc[3, 1::3] = 80.0
+
+    rowwise = classify_credit(df_scores, engine='rowwise')
+    vectorized = classify_credit(df_scores)
+
+    assert list(vectorized.columns) == list(rowwise.columns)
+    for col in ['final_score', 'kategori', 'rekomendasi', 'reasoning']:
+        assert vectorized[col].tolist() == rowwise[col].tolist(), col
+    assert rowwise['reasoning'].str.startswith('Excellent').any()
+    assert rowwise['reasoning'].str.startswith('Critical').any()
+
+
+def test_incremental_refresh_matches_full_run():
+    """Only changed firms are recomputed, only their shards are rewritten, and the tables equal a full run"""
+    from pipeline.batch import RAW_FILES
+    from pipeline.credit_analysis import compute_credit_tables
+    from pipeline.incremental import SHARD_DIR, run_incremental
+    from pipeline.parallel import shard_of
+
+    raw = _make_raw_tables()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_path = os.path.join(tmp_dir, 'raw')
+        output_path = os.path.join(tmp_dir, 'out')
+        shard_path = os.path.join(output_path, SHARD_DIR)
+        os.makedirs(raw_path)
+
+        def write_raw():
+            # The refresh streams the raw files like the batch engine, so they are sorted by firm_id
+            for key, df in raw.items():
+                df.sort_values('firm_id', kind='stable').to_csv(os.path.join(raw_path, RAW_FILES[key]), index=False)
+
+        def shard_mtimes():
+            return {os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+                    for root, _, names in os.walk(shard_path) for name in names if name.startswith('shard-')}
+
+        write_raw()
+        first = run_incremental(raw_path, output_path, shards=4, chunk_rows=7, verbose=False)
+        assert first['full_run'] and first['changed'] == 6
+
+        # GenAI text from a full notebook run survives for firms that are not recomputed
+        credit_path = os.path.join(output_path, 'df_credit_score.csv')
+        credit = pd.read_csv(credit_path)
+        credit['genai_recommendation'] = 'reviewed'
+        credit.to_csv(credit_path, index=False)
+
+        assert run_incremental(raw_path, output_path, chunk_rows=7, verbose=False)['changed'] == 0
+        before = shard_mtimes()
+
+        # F000002 restates a balance sheet, F000003 and F000006 file a new year, F000004 drops out
+        bs = raw['balance_sheet']
+        bs.loc[bs.index[bs['firm_id'] == 'F000002'][0], 'total_assets'] *= 1.1
+        for key in ['income_info', 'balance_sheet', 'cash_flow']:
+            df = raw[key]
+            new_years = []
+            for firm_id in ['F000003', 'F000006']:
+                latest = df[df['firm_id'] == firm_id].sort_values('year').tail(1).copy()
+                latest['year'] += 1 if firm_id == 'F000003' else -2
+                new_years.append(latest)
+            raw[key] = pd.concat([df] + new_years, ignore_index=True)
+        raw = {key: df[df['firm_id'] != 'F000004'] for key, df in raw.items()}
+        write_raw()
+
+        summary = run_incremental(raw_path, output_path, chunk_rows=7, verbose=False)
+        assert (summary['changed'], summary['removed']) == (3, 1)
+
+        # Shards without changed or removed firms are not rewritten
+        affected = set(shard_of(pd.Series(['F000002', 'F000003', 'F000004', 'F000006']), 4))
+        after = shard_mtimes()
+        untouched = [path for path in before if int(path[-9:-4]) not in affected]
+        assert untouched and all(after[path] == before[path] for path in untouched)
+        assert summary['shards_rewritten'] == len(affected)
+
+        expected = compute_credit_tables(raw['company_info'], raw['income_info'], raw['balance_sheet'], raw['cash_flow'])
+        for name, df in zip(['df_ratios.csv', 'df_agg.csv', 'df_credit_score.csv'], expected):
+            # Exported rows are grouped by shard, so both sides are compared in firm_id order
+            stored = pd.read_csv(os.path.join(output_path, name)).sort_values('firm_id', kind='stable')
+            expected_df = df.sort_values('firm_id', kind='stable').reset_index(drop=True)
+            _assert_frames_match(stored[list(expected_df.columns)], expected_df)
+
+        credit = pd.read_csv(credit_path).set_index('firm_id')
+        assert 'F000006' in credit.index and 'F000004' not in credit.index
+        assert credit.at['F000001', 'genai_recommendation'] == 'reviewed'
+        assert pd.isna(credit.at['F000002', 'genai_recommendation'])
+
+
+def test_manifest_keeps_exact_hashes_for_missing_firms():
+    """A firm missing from one table gets 0 there without rounding the other firms' hashes"""
+    import numpy as np
+    from pipeline.incremental import build_manifest, firm_hashes
+
+    raw = _make_raw_tables()
+    tables = {key: raw[key] for key in ['income_info', 'balance_sheet', 'cash_flow']}
+    tables['balance_sheet'] = tables['balance_sheet'][tables['balance_sheet']['firm_id'] != 'F000004']
+
+    manifest = build_manifest(tables)
+    assert (manifest.dtypes == np.uint64).all()
+    assert manifest.at['F000004', 'balance_sheet'] == 0
+    expected = firm_hashes(tables['balance_sheet'])
+    assert (manifest['balance_sheet'].drop('F000004') == expected.loc[manifest.index.drop('F000004')]).all()
+
+
+def test_sharded_run_matches_single_process():
+    """Scoring firm_id shards in a process pool gives the single-process tables, whatever the shard count"""
+    from pipeline.batch import RAW_FILES, run_batch
+    from pipeline.credit_analysis import compute_credit_tables
+    from pipeline.parallel import run_sharded, shard_of
+
+    raw = _make_raw_tables(num_firms=9)
+    tables = (raw['company_info'], raw['income_info'], raw['balance_sheet'], raw['cash_flow'])
+    expected = [df.sort_values('firm_id', kind='stable').reset_index(drop=True) for df in compute_credit_tables(*tables)]
+
+    for workers, shards in [(1, None), (2, 3), (2, 20)]:
+        for result, df in zip(run_sharded(*tables, workers=workers, shards=shards), expected):
+            _assert_frames_match(result, df)
+
+    # crc32 shards do not depend on the process or on row order
+    ids = raw['balance_sheet']['firm_id']
+    assert (shard_of(ids, 4) == shard_of(ids.iloc[::-1], 4)[::-1]).all()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for key, df in raw.items():
+            df.to_csv(os.path.join(tmp_dir, RAW_FILES[key]), index=False)
+        run_batch(tmp_dir, os.path.join(tmp_dir, 'out'), chunk_rows=20, verbose=False, workers=2)
+        for name, df in zip(['df_ratios.csv', 'df_agg.csv', 'df_credit_score.csv'], expected):
+            _assert_frames_match(pd.read_csv(os.path.join(tmp_dir, 'out', name)), df)
+
+
+if __name__ == "__main__":
+    test_compute_credit_tables_reproduces_bundled_outputs()
+    test_batch_engine_matches_single_pass()
+    test_batch_engine_rejects_unsorted_input()
+    test_before_last_grouped_pass_matches_legacy_loop()
+    test_trend_kernel_matches_polyfit()
+    test_vectorized_reasoning_matches_rowwise()
+    test_vectorized_classification_matches_rowwise()
+    test_incremental_refresh_matches_full_run()
+    test_manifest_keeps_exact_hashes_for_missing_firms()
+    test_sharded_run_matches_single_process()
+    print("✅ All pipeline tests passed!")
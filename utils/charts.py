@@ -2,11 +2,26 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
+from typing import Dict, Optional
+
+from utils.figure_cache import FigureCache, frame_fingerprint
+from utils.figure_spec import spec_figure, validated
+
+RADAR_SCORE_COLUMNS = [
+    'liquidity_score', 'solvency_score', 'profitability_score', 'activity_score',
+    'coverage_score', 'cashflow_score', 'structure_score'
+]
+
 
 class ChartGenerator:
     """Generates various charts for the credit analysis dashboard"""
 
-    def __init__(self):
+    def __init__(self, figure_cache: Optional[FigureCache] = None, fast: bool = False):
+        # Built figures are reused for identical inputs when a cache is given (see utils.figure_cache)
+        self.figure_cache = figure_cache
+        # Fast path: figures are unvalidated read-only specs for st.plotly_chart (see utils.figure_spec)
+        self.fast = fast
+
         # Color scheme for status mapping
         self.status_colors = {
             'Strong': '#22c55e',      # green
@@ -19,35 +34,47 @@ class ChartGenerator:
 
         self.default_color = '#6b7280'  # gray for unknown status
 
-    def create_radar_chart(self, df_credit_score: pd.DataFrame) -> go.Figure:
-        """Create radar chart for 7 aspect scores"""
+    def _cached(self, chart_type: str, params: tuple, frame: pd.DataFrame, build) -> go.Figure:
+        """build(), or the cached figure built from the same chart type, parameters and input slice"""
+        if self.figure_cache is None:
+            return build()
+        return self.figure_cache.get_or_build((chart_type, self.fast, params, frame_fingerprint(frame)), build)
+
+    def _figure(self, spec: dict) -> go.Figure:
+        """go.Figure of a spec, or on the fast path the spec itself as a SpecFigure"""
+        return spec_figure(spec) if self.fast else go.Figure(spec)
+
+    def create_radar_chart(self, df_credit_score: pd.DataFrame, firm_id: Optional[str] = None) -> go.Figure:
+        """Create radar chart for 7 aspect scores (of firm_id, or of the first row)"""
         if df_credit_score is None or df_credit_score.empty:
             return go.Figure()
 
-        row = df_credit_score.iloc[0]
+        if firm_id is not None:
+            df_credit_score = df_credit_score[df_credit_score['firm_id'].astype(str) == str(firm_id)]
+            if df_credit_score.empty:
+                return go.Figure()
+
+        scores_df = df_credit_score.iloc[:1][RADAR_SCORE_COLUMNS]
+        return self._cached('radar', (), scores_df, lambda: self._build_radar_chart(scores_df.iloc[0]))
+
+    def _build_radar_chart(self, row: pd.Series) -> go.Figure:
         aspects = ['Liquidity', 'Solvency', 'Profitability', 'Activity', 'Coverage', 'Cashflow', 'Structure']
-        scores = [
-            row['liquidity_score'], row['solvency_score'], row['profitability_score'],
-            row['activity_score'], row['coverage_score'], row['cashflow_score'], row['structure_score']
-        ]
+        scores = [row[col] for col in RADAR_SCORE_COLUMNS]
 
         # Close the radar chart
         aspects.append(aspects[0])
         scores.append(scores[0])
 
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatterpolar(
-            r=scores,
-            theta=aspects,
+        trace = validated(
+            go.Scatterpolar,
             fill='toself',
             name='Scores',
             line_color='#2563eb',
             fillcolor='rgba(37, 99, 235, 0.2)',
             hovertemplate='<b>%{theta}</b><br>Score: %{r:.1f}<extra></extra>'
-        ))
-
-        fig.update_layout(
+        )
+        layout = validated(
+            go.Layout,
             polar=dict(
                 radialaxis=dict(
                     visible=True,
@@ -60,13 +87,18 @@ class ChartGenerator:
             margin=dict(l=20, r=20, t=20, b=20)
         )
 
-        return fig
+        return self._figure({'data': [dict(trace, r=scores, theta=aspects)], 'layout': layout})
 
     def create_aspect_bar_chart(self, contributions_df: pd.DataFrame) -> go.Figure:
         """Create horizontal bar chart for aspect contributions"""
         if contributions_df.empty:
             return go.Figure()
 
+        contributions_df = contributions_df[['aspect', 'score', 'weight', 'contribution', 'status']]
+        return self._cached('aspect_bar', (), contributions_df,
+                            lambda: self._build_aspect_bar_chart(contributions_df))
+
+    def _build_aspect_bar_chart(self, contributions_df: pd.DataFrame) -> go.Figure:
         # Color bars by status
         colors = [self.status_colors.get(status, self.default_color) for status in contributions_df['status']]
 
@@ -76,20 +108,14 @@ class ChartGenerator:
             contributions_df['contribution']   # Contribution
         ))
 
-        fig = go.Figure(data=[
-            go.Bar(
-                y=contributions_df['aspect'],
-                x=contributions_df['score'],
-                orientation='h',
-                marker_color=colors,
-                text=contributions_df.apply(lambda row: f"{row['score']:.1f} ({row['weight']*100:.0f}%)", axis=1),
-                textposition='auto',
-                hovertemplate='<b>%{y}</b><br>Score: %{x:.1f}<br>Weight: %{customdata[0]:.0f}%<br>Contribution: %{customdata[1]:.1f}<extra></extra>',
-                customdata=customdata_combined
-            )
-        ])
-
-        fig.update_layout(
+        trace = validated(
+            go.Bar,
+            orientation='h',
+            textposition='auto',
+            hovertemplate='<b>%{y}</b><br>Score: %{x:.1f}<br>Weight: %{customdata[0]:.0f}%<br>Contribution: %{customdata[1]:.1f}<extra></extra>'
+        )
+        layout = validated(
+            go.Layout,
             title='Aspect Scores (Sorted by Contribution)',
             xaxis_title='Score (0-100)',
             yaxis_title='',
@@ -98,26 +124,33 @@ class ChartGenerator:
             xaxis=dict(range=[0, 100])
         )
 
-        return fig
+        return self._figure({'data': [dict(
+            trace,
+            y=contributions_df['aspect'].to_numpy(),
+            x=contributions_df['score'].to_numpy(),
+            marker=dict(color=colors),
+            text=contributions_df.apply(lambda row: f"{row['score']:.1f} ({row['weight']*100:.0f}%)", axis=1).to_numpy(),
+            customdata=customdata_combined
+        )], 'layout': layout})
 
     def create_trend_chart(self, df_ratios: pd.DataFrame, metric_name: str) -> go.Figure:
         """Create line chart for ratio trends"""
         if df_ratios is None or df_ratios.empty or metric_name not in df_ratios.columns:
             return go.Figure()
 
-        fig = go.Figure()
+        series_df = df_ratios[['year', metric_name]]
+        return self._cached('trend', (metric_name,), series_df,
+                            lambda: self._build_trend_chart(series_df, metric_name))
 
-        fig.add_trace(go.Scatter(
-            x=df_ratios['year'],
-            y=df_ratios[metric_name],
+    def _build_trend_chart(self, df_ratios: pd.DataFrame, metric_name: str) -> go.Figure:
+        trace = validated(
+            go.Scatter,
             mode='lines+markers',
-            name=metric_name,
             line=dict(color='#2563eb', width=2),
-            marker=dict(size=6),
-            hovertemplate=f'<b>{metric_name}</b><br>Year: %{{x}}<br>Value: %{{y:.2f}}<extra></extra>'
-        ))
-
-        fig.update_layout(
+            marker=dict(size=6)
+        )
+        layout = validated(
+            go.Layout,
             xaxis_title='Year',
             yaxis_title='Value',
             height=300,
@@ -125,37 +158,107 @@ class ChartGenerator:
             showlegend=False
         )
 
-        return fig
+        return self._figure({'data': [dict(
+            trace,
+            x=df_ratios['year'].to_numpy(),
+            y=df_ratios[metric_name].to_numpy(),
+            name=metric_name,
+            hovertemplate=f'<b>{metric_name}</b><br>Year: %{{x}}<br>Value: %{{y:.2f}}<extra></extra>'
+        )], 'layout': layout})
+
+    def create_ratio_small_multiples(self, df_ratios: pd.DataFrame, ratio_names: list, columns: int = 3,
+                                     row_height: int = 180) -> go.Figure:
+        """Create one subplot grid with a trend line per ratio, sharing the year axis"""
+        if df_ratios is None or df_ratios.empty:
+            return go.Figure()
+        ratio_names = [name for name in ratio_names if name in df_ratios.columns]
+        if not ratio_names:
+            return go.Figure()
+
+        series_df = df_ratios[['year'] + ratio_names]
+        return self._cached('ratio_small_multiples', (tuple(ratio_names), columns, row_height), series_df,
+                            lambda: self._build_ratio_small_multiples(series_df, ratio_names, columns, row_height))
+
+    def _build_ratio_small_multiples(self, df_ratios: pd.DataFrame, ratio_names: list, columns: int,
+                                     row_height: int) -> go.Figure:
+        # Grid laid out directly (as make_subplots would, with shared x per column)
+        columns = max(1, min(columns, len(ratio_names)))
+        rows = -(-len(ratio_names) // columns)
+        h_spacing, v_spacing = 0.08, min(0.1, 0.3 / rows)
+        cell_width = (1 - h_spacing * (columns - 1)) / columns
+        cell_height = (1 - v_spacing * (rows - 1)) / rows
+        # Lowest cell of each column carries that column's year tick labels
+        bottom = {col: max(i for i in range(len(ratio_names)) if i % columns == col) for col in range(columns)}
+
+        trace_style = validated(go.Scatter, mode='lines+markers', line=dict(color='#2563eb', width=2),
+                                marker=dict(size=5))
+        title_style = validated(go.layout.Annotation, xref='paper', yref='paper', xanchor='center',
+                                yanchor='bottom', showarrow=False, font=dict(size=13))
+
+        traces, axes, titles = [], {}, []
+        for i, name in enumerate(ratio_names):
+            row, col = divmod(i, columns)
+            suffix = '' if i == 0 else str(i + 1)
+            x_domain = [col * (cell_width + h_spacing), min(1.0, col * (cell_width + h_spacing) + cell_width)]
+            y_top = 1 - row * (cell_height + v_spacing)
+            y_domain = [max(0.0, y_top - cell_height), y_top]
+
+            traces.append(dict(
+                trace_style,
+                x=df_ratios['year'].to_numpy(),
+                y=df_ratios[name].to_numpy(),
+                name=name,
+                hovertemplate=f'<b>{name}</b><br>Year: %{{x}}<br>Value: %{{y:.2f}}<extra></extra>',
+                xaxis=f'x{suffix}',
+                yaxis=f'y{suffix}'
+            ))
+            bottom_suffix = '' if bottom[col] == 0 else str(bottom[col] + 1)
+            axes[f'xaxis{suffix}'] = dict(anchor=f'y{suffix}', domain=x_domain)
+            if i != bottom[col]:
+                axes[f'xaxis{suffix}'].update(matches=f'x{bottom_suffix}', showticklabels=False)
+            axes[f'yaxis{suffix}'] = dict(anchor=f'x{suffix}', domain=y_domain)
+            titles.append(dict(title_style, text=name.replace('_', ' ').title(), x=sum(x_domain) / 2, y=y_top))
+
+        # The grid layout depends only on the number of cells, so it is validated once per grid shape
+        layout = validated(
+            go.Layout,
+            **axes,
+            height=rows * row_height + 40,
+            margin=dict(l=20, r=20, t=40, b=20),
+            showlegend=False
+        )
+
+        return self._figure({'data': traces, 'layout': dict(layout, annotations=titles)})
 
     def create_sparkline(self, df_ratios: pd.DataFrame, metric_name: str) -> go.Figure:
         """Create small sparkline for trend visualization"""
         if df_ratios is None or df_ratios.empty or metric_name not in df_ratios.columns:
             return go.Figure()
 
-        fig = go.Figure()
+        series_df = df_ratios[['year', metric_name]]
+        return self._cached('sparkline', (metric_name,), series_df,
+                            lambda: self._build_sparkline(series_df, metric_name))
 
-        fig.add_trace(go.Scatter(
-            x=df_ratios['year'],
-            y=df_ratios[metric_name],
-            mode='lines',
-            line=dict(color='#6b7280', width=1),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    def _build_sparkline(self, df_ratios: pd.DataFrame, metric_name: str) -> go.Figure:
+        traces = [dict(
+            validated(go.Scatter, mode='lines', line=dict(color='#6b7280', width=1), showlegend=False,
+                      hoverinfo='none'),
+            x=df_ratios['year'].to_numpy(),
+            y=df_ratios[metric_name].to_numpy()
+        )]
 
         # Highlight last point
         if not df_ratios.empty:
             last_point = df_ratios.iloc[-1]
-            fig.add_trace(go.Scatter(
+            traces.append(dict(
+                validated(go.Scatter, mode='markers', marker=dict(color='#2563eb', size=4), showlegend=False,
+                          hoverinfo='none'),
                 x=[last_point['year']],
-                y=[last_point[metric_name]],
-                mode='markers',
-                marker=dict(color='#2563eb', size=4),
-                showlegend=False,
-                hoverinfo='none'
+                y=[last_point[metric_name]]
             ))
 
-        fig.update_layout(
+        layout = validated(
+            go.Layout,
             height=60,
             margin=dict(l=0, r=0, t=0, b=0),
             showlegend=False,
@@ -163,7 +266,50 @@ class ChartGenerator:
             yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
         )
 
-        return fig
+        return self._figure({'data': traces, 'layout': layout})
+
+    def create_svg_sparklines(self, df: pd.DataFrame, columns: list, x_col: str = 'year',
+                              width: int = 80, height: int = 20) -> Dict[str, str]:
+        """Inline SVG sparklines for several columns at once: {column: '<svg>...</svg>'}
+
+        Columns with fewer than two values are left out. Missing values are skipped.
+        """
+        if df is None or df.empty or x_col not in df.columns:
+            return {}
+        columns = [col for col in columns if col in df.columns]
+        if not columns:
+            return {}
+
+        df_sorted = df.sort_values(x_col)
+        x = df_sorted[x_col].to_numpy(dtype=float)
+        values = df_sorted[columns].to_numpy(dtype=float)  # (years, columns)
+
+        # Scale every column into the drawing box in one pass (flat series are drawn mid-height)
+        pad = 2.0
+        x_span = x.max() - x.min()
+        xs = pad + (x - x.min()) / x_span * (width - 2 * pad) if x_span > 0 else np.full(len(x), width / 2)
+        low = np.fmin.reduce(values, axis=0)
+        span = np.fmax.reduce(values, axis=0) - low
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scaled = np.where(span > 0, (values - low) / span, 0.5)
+        ys = pad + (1 - scaled) * (height - 2 * pad)
+
+        valid = ~np.isnan(values)
+        points = np.char.add(np.char.add(np.char.mod('%.1f', xs)[:, None], ','), np.char.mod('%.1f', ys))
+        last = len(x) - 1 - np.argmax(valid[::-1], axis=0)
+
+        sparklines = {}
+        for j, col in enumerate(columns):
+            if valid[:, j].sum() < 2:
+                continue
+            sparklines[col] = (
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                f'viewBox="0 0 {width} {height}">'
+                f'<polyline points="{" ".join(points[valid[:, j], j])}" fill="none" stroke="#6b7280" '
+                f'stroke-width="1"/>'
+                f'<circle cx="{xs[last[j]]:.1f}" cy="{ys[last[j], j]:.1f}" r="2" fill="#2563eb"/></svg>'
+            )
+        return sparklines
 
     def format_number(self, value: float, decimal_places: int = 2) -> str:
         """Format numbers with thousands separator"""
@@ -194,23 +340,27 @@ class ChartGenerator:
         if df.empty or not y_cols:
             return go.Figure()
 
-        fig = go.Figure()
+        plot_df = df[list(dict.fromkeys([x_col] + [col for col in y_cols if col in df.columns]))]
+        return self._cached('multi_line', (x_col, tuple(y_cols), title), plot_df,
+                            lambda: self._build_multi_line_chart(plot_df, x_col, y_cols, title))
 
+    def _build_multi_line_chart(self, df: pd.DataFrame, x_col: str, y_cols: list, title: str) -> go.Figure:
         colors = ['#2563eb', '#dc2626', '#16a34a', '#ca8a04', '#9333ea', '#ea580c']
 
+        traces = []
         for i, col in enumerate(y_cols):
             if col in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df[x_col],
-                    y=df[col],
-                    mode='lines+markers',
+                traces.append(dict(
+                    validated(go.Scatter, mode='lines+markers', line=dict(color=colors[i % len(colors)], width=2),
+                              marker=dict(size=6)),
+                    x=df[x_col].to_numpy(),
+                    y=df[col].to_numpy(),
                     name=col,
-                    line=dict(color=colors[i % len(colors)], width=2),
-                    marker=dict(size=6),
                     hovertemplate=f'<b>{col}</b><br>{x_col}: %{{x}}<br>Value: %{{y:,.0f}}<extra></extra>'
                 ))
 
-        fig.update_layout(
+        layout = validated(
+            go.Layout,
             title=title,
             xaxis_title=x_col.title(),
             yaxis_title='Value',
@@ -220,28 +370,33 @@ class ChartGenerator:
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
         )
 
-        return fig
+        return self._figure({'data': traces, 'layout': layout})
 
     def create_clustered_bar_chart(self, df: pd.DataFrame, x_col: str, y_cols: list, title: str) -> go.Figure:
         """Create a clustered bar chart for comparing multiple categories"""
         if df.empty or not y_cols:
             return go.Figure()
 
-        fig = go.Figure()
+        plot_df = df[list(dict.fromkeys([x_col] + [col for col in y_cols if col in df.columns]))]
+        return self._cached('clustered_bar', (x_col, tuple(y_cols), title), plot_df,
+                            lambda: self._build_clustered_bar_chart(plot_df, x_col, y_cols, title))
 
+    def _build_clustered_bar_chart(self, df: pd.DataFrame, x_col: str, y_cols: list, title: str) -> go.Figure:
         colors = ['#2563eb', '#dc2626', '#16a34a', '#ca8a04', '#9333ea', '#ea580c']
 
+        traces = []
         for i, col in enumerate(y_cols):
             if col in df.columns:
-                fig.add_trace(go.Bar(
-                    x=df[x_col],
-                    y=df[col],
+                traces.append(dict(
+                    validated(go.Bar, marker_color=colors[i % len(colors)]),
+                    x=df[x_col].to_numpy(),
+                    y=df[col].to_numpy(),
                     name=col,
-                    marker_color=colors[i % len(colors)],
                     hovertemplate=f'<b>{col}</b><br>{x_col}: %{{x}}<br>Value: %{{y:,.0f}}<extra></extra>'
                 ))
 
-        fig.update_layout(
+        layout = validated(
+            go.Layout,
             title=title,
             xaxis_title=x_col.title(),
             yaxis_title='Value',
@@ -252,4 +407,4 @@ class ChartGenerator:
             barmode='group'
         )
 
-        return fig
\ No newline at end of file
+        return self._figure({'data': traces, 'layout': layout})
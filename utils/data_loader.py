@@ -1,12 +1,51 @@
 import pandas as pd
 import os
-from typing import Dict, Optional
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from utils.storage import read_table, resolve_source
+from utils.partitions import PartitionedStore, is_layout_current
+from utils.ratio_cube import RatioCube, is_cube_current
+from utils.schema import apply_schema
+from utils.sql_backend import SQL_FILE, SqlBackend, is_backend_current
+from utils.text_store import NARRATIVE_COLUMNS, SCORES_FILE, TEXT_STORE_FILE, TextStore, is_store_current
+from utils.figure_store import FIGURE_STORE_FILE, FigureStore, is_figure_store_current
 
 class DataLoader:
     """Handles loading and validation of credit analysis data files"""
 
-    def __init__(self, data_path: str = "./data/"):
+    def __init__(self, data_path: str = "./data/", max_workers: int = 4):
         self.data_path = data_path
+        # Bounded thread pool size for reading the data files concurrently (1 = sequential)
+        self.max_workers = max_workers
+        self.load_report = None
+        self.loaded_data = None
+        self.data_files = {
+            'credit_score': 'df_credit_score.csv',
+            'agg': 'df_agg.csv',
+            'ratios': 'df_ratios.csv',
+            'company_info': 'company_info_sub.csv',
+            'balance_sheet': 'balance_sheet_sub.csv',
+            'income_info': 'income_info_sub.csv',
+            'cash_flow': 'cash_flow_sub.csv'
+        }
+        self.partition_path = os.path.join(data_path, 'partitions')
+        self._partition_store = None
+        self.ratio_cube_path = os.path.join(data_path, 'ratio_cube')
+        self._ratio_cube = None
+        self.sql_path = os.path.join(data_path, SQL_FILE)
+        self._sql_backend = None
+        self.figure_store_path = os.path.join(data_path, FIGURE_STORE_FILE)
+        self._figure_store = None
+
+        # Narrative text lives in the text store once built; only scores are scanned
+        self.text_store_path = os.path.join(data_path, TEXT_STORE_FILE)
+        self._text_store = None
+        if is_store_current(data_path, self.data_files['credit_score']):
+            self.data_files['credit_score'] = SCORES_FILE
+
         self.required_credit_columns = [
             'firm_id', 'liquidity_score', 'liquidity_reason', 'liquidity_status',
             'solvency_score', 'solvency_reason', 'solvency_status',
@@ -20,6 +59,11 @@ class DataLoader:
             'activity_analysis', 'coverage_analysis', 'cashflow_analysis',
             'structure_analysis', 'genai_recommendation'
         ]
+        # The slim scores table has no narrative columns: validate_credit_data checks them in the text store
+        self.required_text_fields = []
+        if self.data_files['credit_score'] == SCORES_FILE:
+            self.required_text_fields = [c for c in self.required_credit_columns if c in NARRATIVE_COLUMNS]
+            self.required_credit_columns = [c for c in self.required_credit_columns if c not in NARRATIVE_COLUMNS]
 
         self.aspect_weights = {
             'liquidity': 0.15,
@@ -51,55 +95,183 @@ class DataLoader:
             'activity_analysis', 'coverage_analysis', 'cashflow_analysis', 'structure_analysis'
         ]
 
-    def load_data(self) -> Dict[str, Optional[pd.DataFrame]]:
-        """Load all required data files"""
-        data_files = {
-            'credit_score': 'df_credit_score.csv',
-            'agg': 'df_agg.csv',
-            'ratios': 'df_ratios.csv',
-            'company_info': 'company_info_sub.csv',
-            'balance_sheet': 'balance_sheet_sub.csv',
-            'income_info': 'income_info_sub.csv',
-            'cash_flow': 'cash_flow_sub.csv'
-        }
+    def _load_table(self, key: str, filename: str) -> Tuple[Optional[pd.DataFrame], Dict]:
+        """Load one data file and record how long it took"""
+        filepath = os.path.join(self.data_path, filename)
+        source = resolve_source(filepath)
+        stats = {'table': key, 'file': os.path.basename(source), 'seconds': 0.0,
+                 'bytes': 0, 'rows': 0, 'columns': 0, 'error': None}
+
+        start = time.perf_counter()
+        df = None
+        try:
+            if os.path.exists(source):
+                stats['bytes'] = os.path.getsize(source)
+                df = read_table(filepath)
+                stats['rows'], stats['columns'] = df.shape
+
+                # Remember the inferred footprint before casting to the declared schema
+                memory_inferred = int(df.memory_usage(deep=True).sum())
+                df = apply_schema(df, key)
+                df.attrs['memory_inferred'] = memory_inferred
+            else:
+                print(f"Warning: File {filename} not found at {filepath}")
+                stats['error'] = 'not found'
+        except Exception as e:
+            print(f"Error loading {filename}: {str(e)}")
+            stats['error'] = str(e)
+        stats['seconds'] = time.perf_counter() - start
+
+        return df, stats
+
+    def load_data_with_report(self, max_workers: Optional[int] = None) -> Tuple[Dict[str, Optional[pd.DataFrame]], pd.DataFrame]:
+        """Load all data files, in parallel when max_workers > 1, with a per-file timing report"""
+        max_workers = self.max_workers if max_workers is None else max_workers
+        max_workers = max(1, min(max_workers, len(self.data_files)))
+
+        if max_workers == 1:
+            results = [self._load_table(key, filename) for key, filename in self.data_files.items()]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='data-loader') as executor:
+                results = list(executor.map(lambda item: self._load_table(*item), self.data_files.items()))
+
+        loaded_data = {stats['table']: df for df, stats in results}
+        report = pd.DataFrame([stats for _, stats in results])
+        report = report.sort_values('seconds', ascending=False).reset_index(drop=True)
+        self.load_report = report
+        self.loaded_data = loaded_data
+
+        return loaded_data, report
+
+    def load_data(self) -> 'LazyDataMapping':
+        """Return a mapping of all data files that reads each table on first access"""
+        self.loaded_data = LazyDataMapping(self)
+        return self.loaded_data
 
-        loaded_data = {}
+    def memory_report(self, data: Optional[Mapping[str, Optional[pd.DataFrame]]] = None) -> pd.DataFrame:
+        """Memory saved per table by the declared schema compared to inferred dtypes"""
+        if data is None:
+            data = self.loaded_data if self.loaded_data is not None else self.load_data()
 
-        for key, filename in data_files.items():
-            filepath = os.path.join(self.data_path, filename)
+        # Only report tables that are already in memory
+        tables = data.materialized() if isinstance(data, LazyDataMapping) else dict(data)
+
+        rows = []
+        for key, df in tables.items():
+            if df is None:
+                continue
+            compact = int(df.memory_usage(deep=True).sum())
+            inferred = df.attrs.get('memory_inferred', compact)
+            rows.append({
+                'table': key,
+                'rows': len(df),
+                'bytes_inferred': inferred,
+                'bytes_compact': compact,
+                'bytes_saved': inferred - compact,
+                'pct_saved': (inferred - compact) / inferred * 100 if inferred else 0.0
+            })
+
+        return pd.DataFrame(rows)
+
+    def load_firm(self, firm_id: str) -> Dict[str, Optional[pd.DataFrame]]:
+        """Load only one firm's rows from each table using the firm-partitioned layout"""
+        # A layout built from older data files is dropped (and reopened once rebuilt)
+        if self._partition_store is not None and not self._partition_store.is_current(self.data_path, self.data_files):
+            self._partition_store = None
+        if self._partition_store is None and is_layout_current(self.partition_path, self.data_path, self.data_files):
+            self._partition_store = PartitionedStore(self.partition_path)
+
+        if self._partition_store is not None:
+            # Same declared dtypes as the full tables, whichever path served the firm
+            return {key: apply_schema(df, key) if df is not None else None
+                    for key, df in self._partition_store.load_firm(firm_id).items()}
+
+        # No partitioned layout built yet, or it is stale: filter the full tables instead
+        print(f"Warning: No current partitioned layout at {self.partition_path}, loading full tables")
+        firm_data = {}
+        for key, df in self.load_data().items():
+            firm_data[key] = df[df['firm_id'].astype(str) == str(firm_id)].reset_index(drop=True) if df is not None else None
+        return firm_data
+
+    def ratio_cube(self) -> Optional[RatioCube]:
+        """Memory-mapped firm x year x ratio cube, or None if it has not been built or is stale"""
+        if self._ratio_cube is None:
+            ratios_path = os.path.join(self.data_path, self.data_files['ratios'])
+            if not is_cube_current(self.ratio_cube_path, ratios_path):
+                return None
+            self._ratio_cube = RatioCube(self.ratio_cube_path)
+        return self._ratio_cube
+
+    def sql_backend(self) -> Optional[SqlBackend]:
+        """Indexed SQLite backend, or None if it has not been built or is stale"""
+        if self._sql_backend is None:
+            if not is_backend_current(self.sql_path, self.data_path, self.data_files):
+                return None
+            self._sql_backend = SqlBackend(self.sql_path)
+        return self._sql_backend
+
+    def figure_store(self) -> Optional[FigureStore]:
+        """Precomputed per-firm figures, or None if the store has not been built or is stale"""
+        if self._figure_store is None:
+            if not is_figure_store_current(self.figure_store_path, self):
+                return None
+            self._figure_store = FigureStore(self.figure_store_path)
+        return self._figure_store
+
+    def get_data_fingerprint(self) -> Tuple:
+        """Identify the current state of the data files by name, mtime and size"""
+        fingerprint = []
+        for key, filename in self.data_files.items():
+            filepath = resolve_source(os.path.join(self.data_path, filename))
             try:
-                if os.path.exists(filepath):
-                    loaded_data[key] = pd.read_csv(filepath)
-                else:
-                    print(f"Warning: File {filename} not found at {filepath}")
-                    loaded_data[key] = None
-            except Exception as e:
-                print(f"Error loading {filename}: {str(e)}")
-                loaded_data[key] = None
-
-        return loaded_data
-
-    def get_current_firm_id(self, df_credit_score: pd.DataFrame) -> str:
-        """Get the current firm_id from credit score data"""
-        if df_credit_score is not None and not df_credit_score.empty:
-            return str(df_credit_score['firm_id'].iloc[0])
-        return "Unknown"
+                stat = os.stat(filepath)
+                fingerprint.append((os.path.basename(filepath), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append((filename, None, None))
+        return tuple(fingerprint)
+
+    def text_store(self) -> Optional[TextStore]:
+        """Narrative text store, or None if it has not been built"""
+        if self._text_store is None and os.path.exists(self.text_store_path):
+            self._text_store = TextStore(self.text_store_path)
+        return self._text_store
+
+    def get_narratives(self, firm_id: str, fields: List[str], row: Optional[pd.Series] = None) -> Dict[str, Optional[str]]:
+        """Narrative text of one firm, from its credit score row or from the text store"""
+        if row is not None and all(field in row.index for field in fields):
+            return {field: row[field] for field in fields}
+
+        text_store = self.text_store()
+        if text_store is None:
+            return {field: row.get(field) if row is not None else None for field in fields}
+        return text_store.get(firm_id, fields)
 
     def validate_credit_data(self, df: pd.DataFrame) -> bool:
-        """Basic validation of credit score data"""
+        """Basic validation of credit score data (narrative fields against the text store once it is split)"""
         if df is None or df.empty:
             return False
-        return all(col in df.columns for col in self.required_credit_columns)
+        if not all(col in df.columns for col in self.required_credit_columns):
+            return False
+        if not self.required_text_fields:
+            return True
+        text_store = self.text_store()
+        return text_store is not None and text_store.has_fields(self.required_text_fields)
 
-    def get_aspect_contributions(self, df_credit_score: pd.DataFrame) -> pd.DataFrame:
-        """Calculate contribution of each aspect to final score"""
+    def get_aspect_contributions(self, df_credit_score: pd.DataFrame, firm_id: Optional[str] = None) -> pd.DataFrame:
+        """Calculate contribution of each aspect to final score (of firm_id, or of the first row)"""
         if df_credit_score is None or df_credit_score.empty:
             return pd.DataFrame()
 
+        if firm_id is not None:
+            df_credit_score = df_credit_score[df_credit_score['firm_id'].astype(str) == str(firm_id)]
+            if df_credit_score.empty:
+                return pd.DataFrame()
+
         row = df_credit_score.iloc[0]
         contributions = []
 
         aspects = ['liquidity', 'solvency', 'profitability', 'activity', 'coverage', 'cashflow', 'structure']
+        reasons = self.get_narratives(str(row['firm_id']), self.aspect_reasons, row)
 
         for aspect in aspects:
             score = row[f'{aspect}_score']
@@ -112,7 +284,7 @@ class DataLoader:
                 'weight': weight,
                 'contribution': contribution,
                 'status': row[f'{aspect}_status'],
-                'reason': row[f'{aspect}_reason']
+                'reason': reasons[f'{aspect}_reason']
             })
 
         df_contrib = pd.DataFrame(contributions)
@@ -136,4 +308,45 @@ class DataLoader:
                     'debt_to_equity': latest_data.iloc[0].get('debt_to_equity', None)
                 })
 
-        return variables
\ No newline at end of file
+        return variables
+
+
+class LazyDataMapping(Mapping):
+    """Read-only mapping of the data files that loads and caches each table on first access"""
+
+    def __init__(self, data_loader: DataLoader):
+        self._loader = data_loader
+        self._tables = {}
+        # One lock per table so different tables can load concurrently
+        self._locks = {key: threading.Lock() for key in data_loader.data_files}
+        self.load_stats = []
+
+    def __getitem__(self, key: str) -> Optional[pd.DataFrame]:
+        if key not in self._locks:
+            raise KeyError(key)
+
+        if key not in self._tables:
+            with self._locks[key]:
+                if key not in self._tables:
+                    df, stats = self._loader._load_table(key, self._loader.data_files[key])
+                    self.load_stats.append(stats)
+                    self._tables[key] = df
+        return self._tables[key]
+
+    def __iter__(self):
+        return iter(self._loader.data_files)
+
+    def __len__(self) -> int:
+        return len(self._loader.data_files)
+
+    def is_loaded(self, key: str) -> bool:
+        """Whether a table has been read already"""
+        return key in self._tables
+
+    def materialized(self) -> Dict[str, Optional[pd.DataFrame]]:
+        """Tables read so far, without triggering any new reads"""
+        return dict(self._tables)
+
+    def load_report(self) -> pd.DataFrame:
+        """Per-file timing of the tables read so far"""
+        return pd.DataFrame(list(self.load_stats))
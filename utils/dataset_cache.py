@@ -0,0 +1,82 @@
+import os
+import threading
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import pandas as pd
+
+
+class DatasetCache:
+    """Process-wide cache that shares one read-only dataset between all sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # data directory -> (file fingerprint, loaded data, derived structures by name, loader that read it)
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, data_loader) -> Tuple[bool, tuple]:
+        """(whether it was cached, current entry) for the loader's data path; call with the lock held"""
+        path_key = os.path.abspath(data_loader.data_path)
+        fingerprint = data_loader.get_data_fingerprint()
+
+        entry = self._entries.get(path_key)
+        if entry is not None and entry[0] == fingerprint:
+            return True, entry
+
+        # Tables are read lazily, on first access by any session
+        entry = (fingerprint, data_loader.load_data(), {}, data_loader)
+        self._entries[path_key] = entry
+        return False, entry
+
+    def get(self, data_loader) -> Mapping[str, Optional[pd.DataFrame]]:
+        """Return the shared dataset for the loader's data path, reloading it if any file changed"""
+        with self._lock:
+            hit, entry = self._entry(data_loader)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry[1]
+
+    def get_loader(self, data_path: str, make_loader: Callable[[str], object]):
+        """Return the loader behind the shared dataset of data_path, making a new one only on first use
+        or after a data file changed (so its store handles live as long as the dataset)"""
+        # Not counted either: callers look the dataset up with get() using the returned loader
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(data_path))
+            if entry is not None and entry[0] == entry[3].get_data_fingerprint():
+                return entry[3]
+            _, entry = self._entry(make_loader(data_path))
+            return entry[3]
+
+    def get_derived(self, data_loader, name: str, build: Callable[[Mapping], object]):
+        """Return a structure built from the shared dataset, rebuilt whenever the dataset reloads"""
+        # Not counted: hits/misses measure dataset lookups, which get() already records
+        with self._lock:
+            _, entry = self._entry(data_loader)
+            derived = entry[2]
+            if name not in derived:
+                derived[name] = build(entry[1])
+            return derived[name]
+
+    def invalidate(self, data_path: Optional[str] = None):
+        """Drop one cached dataset, or all of them when no path is given"""
+        with self._lock:
+            if data_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(data_path), None)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and number of datasets currently held"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries)
+            }
+
+
+# Shared by every Streamlit session running in this process
+shared_dataset_cache = DatasetCache()
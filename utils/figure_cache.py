@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+
+def frame_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """Content hash of a (small) DataFrame slice: column names, dtypes, index and values"""
+    if df is None:
+        return 'none'
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Process-wide LRU cache of built Plotly figures, shared by all sessions (figures must not be mutated)"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (chart type, parameters, input fingerprint) -> figure, least recently used first
+        self._figures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]):
+        """Return the cached figure for key, building and storing it on a miss"""
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+
+        # Build outside the lock so sessions drawing other charts are not blocked
+        figure = build()
+
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return figure
+
+    def clear(self):
+        """Drop all cached figures (counters are kept)"""
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and number of figures currently held"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._figures)
+            }
+
+
+# Shared by every Streamlit session running in this process
+shared_figure_cache = FigureCache()
@@ -0,0 +1,74 @@
+"""
+Plain-dict Plotly figure specs that bypass per-property validation.
+
+go.Figure and the trace / layout classes validate every property they are
+given, which dominates build time for the small charts the pages draw. A spec
+is the dict go.Figure(...).to_dict() would produce; SpecFigure hands one to
+st.plotly_chart (which only calls to_dict() on figure objects) without
+constructing a figure.
+
+Style fragments that are the same for every chart of a kind (trace styles,
+layout bases) are checked by Plotly once per process through validated() and
+reused as plain dicts; per-chart data (arrays, names, hover text) is filled in
+around them.
+"""
+from typing import Dict, Optional
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+class SpecFigure(go.Figure):
+    """
+    A figure spec that st.plotly_chart accepts as-is.
+
+    go.Figure.__init__ is deliberately skipped (it validates every property);
+    only to_dict / to_plotly_json are supported, and the spec must not be mutated.
+    """
+
+    def __init__(self, spec: Dict):
+        self._spec = spec
+
+    def to_dict(self) -> Dict:
+        return self._spec
+
+    def to_plotly_json(self) -> Dict:
+        return self._spec
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self._spec.get('data', []))} traces)"
+
+
+# Default layout template by pio.templates.default name, as go.Figure() serialises it
+_default_templates = {}
+
+
+def default_template() -> Optional[Dict]:
+    """Layout template a new go.Figure gets in this process (None if it gets none)"""
+    name = pio.templates.default
+    if name not in _default_templates:
+        _default_templates[name] = go.Figure().to_dict()['layout'].get('template')
+    return _default_templates[name]
+
+
+def spec_figure(spec: Dict) -> SpecFigure:
+    """SpecFigure of a spec without a template, with the default template attached as go.Figure would"""
+    template = default_template()
+    if template is not None:
+        spec['layout'] = {'template': template, **spec['layout']}
+    return SpecFigure(spec)
+
+
+# Validated fragments by (Plotly class, properties)
+_validated_fragments = {}
+
+
+def validated(plotly_class, **props) -> Dict:
+    """props checked by plotly_class (e.g. go.Scatter, go.Layout) once per process, as a plain dict
+
+    The dict is shared between every caller asking for the same properties: copy it, never mutate it.
+    """
+    key = (plotly_class.__name__, repr(props))
+    if key not in _validated_fragments:
+        _validated_fragments[key] = plotly_class(**props).to_plotly_json()
+    return _validated_fragments[key]
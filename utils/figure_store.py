@@ -0,0 +1,190 @@
+"""
+Precomputed figure store for the standard per-firm charts.
+
+For a fixed dataset the radar chart, the aspect bar chart and the trend chart
+of every ratio the Sub-Ratio Explorer shows are deterministic for a firm, so
+they are rendered once per data refresh
+into an SQLite file of zlib-compressed Plotly JSON specs keyed by
+(firm_id, chart, param). The layout template (about 7 KB of JSON, the same for
+every chart) is left out and the running process's default template is attached
+on load, as go.Figure would (Streamlit installs its own default). The store
+records the fingerprint (name, mtime, size) of the files it was built from and
+is ignored once they change.
+
+Pages hand a stored spec to st.plotly_chart as a SpecFigure (see
+utils.figure_spec), which skips Plotly's figure construction and validation
+entirely.
+
+Usage:
+    python -m utils.figure_store build --data-path ./data/
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+from utils.charts import ChartGenerator
+from utils.figure_spec import SpecFigure, spec_figure
+from utils.firm_index import FirmIndex
+from utils.ratio_categories import categorized_ratios
+
+FIGURE_STORE_FILE = 'figure_store.sqlite'
+
+# Tables the stored charts are drawn from
+FIGURE_SOURCES = ['credit_score', 'ratios']
+
+# Bump when ChartGenerator output changes so stores built by older code are not served
+FIGURE_STORE_VERSION = 2
+
+
+def source_fingerprint(data_loader) -> str:
+    """Fingerprint of the files the stored charts are drawn from"""
+    entries = dict(zip(data_loader.data_files, data_loader.get_data_fingerprint()))
+    return json.dumps([FIGURE_STORE_VERSION] + [entries.get(key) for key in FIGURE_SOURCES])
+
+
+def _encode(spec: Dict) -> bytes:
+    """Compressed JSON spec without the layout template"""
+    layout = {key: value for key, value in spec.get('layout', {}).items() if key != 'template'}
+    return zlib.compress(json.dumps(dict(spec, layout=layout), cls=PlotlyJSONEncoder).encode('utf-8'))
+
+
+def _firm_figures(index: FirmIndex, data_loader, chart_gen: ChartGenerator,
+                  ratio_columns: List[str]) -> Iterator[Tuple[str, str, str, bytes]]:
+    """(firm_id, chart, param, compressed spec) for every stored chart of every firm"""
+    # Trend charts differ between firms only in their x/y arrays: fill a per-ratio template
+    trend_templates = {}
+
+    for firm_id in index.firm_ids:
+        view = index.firm_data(firm_id)
+
+        df_credit = view['credit_score']
+        if df_credit is not None and not df_credit.empty:
+            yield firm_id, 'radar', '', _encode(chart_gen.create_radar_chart(df_credit, firm_id).to_dict())
+            contributions = data_loader.get_aspect_contributions(df_credit, firm_id)
+            yield firm_id, 'aspect_bar', '', _encode(chart_gen.create_aspect_bar_chart(contributions).to_dict())
+
+        df_ratios = view['ratios']
+        if df_ratios is None or df_ratios.empty:
+            continue
+        years = df_ratios['year'].to_numpy()
+        for ratio in ratio_columns:
+            if ratio not in trend_templates:
+                trend_templates[ratio] = chart_gen.create_trend_chart(df_ratios, ratio).to_dict()
+            template = trend_templates[ratio]
+            trace = dict(template['data'][0], x=years, y=df_ratios[ratio].to_numpy())
+            yield firm_id, 'trend', ratio, _encode({'data': [trace], 'layout': template['layout']})
+
+
+def build_figure_store(data_path: str, store_path: Optional[str] = None) -> Tuple[str, int]:
+    """Render the standard charts of every firm into the figure store. Returns: (store path, figures written)"""
+    from utils.data_loader import DataLoader
+
+    data_loader = DataLoader(data_path)
+    store_path = store_path or os.path.join(data_path, FIGURE_STORE_FILE)
+    # Fingerprint first: files changed while building leave the store stale rather than wrongly current
+    fingerprint = source_fingerprint(data_loader)
+
+    data = data_loader.load_data()
+    index = FirmIndex(data)
+    df_ratios = data['ratios']
+    # Only the ratios the Sub-Ratio Explorer shows, not the raw statement amounts
+    ratio_columns = (categorized_ratios([col for col in df_ratios.columns if col not in ['firm_id', 'year']])
+                     if df_ratios is not None else [])
+
+    tmp_path = store_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE figures (firm_id TEXT NOT NULL, chart TEXT NOT NULL, param TEXT NOT NULL, spec BLOB, "
+            "PRIMARY KEY (firm_id, chart, param)) WITHOUT ROWID"
+        )
+        conn.executemany("INSERT INTO figures (firm_id, chart, param, spec) VALUES (?, ?, ?, ?)",
+                         _firm_figures(index, data_loader, ChartGenerator(), ratio_columns))
+        conn.execute("INSERT INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+        count = conn.execute("SELECT COUNT(*) FROM figures").fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, store_path)
+    return store_path, count
+
+
+def is_figure_store_current(store_path: str, data_loader) -> bool:
+    """Whether the store exists and was built from the data files as they are now"""
+    if not os.path.exists(store_path):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return row is not None and row[0] == source_fingerprint(data_loader)
+
+
+class FigureStore:
+    """Read-only access to the precomputed figures"""
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+
+    def _connect(self) -> sqlite3.Connection:
+        # Streamlit serves sessions from several threads, so connections are not shared
+        return sqlite3.connect(f"file:{self.store_path}?mode=ro", uri=True)
+
+    def get(self, firm_id: str, chart: str, param: str = '') -> Optional[SpecFigure]:
+        """One stored figure, or None if it was not precomputed"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT spec FROM figures WHERE firm_id = ? AND chart = ? AND param = ?",
+                (str(firm_id), chart, param)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return spec_figure(json.loads(zlib.decompress(row[0])))
+
+
+def load_figure(figure_store: Optional[FigureStore], firm_id: str, chart: str, build: Callable[[], go.Figure],
+                param: str = '') -> go.Figure:
+    """The stored figure when there is one, else build()"""
+    figure = figure_store.get(firm_id, chart, param) if figure_store is not None else None
+    return figure if figure is not None else build()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Precomputed per-firm figure store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Render the standard charts of every firm")
+    build_parser.add_argument('--data-path', default='./data/')
+    build_parser.add_argument('--store-path', default=None)
+
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    store_path, count = build_figure_store(args.data_path, args.store_path)
+    print(f"✓ {count} figures written to {store_path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Firm index for selecting one firm out of the loaded universe.
+
+The index holds the selector metadata of every firm (sector and region from
+company_info, kategori and final_score from df_credit_score) and, per table, the
+row positions of each firm. A firm's data is then a set of positional takes on
+the shared tables instead of a firm_id filter over every row, so switching
+firms never reloads or rescans the data.
+"""
+import threading
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FirmIndex:
+    """firm_id -> metadata and per-table row positions over a shared dataset"""
+
+    def __init__(self, data: Mapping):
+        self._data = data
+        self._lock = threading.Lock()
+        # table -> {firm_id: row positions}, built the first time a table is sliced
+        self._positions = {}
+
+        df_credit = data['credit_score']
+        df_company = data['company_info']
+
+        frames = []
+        if df_company is not None:
+            frames.append(df_company.assign(firm_id=df_company['firm_id'].astype(str))
+                          .drop_duplicates('firm_id').set_index('firm_id')[['sector', 'region']])
+        if df_credit is not None:
+            frames.append(df_credit.assign(firm_id=df_credit['firm_id'].astype(str))
+                          .drop_duplicates('firm_id').set_index('firm_id')[['kategori', 'final_score']])
+
+        firms = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        self.firms = firms.reindex(columns=['sector', 'region', 'kategori', 'final_score']).sort_index()
+
+        # Selector labels for every firm, built once: the selector formats every option on each rerun
+        labels = pd.Series(self.firms.index, index=self.firms.index, dtype=object)
+        for col in ['sector', 'region', 'kategori']:
+            values = self.firms[col]
+            known = values.notna()
+            labels[known] = labels[known] + " · " + values[known].astype(str)
+        self._labels = labels.to_dict()
+
+        # Default selection follows the first scored firm, as before
+        self.default_firm = (str(df_credit['firm_id'].iloc[0])
+                             if df_credit is not None and not df_credit.empty
+                             else (self.firm_ids[0] if self.firm_ids else None))
+
+    @property
+    def firm_ids(self) -> List[str]:
+        return self.firms.index.tolist()
+
+    def __len__(self) -> int:
+        return len(self.firms)
+
+    def __contains__(self, firm_id) -> bool:
+        return str(firm_id) in self.firms.index
+
+    def metadata(self, firm_id: str) -> Dict:
+        """sector, region, kategori and final_score of one firm"""
+        if firm_id not in self:
+            return {}
+        return self.firms.loc[str(firm_id)].to_dict()
+
+    def label(self, firm_id: str) -> str:
+        """Selector label: firm id followed by whatever metadata is known"""
+        return self._labels.get(str(firm_id), str(firm_id))
+
+    def _table_positions(self, key: str) -> Dict[str, np.ndarray]:
+        if key not in self._positions:
+            with self._lock:
+                if key not in self._positions:
+                    df = self._data[key]
+                    if df is None or 'firm_id' not in df.columns:
+                        self._positions[key] = {}
+                    else:
+                        groups = df.groupby('firm_id', sort=False).indices
+                        self._positions[key] = {str(firm_id): rows for firm_id, rows in groups.items()}
+        return self._positions[key]
+
+    def firm_rows(self, key: str, firm_id: str) -> Optional[pd.DataFrame]:
+        """One firm's rows of a table (empty frame if the firm has none, None if the table is missing)"""
+        df = self._data[key]
+        if df is None:
+            return None
+        rows = self._table_positions(key).get(str(firm_id), np.array([], dtype=np.intp))
+        return df.take(rows).reset_index(drop=True)
+
+    def firm_data(self, firm_id: str) -> 'FirmDataView':
+        """Read-only mapping of one firm's rows of every table"""
+        return FirmDataView(self, str(firm_id))
+
+
+class FirmDataView(Mapping):
+    """Same keys as the dataset, holding only one firm's rows, sliced on first access"""
+
+    def __init__(self, firm_index: FirmIndex, firm_id: str):
+        self._index = firm_index
+        self.firm_id = firm_id
+        self._tables = {}
+
+    def __getitem__(self, key: str) -> Optional[pd.DataFrame]:
+        if key not in self._tables:
+            self._tables[key] = self._index.firm_rows(key, self.firm_id)
+        return self._tables[key]
+
+    def __iter__(self):
+        return iter(self._index._data)
+
+    def __len__(self) -> int:
+        return len(self._index._data)
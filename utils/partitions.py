@@ -0,0 +1,206 @@
+"""
+Firm-partitioned on-disk layout for the dashboard tables.
+
+Every table is sorted by firm_id and split into partitions of a fixed number of
+firms, stored as uncompressed Arrow IPC files. A persistent index maps each
+firm_id to its partition and to the row offset/length of its rows in every
+table, so loading one firm memory-maps a single partition per table and slices
+it without reading the rest of the universe. The manifest records the
+fingerprint (name, mtime, size) of the file each table was built from, and the
+layout is ignored once any of them changes.
+
+Usage:
+    python -m utils.partitions build --data-path ./data/ --firms-per-partition 1000
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.storage import HAS_PYARROW, read_table, resolve_source
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+LAYOUT_VERSION = 2
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'firm_index.arrow'
+
+
+def _partition_file(layout_path: str, key: str, partition: int) -> str:
+    """Path of one table partition"""
+    return os.path.join(layout_path, key, f'part-{partition:05d}.arrow')
+
+
+def source_fingerprint(data_path: str, data_files: Dict[str, str]) -> Dict[str, Optional[list]]:
+    """Name, mtime and size of the file each table is read from (None if it is missing)"""
+    fingerprint = {}
+    for key, filename in data_files.items():
+        source = resolve_source(os.path.join(data_path, filename))
+        try:
+            stat = os.stat(source)
+            fingerprint[key] = [os.path.basename(source), stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            fingerprint[key] = None
+    return fingerprint
+
+
+def _manifest_is_current(manifest: Dict, data_path: str, data_files: Dict[str, str]) -> bool:
+    return (manifest.get('version') == LAYOUT_VERSION
+            and manifest.get('sources') == source_fingerprint(data_path, data_files))
+
+
+def is_layout_current(layout_path: str, data_path: str, data_files: Dict[str, str]) -> bool:
+    """Whether a layout exists and was built from the data files as they are now"""
+    try:
+        with open(os.path.join(layout_path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return _manifest_is_current(manifest, data_path, data_files)
+
+
+def build_partitions(data_path: str, data_files: Dict[str, str], layout_path: Optional[str] = None,
+                     firms_per_partition: int = 1000) -> str:
+    """Write the firm-partitioned layout and its firm_id -> partition/offset index"""
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required for the partitioned layout (pip install pyarrow)")
+
+    layout_path = layout_path or os.path.join(data_path, 'partitions')
+    # Fingerprint first: files changed while building leave the layout stale rather than wrongly current
+    sources = source_fingerprint(data_path, data_files)
+
+    tables = {}
+    for key, filename in data_files.items():
+        csv_path = os.path.join(data_path, filename)
+        if not os.path.exists(resolve_source(csv_path)):
+            print(f"Warning: File {filename} not found at {csv_path}")
+            continue
+        df = read_table(csv_path)
+        df['firm_id'] = df['firm_id'].astype(str)
+        sort_cols = ['firm_id', 'year'] if 'year' in df.columns else ['firm_id']
+        tables[key] = df.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+
+    # Firm universe across all tables; partitions are contiguous runs of sorted firm ids
+    firm_ids = np.unique(np.concatenate([df['firm_id'].values for df in tables.values()]))
+    firm_partition = np.arange(len(firm_ids)) // firms_per_partition
+    num_partitions = int(firm_partition[-1]) + 1 if len(firm_ids) else 0
+
+    index = pd.DataFrame({'firm_id': firm_ids, 'partition': firm_partition.astype(np.int32)})
+
+    for key, df in tables.items():
+        os.makedirs(os.path.join(layout_path, key), exist_ok=True)
+
+        # Rows per firm and their partition, in sorted firm order
+        firm_pos = np.searchsorted(firm_ids, df['firm_id'].values)
+        row_partition = firm_partition[firm_pos]
+        lengths = np.bincount(firm_pos, minlength=len(firm_ids))
+
+        # Offset of each firm inside its own partition file
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        partition_starts = np.searchsorted(firm_pos, np.arange(num_partitions) * firms_per_partition)
+        offsets = starts - partition_starts[firm_partition]
+
+        index[f'{key}_offset'] = offsets.astype(np.int64)
+        index[f'{key}_length'] = lengths.astype(np.int64)
+
+        bounds = np.searchsorted(row_partition, np.arange(num_partitions + 1))
+        for partition in range(num_partitions):
+            part = df.iloc[bounds[partition]:bounds[partition + 1]]
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            feather.write_feather(table, _partition_file(layout_path, key, partition),
+                                  compression='uncompressed')
+
+    feather.write_feather(pa.Table.from_pandas(index, preserve_index=False),
+                          os.path.join(layout_path, INDEX_FILE), compression='uncompressed')
+
+    manifest = {
+        'version': LAYOUT_VERSION,
+        'tables': list(tables),
+        'firms': int(len(firm_ids)),
+        'firms_per_partition': firms_per_partition,
+        'partitions': num_partitions,
+        'sources': sources
+    }
+    with open(os.path.join(layout_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return layout_path
+
+
+class PartitionedStore:
+    """Reads single firms from a firm-partitioned layout"""
+
+    def __init__(self, layout_path: str):
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for the partitioned layout (pip install pyarrow)")
+
+        self.layout_path = layout_path
+        with open(os.path.join(layout_path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+        # firm_id -> row of the index, loaded once per store
+        index = feather.read_table(os.path.join(layout_path, INDEX_FILE)).to_pandas()
+        self.index = index.set_index('firm_id')
+
+    @staticmethod
+    def exists(layout_path: str) -> bool:
+        """Whether a partitioned layout has been built at this path"""
+        return os.path.exists(os.path.join(layout_path, MANIFEST_FILE))
+
+    def is_current(self, data_path: str, data_files: Dict[str, str]) -> bool:
+        """Whether this layout was built from the data files as they are now"""
+        return _manifest_is_current(self.manifest, data_path, data_files)
+
+    @property
+    def tables(self) -> List[str]:
+        return self.manifest['tables']
+
+    def _read_slice(self, key: str, partition: int, offset: int, length: int) -> pd.DataFrame:
+        """Zero-copy slice of one memory-mapped partition"""
+        source = pa.memory_map(_partition_file(self.layout_path, key, partition), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        return table.slice(offset, length).to_pandas()
+
+    def load_firm(self, firm_id: str) -> Dict[str, Optional[pd.DataFrame]]:
+        """Load only the rows of one firm from every table"""
+        firm_id = str(firm_id)
+        if firm_id not in self.index.index:
+            return {key: None for key in self.tables}
+
+        entry = self.index.loc[firm_id]
+        partition = int(entry['partition'])
+
+        return {
+            key: self._read_slice(key, partition, int(entry[f'{key}_offset']), int(entry[f'{key}_length']))
+            for key in self.tables
+        }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from utils.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Firm-partitioned layout for the dashboard data files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build the partitioned layout and firm index")
+    build_parser.add_argument('--data-path', default='./data/')
+    build_parser.add_argument('--layout-path', default=None)
+    build_parser.add_argument('--firms-per-partition', type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    data_files = DataLoader(args.data_path).data_files
+
+    layout_path = build_partitions(args.data_path, data_files, args.layout_path, args.firms_per_partition)
+    with open(os.path.join(layout_path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    print(f"✓ {manifest['firms']} firms in {manifest['partitions']} partitions at {layout_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Ratio categories shown by the Sub-Ratio Explorer.
+
+Shared by the explorer page and the figure store, which prerenders trend charts
+only for the ratios the explorer displays.
+"""
+from typing import List
+
+
+def get_ratio_categories(ratio_columns: list) -> dict:
+    """Group ratio columns by category for better organization"""
+    return {
+        'Liquidity Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['current_ratio', 'quick_ratio', 'cash_ratio', 'working_capital'])],
+        'Solvency Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['debt_to_equity', 'debt_to_assets', 'equity_to_assets', 'leverage', 'long_term_debt_ratio'])],
+        'Profitability Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['roa', 'roe', 'gross_margin', 'gross_profit_margin', 'net_profit_margin', 'ebitda_margin'])],
+        'Activity/Efficiency Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['turnover', 'days_', 'asset_turnover', 'inventory_turnover'])],
+        'Cash Flow Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['ocf_ratio', 'free_cash_flow', 'cash_quality_ratio'])],
+        'Structure Ratios': [col for col in ratio_columns if any(x in col.lower() for x in ['fund_flow', 'equity_to_asset', 'net_margin_ratio'])]
+    }
+
+
+def categorized_ratios(ratio_columns: list) -> List[str]:
+    """Ratio columns that fall into any category, in column order"""
+    categorized = {col for ratios in get_ratio_categories(ratio_columns).values() for col in ratios}
+    return [col for col in ratio_columns if col in categorized]
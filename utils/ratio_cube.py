@@ -0,0 +1,131 @@
+"""
+Memory-mapped firm x year x ratio cube built from df_ratios.
+
+The cube is a plain .npy array opened with mmap_mode='r', so every worker
+process maps the same pages instead of holding its own copy, and the accessors
+return zero-copy views found by dictionary lookup rather than boolean masks.
+
+Usage:
+    python -m utils.ratio_cube build --data-path ./data/
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.storage import read_table, resolve_source
+
+VALUES_FILE = 'values.npy'
+INDEX_FILE = 'index.json'
+
+
+def build_ratio_cube(data_path: str, ratios_file: str = 'df_ratios.csv', cube_path: Optional[str] = None,
+                     dtype: str = 'float64') -> str:
+    """Persist df_ratios as a firms x years x ratios array plus its index maps"""
+    cube_path = cube_path or os.path.join(data_path, 'ratio_cube')
+    os.makedirs(cube_path, exist_ok=True)
+
+    df = read_table(os.path.join(data_path, ratios_file))
+    df['firm_id'] = df['firm_id'].astype(str)
+    ratio_names = [c for c in df.columns if c not in ['firm_id', 'year'] and pd.api.types.is_numeric_dtype(df[c])]
+
+    firm_codes, firms = pd.factorize(df['firm_id'], sort=True)
+    year_codes, years = pd.factorize(df['year'], sort=True)
+
+    values = np.lib.format.open_memmap(
+        os.path.join(cube_path, VALUES_FILE), mode='w+', dtype=dtype,
+        shape=(len(firms), len(years), len(ratio_names))
+    )
+    # Firm-years missing from df_ratios stay NaN
+    values[:] = np.nan
+    values[firm_codes, year_codes, :] = df[ratio_names].to_numpy(dtype=dtype)
+    values.flush()
+    del values
+
+    index = {
+        'firms': [str(f) for f in firms],
+        'years': [int(y) for y in years],
+        'ratios': ratio_names
+    }
+    with open(os.path.join(cube_path, INDEX_FILE), 'w') as f:
+        json.dump(index, f)
+
+    return cube_path
+
+
+def is_cube_current(cube_path: str, ratios_path: str) -> bool:
+    """Whether a cube exists and is at least as new as df_ratios"""
+    values_path = os.path.join(cube_path, VALUES_FILE)
+    if not (os.path.exists(values_path) and os.path.exists(os.path.join(cube_path, INDEX_FILE))):
+        return False
+    source = resolve_source(ratios_path)
+    return not os.path.exists(source) or os.path.getmtime(values_path) >= os.path.getmtime(source)
+
+
+class RatioCube:
+    """Read-only, memory-mapped view of df_ratios indexed by firm, year and ratio"""
+
+    def __init__(self, cube_path: str):
+        self.cube_path = cube_path
+        self.values = np.load(os.path.join(cube_path, VALUES_FILE), mmap_mode='r')
+
+        with open(os.path.join(cube_path, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.firms = index['firms']
+        self.years = index['years']
+        self.ratios = index['ratios']
+
+        self.firm_index = {firm_id: i for i, firm_id in enumerate(self.firms)}
+        self.year_index = {year: i for i, year in enumerate(self.years)}
+        self.ratio_index = {ratio: i for i, ratio in enumerate(self.ratios)}
+
+    def firm_history(self, firm_id: str) -> np.ndarray:
+        """years x ratios view for one firm"""
+        return self.values[self.firm_index[str(firm_id)]]
+
+    def ratio_across_firms(self, ratio: str) -> np.ndarray:
+        """firms x years view of one ratio"""
+        return self.values[:, :, self.ratio_index[ratio]]
+
+    def year_cross_section(self, year: int) -> np.ndarray:
+        """firms x ratios view for one year"""
+        return self.values[:, self.year_index[int(year)], :]
+
+    def value(self, firm_id: str, year: int, ratio: str) -> float:
+        """Single ratio value for one firm-year"""
+        return float(self.values[self.firm_index[str(firm_id)], self.year_index[int(year)], self.ratio_index[ratio]])
+
+    def firm_frame(self, firm_id: str) -> pd.DataFrame:
+        """One firm's history as a DataFrame shaped like df_ratios (years without data dropped)"""
+        values = np.array(self.firm_history(firm_id))
+        history = pd.DataFrame(values, columns=self.ratios)
+        history.insert(0, 'year', self.years)
+        history.insert(0, 'firm_id', str(firm_id))
+        return history[~np.isnan(values).all(axis=1)].reset_index(drop=True)
+
+    def summary(self) -> Dict[str, int]:
+        """Cube dimensions"""
+        return {'firms': len(self.firms), 'years': len(self.years), 'ratios': len(self.ratios)}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Memory-mapped ratio cube built from df_ratios")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build the firm x year x ratio cube")
+    build_parser.add_argument('--data-path', default='./data/')
+    build_parser.add_argument('--cube-path', default=None)
+    build_parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64')
+
+    args = parser.parse_args(argv)
+    cube_path = build_ratio_cube(args.data_path, cube_path=args.cube_path, dtype=args.dtype)
+    summary = RatioCube(cube_path).summary()
+    print(f"✓ {summary['firms']} firms x {summary['years']} years x {summary['ratios']} ratios at {cube_path}")
+
+
+if __name__ == "__main__":
+    main()
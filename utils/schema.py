@@ -0,0 +1,129 @@
+"""
+Declared storage dtypes for the dashboard tables.
+
+Column names follow documentation/data_catalogue.md (raw statements and company
+info) and the transformation outputs (df_ratios, df_agg, df_credit_score).
+Ratios are stored as float32, money amounts stay float64 so statement values
+keep their precision at full-universe magnitudes, years are small ints and the
+repeated label columns are categoricals. firm_id is the join key between tables
+and stays a plain string column in every one of them.
+"""
+from typing import Dict, List
+
+import pandas as pd
+
+RATIO_DTYPE = 'float32'
+AMOUNT_DTYPE = 'float64'
+YEAR_DTYPE = 'int16'
+LABEL_DTYPE = 'category'
+FIRM_ID_DTYPE = 'object'
+
+# Statement line items from the data catalogue (all Float amounts)
+INCOME_COLUMNS = [
+    'revenue', 'cogs', 'gross_profit', 'opex', 'ebitda', 'depreciation',
+    'ebit', 'interest_expense', 'ebt', 'tax', 'net_income'
+]
+
+BALANCE_COLUMNS = [
+    'cash', 'receivables', 'inventory', 'other_current_assets', 'total_current_assets',
+    'ppe_gross', 'accum_depreciation', 'ppe_net', 'other_noncurrent_assets', 'total_assets',
+    'payables', 'other_current_liabilities', 'current_debt', 'total_current_liabilities',
+    'long_term_debt', 'total_liabilities', 'equity_begin', 'dividends', 'equity_injection',
+    'equity_end', 'total_liabilities_and_equity'
+]
+
+CASH_FLOW_COLUMNS = [
+    'net_income', 'depreciation', 'change_receivables', 'change_inventory', 'change_payables',
+    'cash_flow_operations', 'capex', 'asset_disposal_proceeds', 'cash_flow_investing',
+    'change_long_term_debt', 'change_current_debt', 'equity_injection', 'dividends_paid',
+    'cash_flow_financing', 'net_cash_flow', 'cash_beginning', 'cash_ending'
+]
+
+# Ratio-table metrics that are money amounts rather than ratios
+AMOUNT_METRICS = [
+    'free_cash_flow', 'delta_receivables', 'delta_inventory',
+    'sources', 'uses', 'fund_flow_balance'
+]
+
+ASPECTS = ['liquidity', 'solvency', 'profitability', 'activity', 'coverage', 'cashflow', 'structure']
+
+# Suffixes produced by aggregate_multi_year
+AGG_LABEL_SUFFIXES = ['_direction', '_trend_status', '_stability_status']
+AGG_NUMERIC_SUFFIXES = ['_last', '_before_last', '_diff_last_before', '_pct_change', '_trend', '_std']
+
+
+def _statement_schema(columns: List[str]) -> Dict[str, str]:
+    schema = {'firm_id': FIRM_ID_DTYPE, 'year': YEAR_DTYPE}
+    schema.update({col: AMOUNT_DTYPE for col in columns})
+    return schema
+
+
+TABLE_SCHEMAS = {
+    'company_info': {
+        'firm_id': FIRM_ID_DTYPE,
+        'sector': LABEL_DTYPE,
+        'region': LABEL_DTYPE,
+        'start_year': YEAR_DTYPE
+    },
+    'income_info': _statement_schema(INCOME_COLUMNS),
+    'balance_sheet': _statement_schema(BALANCE_COLUMNS),
+    'cash_flow': _statement_schema(CASH_FLOW_COLUMNS),
+    'credit_score': {
+        'firm_id': FIRM_ID_DTYPE,
+        **{f'{aspect}_score': RATIO_DTYPE for aspect in ASPECTS},
+        **{f'{aspect}_status': LABEL_DTYPE for aspect in ASPECTS},
+        'final_score': RATIO_DTYPE,
+        'kategori': LABEL_DTYPE,
+        'rekomendasi': LABEL_DTYPE
+    }
+}
+
+
+def resolve_dtypes(table: str, columns: List[str]) -> Dict[str, str]:
+    """Declared dtype for every known column of a table"""
+    declared = TABLE_SCHEMAS.get(table, {})
+    dtypes = {}
+
+    for col in columns:
+        if col in declared:
+            dtypes[col] = declared[col]
+        elif table == 'ratios':
+            if col == 'firm_id':
+                dtypes[col] = FIRM_ID_DTYPE
+            elif col == 'year':
+                dtypes[col] = YEAR_DTYPE
+            elif col.startswith(('bs_', 'ii_', 'cf_')) or col in AMOUNT_METRICS:
+                dtypes[col] = AMOUNT_DTYPE
+            else:
+                dtypes[col] = RATIO_DTYPE
+        elif table == 'agg':
+            if col == 'firm_id':
+                dtypes[col] = FIRM_ID_DTYPE
+            elif col.endswith(tuple(AGG_LABEL_SUFFIXES)):
+                dtypes[col] = LABEL_DTYPE
+            elif col.endswith(tuple(AGG_NUMERIC_SUFFIXES)):
+                # Longest suffix first so '_before_last' is not read as '_last'
+                suffix = max((s for s in AGG_NUMERIC_SUFFIXES if col.endswith(s)), key=len)
+                base = col[:-len(suffix)]
+                dtypes[col] = AMOUNT_DTYPE if base in AMOUNT_METRICS else RATIO_DTYPE
+
+    return dtypes
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Cast a freshly loaded table to its declared compact dtypes"""
+    dtypes = resolve_dtypes(table, list(df.columns))
+    converted = {}
+
+    for col, dtype in dtypes.items():
+        if str(df[col].dtype) == dtype:
+            continue
+        try:
+            converted[col] = df[col].astype(dtype)
+        except (ValueError, TypeError) as e:
+            # e.g. missing years cannot be stored as int16: keep the inferred dtype
+            print(f"Warning: Could not cast {table}.{col} to {dtype}: {str(e)}")
+
+    if converted:
+        df = df.assign(**converted)
+    return df
@@ -0,0 +1,175 @@
+"""
+Embedded SQLite backend for indexed per-firm lookups.
+
+The seven dashboard tables are ingested into one SQLite file with an index on
+(firm_id, year) for the yearly tables and on firm_id for the one-row-per-firm
+tables, so the lookups the pages do (latest year, previous year, one firm's
+statements, one ratio's history) are index seeks instead of whole-frame scans.
+
+Usage:
+    python -m utils.sql_backend build --data-path ./data/
+"""
+import argparse
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.schema import apply_schema
+from utils.storage import iter_table_chunks, resolve_source
+
+SQL_FILE = 'dashboard.sqlite'
+
+STATEMENT_TABLES = ['balance_sheet', 'income_info', 'cash_flow']
+
+
+def build_sql_backend(data_path: str, data_files: Dict[str, str], db_path: Optional[str] = None,
+                      chunksize: int = 50000) -> str:
+    """Ingest the data files into SQLite and index them by firm"""
+    db_path = db_path or os.path.join(data_path, SQL_FILE)
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        for key, filename in data_files.items():
+            csv_path = os.path.join(data_path, filename)
+            if not os.path.exists(resolve_source(csv_path)):
+                print(f"Warning: File {filename} not found at {csv_path}")
+                continue
+
+            # Streamed in chunks so a table never has to fit in memory whole
+            has_year = False
+            for df in iter_table_chunks(csv_path, chunksize):
+                df['firm_id'] = df['firm_id'].astype(str)
+                has_year = 'year' in df.columns
+                df.to_sql(key, conn, index=False, if_exists='append',
+                          dtype={'firm_id': 'TEXT', **({'year': 'INTEGER'} if has_year else {})})
+
+            if has_year:
+                conn.execute(f'CREATE INDEX "idx_{key}_firm_year" ON "{key}" (firm_id, year)')
+            else:
+                conn.execute(f'CREATE INDEX "idx_{key}_firm" ON "{key}" (firm_id)')
+
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def is_backend_current(db_path: str, data_path: str, data_files: Dict[str, str]) -> bool:
+    """Whether the SQLite file exists and is at least as new as every data file"""
+    if not os.path.exists(db_path):
+        return False
+
+    db_mtime = os.path.getmtime(db_path)
+    for filename in data_files.values():
+        source = resolve_source(os.path.join(data_path, filename))
+        if os.path.exists(source) and os.path.getmtime(source) > db_mtime:
+            return False
+    return True
+
+
+class SqlBackend:
+    """Typed, read-only queries against the SQLite backend"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # table -> column names, used to validate requested columns
+        self.table_columns = {}
+        conn = self._connect()
+        try:
+            tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            for table in tables:
+                self.table_columns[table] = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Streamlit serves sessions from several threads, so connections are not shared
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def _select_list(self, table: str, columns: Optional[List[str]]) -> str:
+        """Quoted column list after checking the table and columns exist"""
+        if table not in self.table_columns:
+            raise ValueError(f"Unknown table: {table}")
+        if columns is None:
+            return "*"
+
+        unknown = [col for col in columns if col not in self.table_columns[table]]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {unknown}")
+        return ", ".join(f'"{col}"' for col in columns)
+
+    def _query(self, table: str, sql: str, params: List) -> pd.DataFrame:
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+        return apply_schema(df, table)
+
+    def firm_rows(self, table: str, firm_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """All rows of one firm from a table, ordered by year where the table has one"""
+        select = self._select_list(table, columns)
+        order = " ORDER BY year" if 'year' in self.table_columns[table] else ""
+        return self._query(table, f'SELECT {select} FROM "{table}" WHERE firm_id = ?{order}', [str(firm_id)])
+
+    def latest_year_row(self, table: str, firm_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """One firm's row for its latest year"""
+        select = self._select_list(table, columns)
+        return self._query(
+            table, f'SELECT {select} FROM "{table}" WHERE firm_id = ? ORDER BY year DESC LIMIT 1', [str(firm_id)]
+        )
+
+    def previous_year_row(self, table: str, firm_id: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """One firm's row for the year before its latest year"""
+        select = self._select_list(table, columns)
+        return self._query(
+            table, f'SELECT {select} FROM "{table}" WHERE firm_id = ? ORDER BY year DESC LIMIT 1 OFFSET 1',
+            [str(firm_id)]
+        )
+
+    def firm_statements(self, firm_id: str) -> Dict[str, pd.DataFrame]:
+        """Balance sheet, income statement and cash flow rows of one firm"""
+        return {
+            table: self.firm_rows(table, firm_id)
+            for table in STATEMENT_TABLES if table in self.table_columns
+        }
+
+    def ratio_history(self, firm_id: str, ratio: str) -> pd.DataFrame:
+        """year and value of one ratio for one firm"""
+        return self.firm_rows('ratios', firm_id, ['year', ratio])
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from utils.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Embedded SQLite backend for the dashboard data files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Ingest the data files and build the firm indexes")
+    build_parser.add_argument('--data-path', default='./data/')
+    build_parser.add_argument('--db-path', default=None)
+
+    args = parser.parse_args(argv)
+    data_files = DataLoader(args.data_path).data_files
+
+    start = time.perf_counter()
+    db_path = build_sql_backend(args.data_path, data_files, args.db_path)
+    backend = SqlBackend(db_path)
+    print(f"✓ {len(backend.table_columns)} tables ingested into {db_path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Columnar storage backend for the dashboard data files.
+
+The seven CSVs are converted once into Parquet (or Feather) files that sit next
+to the originals. Later loads read the binary copy and fall back to the CSV
+when no converted copy exists or when the CSV is newer than its copy.
+
+Usage:
+    python -m utils.storage convert --data-path ./data/ --format parquet
+    python -m utils.storage compare --data-path ./data/
+"""
+import argparse
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (engine for both parquet and feather)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Preferred format first
+COLUMNAR_FORMATS = {
+    'parquet': '.parquet',
+    'feather': '.feather'
+}
+
+
+def columnar_path(csv_path: str, fmt: str) -> str:
+    """Path of the converted copy of a CSV file"""
+    return os.path.splitext(csv_path)[0] + COLUMNAR_FORMATS[fmt]
+
+
+def resolve_source(csv_path: str) -> str:
+    """Return the file that should be read for a table: a fresh columnar copy or the CSV"""
+    if HAS_PYARROW:
+        csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+        for fmt in COLUMNAR_FORMATS:
+            path = columnar_path(csv_path, fmt)
+            if os.path.exists(path) and (csv_mtime is None or os.path.getmtime(path) >= csv_mtime):
+                return path
+    return csv_path
+
+
+def read_table(csv_path: str) -> pd.DataFrame:
+    """Read a table from its columnar copy when available, otherwise from the CSV"""
+    path = resolve_source(csv_path)
+    if path.endswith(COLUMNAR_FORMATS['parquet']):
+        return pd.read_parquet(path)
+    if path.endswith(COLUMNAR_FORMATS['feather']):
+        return pd.read_feather(path)
+    return pd.read_csv(path)
+
+
+def iter_table_chunks(csv_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read a table in chunks of at most chunksize rows, from the same file read_table would use"""
+    path = resolve_source(csv_path)
+    if path.endswith(COLUMNAR_FORMATS['parquet']):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif path.endswith(COLUMNAR_FORMATS['feather']):
+        import pyarrow as pa
+
+        # Memory-mapped, so only the chunk being converted is materialised
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def write_table(df: pd.DataFrame, csv_path: str, fmt: str = 'parquet') -> str:
+    """Write a DataFrame as the columnar copy of a CSV path"""
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required for columnar storage (pip install pyarrow)")
+
+    path = columnar_path(csv_path, fmt)
+    df = df.reset_index(drop=True)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+    return path
+
+
+def convert_data_dir(data_path: str, data_files: Dict[str, str], fmt: str = 'parquet') -> List[str]:
+    """Convert every available CSV of a data directory into the columnar format"""
+    written = []
+    for key, filename in data_files.items():
+        csv_path = os.path.join(data_path, filename)
+        if not os.path.exists(csv_path):
+            print(f"Warning: File {filename} not found at {csv_path}")
+            continue
+        written.append(write_table(pd.read_csv(csv_path), csv_path, fmt))
+    return written
+
+
+def _time_read(reader, path: str, repeat: int) -> float:
+    """Best-of-N wall time for one read"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reader(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_load_times(data_path: str, data_files: Dict[str, str], repeat: int = 3) -> pd.DataFrame:
+    """Compare CSV parsing against every available columnar copy, per table"""
+    readers = {
+        'parquet': pd.read_parquet,
+        'feather': pd.read_feather
+    }
+
+    rows = []
+    for key, filename in data_files.items():
+        csv_path = os.path.join(data_path, filename)
+        if not os.path.exists(csv_path):
+            continue
+
+        row = {
+            'table': key,
+            'csv_bytes': os.path.getsize(csv_path),
+            'csv_seconds': _time_read(pd.read_csv, csv_path, repeat)
+        }
+        for fmt, reader in readers.items():
+            path = columnar_path(csv_path, fmt)
+            if HAS_PYARROW and os.path.exists(path):
+                row[f'{fmt}_bytes'] = os.path.getsize(path)
+                row[f'{fmt}_seconds'] = _time_read(reader, path, repeat)
+                row[f'{fmt}_speedup'] = row['csv_seconds'] / row[f'{fmt}_seconds']
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from utils.data_loader import DataLoader
+
+    parser = argparse.ArgumentParser(description="Columnar storage tools for the dashboard data files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="Convert the data CSVs into a columnar format")
+    convert_parser.add_argument('--data-path', default='./data/')
+    convert_parser.add_argument('--format', choices=list(COLUMNAR_FORMATS), default='parquet')
+
+    compare_parser = subparsers.add_parser('compare', help="Compare CSV and columnar load times")
+    compare_parser.add_argument('--data-path', default='./data/')
+    compare_parser.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args(argv)
+    data_files = DataLoader(args.data_path).data_files
+
+    if args.command == 'convert':
+        for path in convert_data_dir(args.data_path, data_files, args.format):
+            print(f"✓ {path}")
+    else:
+        report = compare_load_times(args.data_path, data_files, args.repeat)
+        print(report.to_string(index=False))
+        if not report.empty:
+            print(f"\nTotal CSV: {report['csv_seconds'].sum():.4f}s")
+            for fmt in COLUMNAR_FORMATS:
+                if f'{fmt}_seconds' in report.columns:
+                    print(f"Total {fmt}: {report[f'{fmt}_seconds'].sum():.4f}s")
+
+
+if __name__ == "__main__":
+    main()
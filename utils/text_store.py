@@ -0,0 +1,129 @@
+"""
+Keyed store for the narrative columns of df_credit_score.
+
+The per-aspect reasons, GenAI analyses, the overall reasoning and the GenAI
+recommendation are moved into an SQLite table keyed by (firm_id, field), and the
+remaining score/status columns are written to a slim df_credit_scores.csv. The
+dashboard then scans only the slim table and fetches text per firm on demand.
+
+Usage:
+    python -m utils.text_store build --data-path ./data/
+"""
+import argparse
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+from utils.storage import read_table, resolve_source
+
+TEXT_STORE_FILE = 'credit_text.sqlite'
+SCORES_FILE = 'df_credit_scores.csv'
+
+ASPECTS = ['liquidity', 'solvency', 'profitability', 'activity', 'coverage', 'cashflow', 'structure']
+
+NARRATIVE_COLUMNS = (
+    [f'{aspect}_reason' for aspect in ASPECTS] +
+    [f'{aspect}_analysis' for aspect in ASPECTS] +
+    ['reasoning', 'genai_recommendation']
+)
+
+
+def build_text_store(data_path: str, credit_file: str = 'df_credit_score.csv') -> str:
+    """Split df_credit_score into the text store and the slim scores table"""
+    credit_path = os.path.join(data_path, credit_file)
+    df_credit = read_table(credit_path)
+    df_credit['firm_id'] = df_credit['firm_id'].astype(str)
+
+    text_cols = [c for c in NARRATIVE_COLUMNS if c in df_credit.columns]
+    narratives = df_credit.melt(id_vars='firm_id', value_vars=text_cols, var_name='field', value_name='text')
+    narratives = narratives.astype({'text': object}).where(narratives.notna(), None)
+
+    store_path = os.path.join(data_path, TEXT_STORE_FILE)
+    tmp_path = store_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    with sqlite3.connect(tmp_path) as conn:
+        conn.execute(
+            "CREATE TABLE narratives (firm_id TEXT NOT NULL, field TEXT NOT NULL, text TEXT, "
+            "PRIMARY KEY (firm_id, field)) WITHOUT ROWID"
+        )
+        conn.executemany(
+            "INSERT INTO narratives (firm_id, field, text) VALUES (?, ?, ?)",
+            narratives[['firm_id', 'field', 'text']].itertuples(index=False, name=None)
+        )
+    os.replace(tmp_path, store_path)
+
+    df_credit.drop(columns=text_cols).to_csv(os.path.join(data_path, SCORES_FILE), index=False)
+    return store_path
+
+
+def is_store_current(data_path: str, credit_file: str = 'df_credit_score.csv') -> bool:
+    """Whether a text store exists and is at least as new as the full credit score file"""
+    store_path = os.path.join(data_path, TEXT_STORE_FILE)
+    scores_path = os.path.join(data_path, SCORES_FILE)
+    if not (os.path.exists(store_path) and os.path.exists(resolve_source(scores_path))):
+        return False
+
+    credit_source = resolve_source(os.path.join(data_path, credit_file))
+    if not os.path.exists(credit_source):
+        return True
+    return os.path.getmtime(store_path) >= os.path.getmtime(credit_source)
+
+
+class TextStore:
+    """Read-only access to the narrative text of one firm at a time"""
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+
+    def _connect(self) -> sqlite3.Connection:
+        # Streamlit serves sessions from several threads, so connections are not shared
+        return sqlite3.connect(f"file:{self.store_path}?mode=ro", uri=True)
+
+    def get(self, firm_id: str, fields: List[str]) -> Dict[str, Optional[str]]:
+        """Fetch the requested text fields of one firm"""
+        texts = {field: None for field in fields}
+        if not fields:
+            return texts
+
+        placeholders = ", ".join("?" for _ in fields)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT field, text FROM narratives WHERE firm_id = ? AND field IN ({placeholders})",
+                [str(firm_id)] + list(fields)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        texts.update(dict(rows))
+        return texts
+
+    def has_fields(self, fields: List[str]) -> bool:
+        """Whether the store holds text rows for every one of the fields"""
+        conn = self._connect()
+        try:
+            # Every firm has a row per field, so each lookup stops within the first firm's rows
+            return all(conn.execute("SELECT 1 FROM narratives WHERE field = ? LIMIT 1", [field]).fetchone()
+                       for field in fields)
+        finally:
+            conn.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Narrative text store for df_credit_score")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Split narrative columns into the text store")
+    build_parser.add_argument('--data-path', default='./data/')
+
+    args = parser.parse_args(argv)
+    store_path = build_text_store(args.data_path)
+    print(f"✓ Narrative text written to {store_path}")
+    print(f"✓ Scores written to {os.path.join(args.data_path, SCORES_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Batched least-squares trend slopes.
+
+Computes the slope of a degree-1 fit for every group and every value column in
+one pass of grouped sums, instead of one np.polyfit call per group per column.
+Missing values are skipped. By default x is each value's position among the
+non-missing values of its group (0, 1, 2, ...), which is what the scoring
+pipeline's _trend uses; pass x (e.g. years) to fit against real time instead.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def group_slopes(codes: np.ndarray, y: np.ndarray, x: Optional[np.ndarray] = None,
+                 n_groups: Optional[int] = None) -> np.ndarray:
+    """
+    Slope per group and column.
+
+    codes: group number (0..n_groups-1) of each row
+    y: (rows,) or (rows, columns) values, NaN where missing
+    x: optional (rows,) x values; defaults to the rank among the group's non-missing values
+    Returns (n_groups, columns) slopes, NaN where a group has fewer than two values,
+    a constant x, or a non-finite value.
+    """
+    codes = np.asarray(codes)
+    y = np.asarray(y, dtype=float)
+    squeeze = y.ndim == 1
+    if squeeze:
+        y = y[:, None]
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+    result = np.full((n_groups, y.shape[1]), np.nan)
+    if len(codes) == 0:
+        return result[:, 0] if squeeze else result
+
+    # Contiguous groups so every grouped sum is one reduceat; one row per column (pandas frames are column-major)
+    order = None if (codes[1:] >= codes[:-1]).all() else np.argsort(codes, kind='stable')
+    if order is not None:
+        codes = codes[order]
+    yt = np.ascontiguousarray(y.T) if order is None else np.ascontiguousarray(y.T)[:, order]
+    present = np.unique(codes)
+    starts = np.searchsorted(codes, present)
+    rows_per_group = np.diff(np.append(starts, len(codes)))
+
+    valid = ~np.isnan(yt)
+    weight = valid.astype(float)
+    n = np.add.reduceat(weight, starts, axis=1)
+
+    # Missing values add nothing; non-finite ones carry into the sums and are masked below
+    yt = np.where(valid, yt, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_sum = np.add.reduceat(yt, starts, axis=1)
+
+        if x is None:
+            # x = 0..n-1 over the group's valid values, so its mean and spread are closed-form
+            running = np.cumsum(weight, axis=1)
+            group_offset = running[:, starts] - weight[:, starts] + (n - 1) / 2
+            dx = (running - 1 - np.repeat(group_offset, rows_per_group, axis=1)) * weight
+            sxx = n * (n * n - 1) / 12
+        else:
+            # Centre on the group means so large x (years) keeps its precision
+            xt = np.asarray(x, dtype=float)
+            xt = (xt if order is None else xt[order]) * weight
+            x_mean = np.add.reduceat(xt, starts, axis=1) / n
+            dx = (xt - np.repeat(x_mean, rows_per_group, axis=1)) * weight
+            sxx = np.add.reduceat(dx * dx, starts, axis=1)
+
+        # sum(dx) is 0 per group, so centring y is only for precision on large amounts
+        y_mean = np.where(np.isfinite(y_sum), y_sum, 0.0) / n
+        sxy = np.add.reduceat(dx * (yt - np.repeat(y_mean, rows_per_group, axis=1)), starts, axis=1)
+        slopes = sxy / sxx
+
+    bad = (n < 2) | (sxx == 0) | ~np.isfinite(y_sum)
+    slopes[bad] = np.nan
+
+    result[present] = slopes.T
+    return result[:, 0] if squeeze else result
+
+
+def frame_slopes(df: pd.DataFrame, group_col: str, value_cols: List[str], x_col: Optional[str] = None) -> pd.DataFrame:
+    """Slope of every value column per group of a frame, indexed by sorted group key"""
+    codes, keys = pd.factorize(df[group_col], sort=True)
+    x = df[x_col].to_numpy(dtype=float) if x_col is not None else None
+    slopes = group_slopes(codes, df[value_cols].to_numpy(dtype=float), x, n_groups=len(keys))
+    return pd.DataFrame(slopes, index=pd.Index(keys, name=group_col), columns=value_cols)
+
+
+def series_slope(x, y) -> float:
+    """Slope of one series against x, skipping missing values"""
+    y = np.asarray(y, dtype=float)
+    return float(group_slopes(np.zeros(len(y), dtype=int), y, np.asarray(x, dtype=float), n_groups=1)[0])